@@ -0,0 +1,9 @@
+import enum
+
+
+# noinspection PyUnresolvedReferences
+class TikTokActionCostClass(enum.Int):
+    """ How expensive an action is to apply in-game. Cheaper classes are scheduled first. """
+    CHEAP = 0
+    MODERATE = 1
+    EXPENSIVE = 2
@@ -0,0 +1,10 @@
+import enum
+
+
+# noinspection PyUnresolvedReferences
+class TikTokActionTargetScope(enum.Int):
+    """ Which Sims an action affects when it is applied. """
+    NONE = 0
+    ACTIVE_SIM = 1
+    ACTIVE_HOUSEHOLD = 2
+    NEW_SIM = 3
@@ -8,8 +8,15 @@ from sims4communitylib.utils.common_log_registry import CommonLogRegistry
 from sims4communitylib.utils.sims.common_sim_utils import CommonSimUtils
 from sims4communitylib.utils.sims.common_sim_interaction_utils import CommonSimInteractionUtils
 from sims_tik_tok_mod.modinfo import ModInfo
+from sims_tik_tok_mod.notifications.tiktok_notification_aggregator import get_notification_aggregator
+from sims_tik_tok_mod.tiktok_action_dispatcher import get_action_dispatcher
+from sims_tik_tok_mod.tiktok_action_registry import TikTokActionRegistry
+from sims_tik_tok_mod.tiktok_asset_catalog import TikTokAssetCatalog, get_asset_catalog
 from sims_tik_tok_mod.tiktok_bridge_client import get_bridge_client
 from sims_tik_tok_mod.tiktok_effect_mappings import TikTokEffectMappings
+from sims_tik_tok_mod.tiktok_like_aggregator import get_like_aggregator
+from sims_tik_tok_mod.tiktok_viewer_registry import get_viewer_registry
+from sims_tik_tok_mod.utils.animation_utils import TikTokAnimationUtils
 
 log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokActionNotifications')  # type: ignore[attr-defined]
 log.enable()
@@ -21,10 +28,28 @@ class TikTokActionNotifications:
     def initialize() -> None:
         """Initialize the TikTok gift notification system"""
         log.info("Initializing TikTok gift notifications...")
+
+        # Typos in asset names show up in the log now instead of failing silently the first time a gift arrives
+        asset_catalog = get_asset_catalog()
+        asset_catalog.validate_registered_actions()
+        asset_catalog.validate_names(
+            TikTokAssetCatalog.ANIMATION,
+            'Gesture animations',
+            TikTokAnimationUtils.SPIN_ANIMATIONS + TikTokAnimationUtils.THUMBS_UP_ANIMATIONS + TikTokAnimationUtils.HEART_HAND_ANIMATIONS
+        )
         
+        # Actions are applied on the game thread, the websocket thread only queues them
+        action_dispatcher = get_action_dispatcher()
+        action_dispatcher.set_action_handler(TikTokActionNotifications._handle_action_event)
+        get_notification_aggregator().set_show_callback(TikTokActionNotifications._show_gift_notification)
+        get_like_aggregator().set_reward_callback(TikTokActionNotifications._apply_like_reward)
+
         # Get the bridge client and set up the callbacks
         bridge_client = get_bridge_client()
-        bridge_client.set_action_callback(TikTokActionNotifications._handle_action_event)
+        bridge_client.set_action_callback(action_dispatcher.enqueue)
+        # Everything applied in one tick is acknowledged to the bridge in a single message
+        action_dispatcher.set_after_drain_callback(bridge_client.flush_responses)
+        action_dispatcher.set_overflow_callback(TikTokActionNotifications._show_overflow_notification)
         bridge_client.set_connection_callback(TikTokActionNotifications._handle_connection_event)
 
         # Start the bridge client
@@ -36,6 +61,7 @@ class TikTokActionNotifications:
         log.info("Shutting down TikTok gift notifications...")
         bridge_client = get_bridge_client()
         bridge_client.stop()
+        get_action_dispatcher().clear()
         
     @staticmethod
     def _handle_action_event(action_data: Dict[str, Any]) -> None:
@@ -52,10 +78,23 @@ class TikTokActionNotifications:
             diamond_count = context.get('diamondCount', 0)
             is_manual = context.get('isManual', False)
             
+            if action == 'like':
+                # Raw likes only feed the like aggregator, rewards come back through _apply_like_reward
+                context['user'] = user
+                get_bridge_client().send_response(action_data, TikTokActionRegistry.get_description(action))
+                TikTokEffectMappings.apply_action_effect(user_nickname, action, count, context, action_data.get('trace'))
+                return
+
             log.info(f"Sims action received: {user} -> {action} (from {gift_name}, x{count})")
+
+            # Merged gifts carry the exact diamond total of every gift they replaced. Like rewards are not gifts.
+            if action != 'like_reward':
+                get_viewer_registry().record_gift(user, user_nickname, context.get('totalDiamondCount', diamond_count * count))
+            # Effects find the gifter's own Sim through their TikTok user id
+            context['user'] = user
             
             # Get the action description for notifications
-            action_description = TikTokEffectMappings.ACTION_DESCRIPTIONS.get(action, TikTokEffectMappings.ACTION_DESCRIPTIONS['default'])
+            action_description = TikTokActionRegistry.get_description(action)
             
             # Create the notification title and description
             title = f"TikTok Gift from {user_nickname} ({user})"
@@ -63,23 +102,53 @@ class TikTokActionNotifications:
             # Streamlined description - just the effect
             description = action_description
             
+            # Repeated gifts from the same viewer arrive merged into a single action
+            if context.get('coalescedCount', 1) > 1:
+                description += f" (x{count})"
+
             # Add test indicator if manual
             if is_manual:
                 description += " (Test)"
             
-            TikTokActionNotifications._show_gift_notification(title, description)
+            # Gifts are summarised per window rather than shown one toast each
+            if action == 'like_reward':
+                # Listed on its own, a reward for 100 likes is one event and not 100 gifts
+                get_notification_aggregator().add_like_reward(title, description, user, user_nickname, count)
+            else:
+                get_notification_aggregator().add(title, description, user, user_nickname, context.get('giftName', action), count)
             
             # Send response back to bridge (optional)
             bridge_client = get_bridge_client()
             bridge_client.send_response(action_data, action_description)
             
             # Apply the actual game effect based on the action
-            TikTokEffectMappings.apply_action_effect(user_nickname, action, count, context)
+            TikTokEffectMappings.apply_action_effect(user_nickname, action, count, context, action_data.get('trace'))
             
         except Exception as e:
             log.error(f"Error handling Sims action event: {e}")
             
             
+    @staticmethod
+    def _apply_like_reward(user: str, user_nickname: str, total_likes: int) -> None:
+        """Apply a like reward the moment a viewer earns one.
+
+        Rewards are earned on the game thread, either while raw likes are applied or on a zone update, so they skip
+        the dispatcher queue and its coalescing window, which the raw likes already went through.
+        """
+        TikTokActionNotifications._handle_action_event({
+            'type': 'sims_action',
+            'user': user,
+            'userNickname': user_nickname,
+            'action': 'like_reward',
+            'count': total_likes,
+            'context': {
+                'giftName': 'Likes',
+                'totalLikes': total_likes,
+                'rewardType': 'like_milestone',
+                'description': f"{user} reached {total_likes} likes!"
+            }
+        })
+
     @staticmethod
     def _handle_connection_event(is_connected: bool, message: str) -> None:
         """Handle connection status change events from the TikTok bridge"""
@@ -119,6 +188,21 @@ class TikTokActionNotifications:
         except Exception as e:
             log.error(f"Error showing gift notification: {e}")
 
+    @staticmethod
+    def _show_overflow_notification(dropped: int) -> None:
+        """Warn in-game that actions were dropped because the game could not keep up"""
+        try:
+            notification = CommonBasicNotification(
+                "TikTok Actions Dropped",
+                f"{dropped} TikTok action(s) were dropped because too many arrived at once. "
+                f"They will be sent again when the bridge reconnects."
+            )
+            notification.show()
+            log.info(f"[TikTokActionNotifications] Showed overflow notification for {dropped} dropped action(s)")
+
+        except Exception as e:
+            log.error(f"Error showing overflow notification: {e}")
+
     @staticmethod
     def _show_connection_notification(title: str, description: str) -> None:
         """Show a connection status notification in-game"""
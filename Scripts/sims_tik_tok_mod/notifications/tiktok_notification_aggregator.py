@@ -0,0 +1,158 @@
+"""
+TikTok Notification Aggregator for Sims 4
+Collects gift notifications over a short window and shows them as a single summary toast
+"""
+import time
+from collections import Counter, deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from sims4communitylib.events.event_handling.common_event_registry import CommonEventRegistry
+from sims4communitylib.events.zone_update.events.zone_update_event import S4CLZoneUpdateEvent
+from sims4communitylib.utils.common_log_registry import CommonLogRegistry
+from sims_tik_tok_mod.modinfo import ModInfo
+
+log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokNotificationAggregator')  # type: ignore[attr-defined]
+log.enable()
+
+
+class TikTokNotificationAggregator:
+    """Batches gift notifications so the UI shows one toast per window instead of one per gift"""
+
+    def __init__(self, window_seconds: float = 3.0, max_toasts_per_minute: int = 10, top_viewer_count: int = 3, top_gift_count: int = 4):
+        self.window_seconds = window_seconds
+        self.max_toasts_per_minute = max_toasts_per_minute
+        self.top_viewer_count = top_viewer_count
+        self.top_gift_count = top_gift_count
+
+        # Function used to display a toast, given a title and description
+        self.show_callback: Optional[Callable[[str, str], None]] = None
+
+        self._window_start: Optional[float] = None
+        self._gift_counts: Counter = Counter()
+        self._viewer_counts: Counter = Counter()
+        self._viewer_names: Dict[str, str] = {}
+        # Likes of each viewer rewarded in the window, kept apart so they never count as gifts
+        self._like_rewards: Counter = Counter()
+        self._last_title = ''
+        self._last_description = ''
+        self._event_count = 0
+        self._toast_times: Deque[float] = deque()
+
+        self.shown_count = 0
+
+    def set_show_callback(self, callback: Callable[[str, str], None]) -> None:
+        """Set the function used to display a toast"""
+        self.show_callback = callback
+
+    @property
+    def pending_count(self) -> int:
+        """Number of gift notifications waiting to be shown"""
+        return self._event_count
+
+    def add(self, title: str, description: str, user: str, user_nickname: str, gift_name: str, count: int) -> None:
+        """Add a gift notification to the current window"""
+        if self._window_start is None:
+            self._window_start = time.monotonic()
+
+        self._gift_counts[gift_name] += count
+        self._viewer_counts[user] += count
+        self._viewer_names[user] = user_nickname
+        self._last_title = title
+        self._last_description = description
+        self._event_count += 1
+
+    def add_like_reward(self, title: str, description: str, user: str, user_nickname: str, likes: int) -> None:
+        """Add a like reward to the current window, listed on its own line rather than as gifts"""
+        if self._window_start is None:
+            self._window_start = time.monotonic()
+
+        self._like_rewards[user] += likes
+        self._viewer_names[user] = user_nickname
+        self._last_title = title
+        self._last_description = description
+        self._event_count += 1
+
+    def update(self, now: Optional[float] = None) -> bool:
+        """Show the summary toast if the window has closed and the rate cap allows it"""
+        if self._window_start is None:
+            return False
+
+        if now is None:
+            now = time.monotonic()
+        if now - self._window_start < self.window_seconds:
+            return False
+
+        # Forget toasts older than a minute, then hold the window open while the cap is reached
+        while self._toast_times and now - self._toast_times[0] >= 60.0:
+            self._toast_times.popleft()
+        if len(self._toast_times) >= self.max_toasts_per_minute:
+            return False
+
+        title, description = self._build_summary()
+        self._reset()
+        self._toast_times.append(now)
+        self.shown_count += 1
+
+        if self.show_callback is not None:
+            self.show_callback(title, description)
+        return True
+
+    def _build_summary(self) -> Tuple[str, str]:
+        # A lone gift keeps its original, more specific notification
+        if self._event_count == 1:
+            return self._last_title, self._last_description
+
+        lines = []
+        if self._gift_counts:
+            total_gifts = sum(self._gift_counts.values())
+            title = f"{total_gifts} gifts from {len(self._viewer_counts)} viewer{'s' if len(self._viewer_counts) != 1 else ''}"
+
+            gift_summary = ', '.join(f"{count}x {gift_name}" for gift_name, count in self._gift_counts.most_common(self.top_gift_count))
+            remaining_gift_types = len(self._gift_counts) - self.top_gift_count
+            if remaining_gift_types > 0:
+                gift_summary += f" and {remaining_gift_types} more"
+            lines.append(gift_summary)
+
+            top_viewers = ', '.join(f"{self._viewer_names[user]} ({count})" for user, count in self._viewer_counts.most_common(self.top_viewer_count))
+            lines.append(f"Top viewers: {top_viewers}")
+        else:
+            title = f"Like rewards for {len(self._like_rewards)} viewer{'s' if len(self._like_rewards) != 1 else ''}"
+
+        if self._like_rewards:
+            like_rewards = ', '.join(
+                f"{self._viewer_names[user]} ({likes})" for user, likes in self._like_rewards.most_common(self.top_viewer_count)
+            )
+            remaining_likers = len(self._like_rewards) - self.top_viewer_count
+            if remaining_likers > 0:
+                like_rewards += f" and {remaining_likers} more"
+            lines.append(f"Like rewards: {like_rewards}")
+        return title, '\n'.join(lines)
+
+    def _reset(self) -> None:
+        self._window_start = None
+        self._gift_counts.clear()
+        self._viewer_counts.clear()
+        self._viewer_names.clear()
+        self._like_rewards.clear()
+        self._event_count = 0
+
+    @staticmethod
+    @CommonEventRegistry.handle_events(ModInfo.get_identity().name)
+    def _show_summary_on_zone_update(event_data: S4CLZoneUpdateEvent) -> bool:
+        try:
+            get_notification_aggregator().update()
+        except Exception as e:
+            log.error(f"Error showing gift summary notification: {e}")
+        return True
+
+
+# Global instance
+_notification_aggregator: Optional[TikTokNotificationAggregator] = None
+
+
+def get_notification_aggregator() -> TikTokNotificationAggregator:
+    """Get the global notification aggregator instance"""
+    global _notification_aggregator
+    if _notification_aggregator is None:
+        _notification_aggregator = TikTokNotificationAggregator()
+    return _notification_aggregator
@@ -0,0 +1,84 @@
+"""
+TikTok Action Coalescer for Sims 4 Mod
+Merges repeated actions from the same viewer so a combo streak is applied once
+"""
+import copy
+from typing import Dict, Any, List, Tuple
+
+
+class TikTokActionCoalescer:
+    """Merges actions with the same (user, action) key that arrive within a short window"""
+
+    # Diamonds assumed for a gift without a diamond count, such as a manual test gift
+    DEFAULT_DIAMOND_COUNT = 10
+
+    def __init__(self, window_ms: float = 500.0):
+        self.window_ms = window_ms
+
+        # Insertion ordered, so the oldest group is always first
+        self._groups: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+
+        self.merged_count = 0
+
+    @property
+    def pending_count(self) -> int:
+        """Number of merged actions waiting for their window to close"""
+        return len(self._groups)
+
+    def add(self, enqueue_time: float, action_data: Dict[str, Any]) -> bool:
+        """Add an action, merging it into a pending action from the same viewer if there is one
+
+        Returns True if the action was merged, False if it started a new pending action.
+        """
+        key = (action_data.get('user', 'unknown'), action_data.get('action', 'unknown'))
+        group = self._groups.get(key)
+        if group is None:
+            self._groups[key] = (enqueue_time, TikTokActionCoalescer._start_group(action_data))
+            return False
+
+        merged_data = group[1]
+        count = action_data.get('count', 1)
+        context = action_data.get('context', {})
+        merged_context = merged_data['context']
+
+        merged_data['count'] += count
+        merged_context['totalDiamondCount'] += context.get('diamondCount', TikTokActionCoalescer.DEFAULT_DIAMOND_COUNT) * count
+        merged_context['coalescedCount'] += 1
+        if 'seq' in action_data:
+            merged_data['seqs'].append(action_data['seq'])
+        self.merged_count += 1
+        return True
+
+    def pop_ready(self, now: float) -> List[Tuple[float, Dict[str, Any]]]:
+        """Remove and return every merged action whose window has closed"""
+        ready = []
+        window = self.window_ms / 1000.0
+        while self._groups:
+            key = next(iter(self._groups))
+            group = self._groups[key]
+            if now - group[0] < window:
+                break
+            del self._groups[key]
+            ready.append(group)
+        return ready
+
+    def pop_all(self) -> List[Tuple[float, Dict[str, Any]]]:
+        """Remove and return every pending merged action regardless of its window"""
+        ready = list(self._groups.values())
+        self._groups.clear()
+        return ready
+
+    @staticmethod
+    def _start_group(action_data: Dict[str, Any]) -> Dict[str, Any]:
+        # Copy so merging never mutates the payload received from the bridge
+        merged_data = copy.copy(action_data)
+        merged_context = dict(action_data.get('context', {}))
+        count = action_data.get('count', 1)
+
+        merged_data['count'] = count
+        merged_data['context'] = merged_context
+        merged_context['totalDiamondCount'] = merged_context.get('diamondCount', TikTokActionCoalescer.DEFAULT_DIAMOND_COUNT) * count
+        merged_context['coalescedCount'] = 1
+        # Sequence numbers of every merged action, so the ack covers all of them
+        merged_data['seqs'] = [action_data['seq']] if 'seq' in action_data else []
+        return merged_data
@@ -0,0 +1,309 @@
+"""
+TikTok Action Dispatcher for Sims 4 Mod
+Moves bridge action events off the websocket thread and applies them on the game thread
+"""
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Any, Optional, Tuple
+
+from sims4communitylib.events.event_handling.common_event_registry import CommonEventRegistry
+from sims4communitylib.events.zone_update.events.zone_update_event import S4CLZoneUpdateEvent
+from sims4communitylib.utils.common_log_registry import CommonLogRegistry
+from sims_tik_tok_mod.enums.action_cost_class import TikTokActionCostClass
+from sims_tik_tok_mod.modinfo import ModInfo
+from sims_tik_tok_mod.tiktok_action_coalescer import TikTokActionCoalescer
+from sims_tik_tok_mod.tiktok_action_registry import TikTokActionRegistry
+
+log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokActionDispatcher')  # type: ignore[attr-defined]
+log.enable()
+
+
+class TikTokActionClassQueue:
+    """Pending actions and wait statistics for a single cost class"""
+
+    def __init__(self, cost_class: TikTokActionCostClass, max_size: int, default_cost_ms: float):
+        self.cost_class = cost_class
+        self.max_size = max_size
+        self.default_cost_ms = default_cost_ms
+
+        # (enqueue time, action data) pairs, only touched on the game thread
+        self.pending: Deque[Tuple[float, Dict[str, Any]]] = deque()
+
+        # Actions accepted for this class and actions that left it, applied or merged into another.
+        # Each is only written by one thread, so their difference is safe to read from either
+        self.admitted_count = 0
+        self.released_count = 0
+
+        self.enqueued_count = 0
+        self.processed_count = 0
+        self.dropped_count = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    @property
+    def in_flight_count(self) -> int:
+        """Accepted actions of this class that have not been applied yet, wherever they are waiting"""
+        return self.admitted_count - self.released_count
+
+    @property
+    def average_wait_ms(self) -> float:
+        """Average time an applied action spent waiting in this queue"""
+        if self.processed_count == 0:
+            return 0.0
+        return self.total_wait_ms / self.processed_count
+
+    def oldest_wait_ms(self, now: float) -> float:
+        """How long the action at the front of the queue has been waiting"""
+        try:
+            return (now - self.pending[0][0]) * 1000.0
+        except IndexError:
+            return 0.0
+
+    def record_wait(self, wait_ms: float) -> None:
+        self.processed_count += 1
+        self.total_wait_ms += wait_ms
+        if wait_ms > self.max_wait_ms:
+            self.max_wait_ms = wait_ms
+
+
+class TikTokActionDispatcher:
+    """Schedules bridge actions onto the game thread by cost class within a per-tick time budget"""
+
+    # Starting cost estimates per class, refined with measured timings per action
+    DEFAULT_COST_MS = {
+        TikTokActionCostClass.CHEAP: 0.5,
+        TikTokActionCostClass.MODERATE: 3.0,
+        TikTokActionCostClass.EXPENSIVE: 50.0,
+    }
+
+    # Weight of the newest measurement in the per-action cost estimate
+    COST_SMOOTHING = 0.2
+
+    def __init__(self, max_queue_size: int = 1000, tick_budget_ms: float = 4.0):
+        self.max_queue_size = max_queue_size
+        self.tick_budget_ms = tick_budget_ms
+
+        # (receive time, action data) pairs. deque.append/popleft are atomic, so the websocket
+        # thread only ever appends and the game thread only ever pops without needing a lock
+        self._inbound: Deque[Tuple[float, Dict[str, Any]]] = deque()
+        self.inbound_dropped_count = 0
+
+        # Repeated batchable actions from the same viewer are merged before scheduling
+        self.coalescer = TikTokActionCoalescer()
+
+        # Ticks left before the next expensive action may run. An expensive action holds the class back for as
+        # many whole tick budgets as it took, so expensive work averages out to the budget per tick
+        self._expensive_cooldown_ticks = 0
+        # Actions that waited longer than this are served first regardless of class
+        self.starvation_ms = 5000.0
+
+        self._class_queues: Tuple[TikTokActionClassQueue, ...] = tuple(
+            TikTokActionClassQueue(cost_class, max_queue_size, self.DEFAULT_COST_MS[cost_class])
+            for cost_class in (TikTokActionCostClass.CHEAP, TikTokActionCostClass.MODERATE, TikTokActionCostClass.EXPENSIVE)
+        )
+        self._queues_by_class: Dict[TikTokActionCostClass, TikTokActionClassQueue] = {
+            class_queue.cost_class: class_queue for class_queue in self._class_queues
+        }
+
+        # Measured cost per action name in milliseconds
+        self._cost_estimates_ms: Dict[str, float] = {}
+
+        # Handler that applies a single action on the game thread
+        self.action_handler: Optional[Callable[[Dict[str, Any]], None]] = None
+        # Called once after every drain, used to send a single ack for everything applied
+        self.after_drain_callback: Optional[Callable[[], None]] = None
+        # Called on the game thread with the number of actions dropped since the last call
+        self.overflow_callback: Optional[Callable[[int], None]] = None
+        self.overflow_warning_interval_s = 30.0
+        self._warned_dropped_count = 0
+        self._last_overflow_warning_time: Optional[float] = None
+
+    def set_action_handler(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Set the function that applies an action on the game thread"""
+        self.action_handler = handler
+
+    def set_after_drain_callback(self, callback: Callable[[], None]) -> None:
+        """Set the function called once after each drain"""
+        self.after_drain_callback = callback
+
+    def set_overflow_callback(self, callback: Callable[[int], None]) -> None:
+        """Set the function told on the game thread how many actions were dropped because a queue was full"""
+        self.overflow_callback = callback
+
+    @property
+    def class_queues(self) -> Tuple[TikTokActionClassQueue, ...]:
+        """Queues for each cost class, in priority order"""
+        return self._class_queues
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of actions waiting to be applied"""
+        return len(self._inbound) + self.coalescer.pending_count + sum(len(class_queue.pending) for class_queue in self._class_queues)
+
+    @property
+    def processed_count(self) -> int:
+        return sum(class_queue.processed_count for class_queue in self._class_queues)
+
+    @property
+    def dropped_count(self) -> int:
+        return self.inbound_dropped_count + sum(class_queue.dropped_count for class_queue in self._class_queues)
+
+    def estimate_cost_ms(self, action: str, class_queue: TikTokActionClassQueue) -> float:
+        """Estimated time to apply an action, from measurements or the class default"""
+        return self._cost_estimates_ms.get(action, class_queue.default_cost_ms)
+
+    def enqueue(self, action_data: Dict[str, Any]) -> bool:
+        """Queue an action for the game thread. Safe to call from the websocket thread.
+
+        Returns False when there is no room, an accepted action always gets a place in its class queue.
+        """
+        action = action_data.get('action', 'unknown')
+        if len(self._inbound) >= self.max_queue_size:
+            self.inbound_dropped_count += 1
+            log.error(f"Inbound action queue full ({self.max_queue_size}), dropping {action} from {action_data.get('user', 'unknown')}")
+            return False
+
+        # Counted against the class queue now, as the game thread must never drop an action the bridge considers delivered
+        class_queue = self._queues_by_class[TikTokActionRegistry.get_cost_class(action)]
+        if class_queue.in_flight_count >= class_queue.max_size:
+            class_queue.dropped_count += 1
+            log.error(f"{class_queue.cost_class.name} action queue full ({class_queue.max_size}), dropping {action} from {action_data.get('user', 'unknown')}")
+            return False
+
+        class_queue.admitted_count += 1
+        self._inbound.append((time.perf_counter(), action_data))
+        return True
+
+    def _schedule(self, enqueue_time: float, action_data: Dict[str, Any]) -> None:
+        cost_class = TikTokActionRegistry.get_cost_class(action_data.get('action', 'unknown'))
+        class_queue = self._queues_by_class[cost_class]
+        class_queue.pending.append((enqueue_time, action_data))
+        class_queue.enqueued_count += 1
+
+    def _pump_inbound(self, now: float) -> None:
+        """Move received actions into the coalescer or straight into their class queue"""
+        while self._inbound:
+            try:
+                enqueue_time, action_data = self._inbound.popleft()
+            except IndexError:
+                break
+
+            action = action_data.get('action', 'unknown')
+            if TikTokActionRegistry.is_batchable(action):
+                if self.coalescer.add(enqueue_time, action_data):
+                    # Merged into an action that already holds a place in the class queue
+                    self._queues_by_class[TikTokActionRegistry.get_cost_class(action)].released_count += 1
+            else:
+                self._schedule(enqueue_time, action_data)
+
+        for enqueue_time, action_data in self.coalescer.pop_ready(now):
+            self._schedule(enqueue_time, action_data)
+
+    def drain(self, budget_ms: Optional[float] = None) -> int:
+        """Apply queued actions in priority order without exceeding the time budget"""
+        if self.action_handler is None:
+            return 0
+
+        if budget_ms is None:
+            budget_ms = self.tick_budget_ms
+
+        tick_start = time.perf_counter()
+        self._pump_inbound(tick_start)
+        if self._expensive_cooldown_ticks > 0:
+            self._expensive_cooldown_ticks -= 1
+
+        # Starved queues go first, otherwise cheapest class first
+        ordered_queues = sorted(
+            (class_queue for class_queue in self._class_queues if class_queue.pending),
+            key=lambda class_queue: (class_queue.oldest_wait_ms(tick_start) < self.starvation_ms, class_queue.cost_class)
+        )
+
+        processed = 0
+        for class_queue in ordered_queues:
+            while class_queue.pending:
+                now = time.perf_counter()
+                is_expensive = class_queue.cost_class == TikTokActionCostClass.EXPENSIVE
+                if is_expensive and self._expensive_cooldown_ticks > 0:
+                    break
+
+                enqueue_time, action_data = class_queue.pending[0]
+                action = action_data.get('action', 'unknown')
+                spent_ms = (now - tick_start) * 1000.0
+                # The first action of a tick always runs so oversized actions still make progress
+                if processed > 0 and spent_ms + self.estimate_cost_ms(action, class_queue) > budget_ms:
+                    return processed
+
+                class_queue.pending.popleft()
+                class_queue.released_count += 1
+                class_queue.record_wait((now - enqueue_time) * 1000.0)
+                if 'trace' in action_data:
+                    action_data['trace']['dequeuedAt'] = time.time() * 1000.0
+
+                try:
+                    self.action_handler(action_data)
+                except Exception as e:
+                    log.error(f"Error applying queued action '{action}': {e}")
+
+                cost_ms = (time.perf_counter() - now) * 1000.0
+                self._record_cost(action, class_queue, cost_ms)
+                if is_expensive:
+                    # An action bigger than the budget pays the overrun back over the next ticks
+                    self._expensive_cooldown_ticks = math.floor(cost_ms / budget_ms)
+                processed += 1
+
+        return processed
+
+    def _record_cost(self, action: str, class_queue: TikTokActionClassQueue, cost_ms: float) -> None:
+        previous = self.estimate_cost_ms(action, class_queue)
+        self._cost_estimates_ms[action] = previous + (cost_ms - previous) * self.COST_SMOOTHING
+
+    def clear(self) -> None:
+        """Discard any actions that have not been applied yet"""
+        self._inbound.clear()
+        self.coalescer.pop_all()
+        for class_queue in self._class_queues:
+            class_queue.pending.clear()
+            class_queue.released_count = class_queue.admitted_count
+
+    def _warn_if_dropped(self) -> None:
+        """Tell the overflow callback about newly dropped actions, at most once per warning interval"""
+        dropped = self.dropped_count - self._warned_dropped_count
+        if dropped <= 0 or self.overflow_callback is None:
+            return
+
+        now = time.monotonic()
+        if self._last_overflow_warning_time is not None and now - self._last_overflow_warning_time < self.overflow_warning_interval_s:
+            return
+
+        self._warned_dropped_count += dropped
+        self._last_overflow_warning_time = now
+        try:
+            self.overflow_callback(dropped)
+        except Exception as e:
+            log.error(f"Error warning about dropped actions: {e}")
+
+    @staticmethod
+    @CommonEventRegistry.handle_events(ModInfo.get_identity().name)
+    def _drain_on_zone_update(event_data: S4CLZoneUpdateEvent) -> bool:
+        dispatcher = get_action_dispatcher()
+        processed = dispatcher.drain()
+        if processed > 0 and dispatcher.after_drain_callback is not None:
+            try:
+                dispatcher.after_drain_callback()
+            except Exception as e:
+                log.error(f"Error after draining actions: {e}")
+        dispatcher._warn_if_dropped()
+        return True
+
+
+# Global instance
+_action_dispatcher: Optional[TikTokActionDispatcher] = None
+
+
+def get_action_dispatcher() -> TikTokActionDispatcher:
+    """Get the global action dispatcher instance"""
+    global _action_dispatcher
+    if _action_dispatcher is None:
+        _action_dispatcher = TikTokActionDispatcher()
+    return _action_dispatcher
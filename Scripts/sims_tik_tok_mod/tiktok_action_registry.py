@@ -0,0 +1,140 @@
+"""
+TikTok Action Registry for Sims 4 Mod
+Maps action names sent by the bridge to the handlers that apply them in-game
+"""
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from sims4communitylib.utils.common_log_registry import CommonLogRegistry
+from sims_tik_tok_mod.enums.action_cost_class import TikTokActionCostClass
+from sims_tik_tok_mod.enums.action_target_scope import TikTokActionTargetScope
+from sims_tik_tok_mod.modinfo import ModInfo
+
+log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokActionRegistry')  # type: ignore[attr-defined]
+log.enable()
+
+# Handlers receive the gifter's nickname, the number of times the action was sent and the gift context
+TikTokActionHandler = Callable[[str, int, Dict[str, Any]], None]
+
+
+class TikTokActionDefinition:
+    """A registered action and the metadata used to schedule and describe it"""
+
+    def __init__(
+        self,
+        name: str,
+        handler: TikTokActionHandler,
+        description: str,
+        cost_class: TikTokActionCostClass,
+        target_scope: TikTokActionTargetScope,
+        batchable: bool,
+        animation_names: Tuple[str, ...] = (),
+        vfx_names: Tuple[str, ...] = ()
+    ):
+        self.name = name
+        self.handler = handler
+        self.description = description
+        self.cost_class = cost_class
+        self.target_scope = target_scope
+        self.batchable = batchable
+        # Game assets the handler plays, checked against the asset catalog at startup
+        self.animation_names = animation_names
+        self.vfx_names = vfx_names
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Metadata sent to the bridge so it can validate gift mappings"""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'costClass': self.cost_class.name,
+            'targetScope': self.target_scope.name,
+            'batchable': self.batchable
+        }
+
+
+class TikTokActionRegistry:
+    """Registry of every action the mod can apply, keyed by action name"""
+
+    DEFAULT_DESCRIPTION = 'Thank you for the gift!'
+
+    _actions: Dict[str, TikTokActionDefinition] = {}
+
+    @staticmethod
+    def register(
+        name: str,
+        description: str,
+        cost_class: TikTokActionCostClass = TikTokActionCostClass.MODERATE,
+        target_scope: TikTokActionTargetScope = TikTokActionTargetScope.ACTIVE_SIM,
+        batchable: bool = False,
+        animation_names: Tuple[str, ...] = (),
+        vfx_names: Tuple[str, ...] = ()
+    ) -> Callable[[TikTokActionHandler], TikTokActionHandler]:
+        """Decorate a handler function to register it for an action name"""
+        def _wrapper(handler: TikTokActionHandler) -> TikTokActionHandler:
+            TikTokActionRegistry.register_action(
+                name,
+                handler,
+                description,
+                cost_class=cost_class,
+                target_scope=target_scope,
+                batchable=batchable,
+                animation_names=animation_names,
+                vfx_names=vfx_names
+            )
+            return handler
+        return _wrapper
+
+    @staticmethod
+    def register_action(
+        name: str,
+        handler: TikTokActionHandler,
+        description: str,
+        cost_class: TikTokActionCostClass = TikTokActionCostClass.MODERATE,
+        target_scope: TikTokActionTargetScope = TikTokActionTargetScope.ACTIVE_SIM,
+        batchable: bool = False,
+        animation_names: Tuple[str, ...] = (),
+        vfx_names: Tuple[str, ...] = ()
+    ) -> TikTokActionDefinition:
+        """Register a handler for an action name, replacing any existing handler"""
+        if name in TikTokActionRegistry._actions:
+            log.info(f"Replacing handler for action '{name}'")
+        definition = TikTokActionDefinition(name, handler, description, cost_class, target_scope, batchable, animation_names, vfx_names)
+        TikTokActionRegistry._actions[name] = definition
+        return definition
+
+    @staticmethod
+    def unregister_action(name: str) -> bool:
+        """Remove the handler for an action name"""
+        return TikTokActionRegistry._actions.pop(name, None) is not None
+
+    @staticmethod
+    def get(name: str) -> Optional[TikTokActionDefinition]:
+        """Get the definition registered for an action name"""
+        return TikTokActionRegistry._actions.get(name)
+
+    @staticmethod
+    def get_all() -> List[TikTokActionDefinition]:
+        """Every registered action definition"""
+        return list(TikTokActionRegistry._actions.values())
+
+    @staticmethod
+    def get_description(name: str) -> str:
+        """Get the notification description of an action"""
+        definition = TikTokActionRegistry._actions.get(name)
+        return definition.description if definition is not None else TikTokActionRegistry.DEFAULT_DESCRIPTION
+
+    @staticmethod
+    def get_cost_class(name: str) -> TikTokActionCostClass:
+        """Get the cost class of an action, unknown actions are treated as moderate"""
+        definition = TikTokActionRegistry._actions.get(name)
+        return definition.cost_class if definition is not None else TikTokActionCostClass.MODERATE
+
+    @staticmethod
+    def is_batchable(name: str) -> bool:
+        """Whether repeats of an action from the same viewer can be merged into one"""
+        definition = TikTokActionRegistry._actions.get(name)
+        return definition is not None and definition.batchable
+
+    @staticmethod
+    def get_metadata() -> List[Dict[str, Any]]:
+        """Metadata of every registered action, sorted by name"""
+        return [TikTokActionRegistry._actions[name].to_dict() for name in sorted(TikTokActionRegistry._actions)]
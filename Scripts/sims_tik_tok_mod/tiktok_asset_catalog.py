@@ -0,0 +1,277 @@
+"""
+TikTok Asset Catalog for Sims 4 Mod
+Looks up animation and VFX names in the catalog built by Utilities/build_asset_catalog.py
+"""
+import struct
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import sims4.hash_util
+from sims4communitylib.utils.common_log_registry import CommonLogRegistry
+
+from sims_tik_tok_mod.modinfo import ModInfo
+from sims_tik_tok_mod.tiktok_action_registry import TikTokActionRegistry
+
+log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokAssetCatalog')  # type: ignore[attr-defined]
+log.enable()
+
+# Must match Utilities/build_asset_catalog.py
+_SECTION_MAGIC = b'TTCS'
+_SECTION_VERSION = 1
+_SECTION_HEADER = struct.Struct('<4sBIHI')
+_U32 = struct.Struct('<I')
+_TRIGRAM_ENTRY = struct.Struct('<3sI')
+
+
+class TikTokAssetCatalogSection:
+    """Names of one kind of asset, read straight from the binary section without building per-name objects"""
+
+    def __init__(self, kind: str, data: bytes):
+        magic, version, name_count, package_count, trigram_count = _SECTION_HEADER.unpack_from(data, 0)
+        if magic != _SECTION_MAGIC or version != _SECTION_VERSION:
+            raise ValueError(f"Unsupported {kind} catalog section (magic {magic!r}, version {version})")
+
+        self.kind = kind
+        self._data = data
+        self._view = memoryview(data)
+        self._name_count = name_count
+
+        position = _SECTION_HEADER.size
+        self.packages: List[str] = []
+        for _ in range(package_count):
+            length = struct.unpack_from('<H', data, position)[0]
+            self.packages.append(data[position + 2:position + 2 + length].decode('utf-8'))
+            position += 2 + length
+
+        self._offsets_at = position
+        position += (name_count + 1) * 4
+        self._hashes_at = position
+        position += name_count * 4
+        self._hash_order_at = position
+        position += name_count * 4
+        self._package_ids_at = position
+        position += name_count
+        self._first_char_at = position
+        position += 257 * 4
+        self._trigrams_at = position
+        self._trigram_count = trigram_count
+        position += (trigram_count + 1) * _TRIGRAM_ENTRY.size
+        posting_length = _U32.unpack_from(data, position)[0]
+        self._postings_at = position + 4
+        self._names_at = self._postings_at + posting_length
+
+        # The stored hashes are only trusted if they agree with the game's own hash function
+        self.hashes_verified = name_count == 0 or sims4.hash_util.hash32(self.name_at(0)) == self._hash_at(0)
+
+    def __len__(self) -> int:
+        return self._name_count
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) is not None
+
+    def name_at(self, name_id: int) -> str:
+        start, end = struct.unpack_from('<II', self._data, self._offsets_at + name_id * 4)
+        return self._data[self._names_at + start:self._names_at + end].decode('utf-8')
+
+    def find(self, name: str) -> Optional[int]:
+        """Id of a name (case-insensitive), or None if the game has no asset with that name"""
+        key = name.lower()
+        name_id = self._lower_bound(key)
+        if name_id < self._name_count and self.name_at(name_id).lower() == key:
+            return name_id
+        return None
+
+    def get_hash(self, name: str) -> Optional[int]:
+        """hash32 of a known name, or None if the name is not in the catalog"""
+        name_id = self.find(name)
+        if name_id is None:
+            return None
+        return self._hash_at(name_id) if self.hashes_verified else sims4.hash_util.hash32(self.name_at(name_id))
+
+    def get_package(self, name: str) -> Optional[str]:
+        """Package the name was first found in"""
+        name_id = self.find(name)
+        if name_id is None:
+            return None
+        return self.packages[self._data[self._package_ids_at + name_id]]
+
+    def name_for_hash(self, name_hash: int) -> Optional[str]:
+        """Name behind a hash32, useful for logging resources that were looked up by hash"""
+        low, high = 0, self._name_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._hash_at(self._hash_order_id(middle)) < name_hash:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._name_count:
+            name_id = self._hash_order_id(low)
+            if self._hash_at(name_id) == name_hash:
+                return self.name_at(name_id)
+        return None
+
+    def with_prefix(self, prefix: str, limit: int = 10) -> List[str]:
+        """Names starting with the prefix (case-insensitive), in alphabetical order"""
+        key = prefix.lower()
+        names = []
+        name_id = self._lower_bound(key)
+        while name_id < self._name_count and len(names) < limit:
+            name = self.name_at(name_id)
+            if not name.lower().startswith(key):
+                break
+            names.append(name)
+            name_id += 1
+        return names
+
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        """Closest names to the query, ranked by shared trigrams with exact and prefix matches first"""
+        key = query.lower()
+        encoded = key.encode('utf-8')
+        if len(encoded) < 3:
+            return self.with_prefix(query, limit)
+
+        scores: Dict[int, int] = {}
+        for trigram in {encoded[index:index + 3] for index in range(len(encoded) - 2)}:
+            for name_id in self._postings(trigram):
+                scores[name_id] = scores.get(name_id, 0) + 1
+
+        exact = self.find(query)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit * 4]
+        ranked: List[Tuple[int, int, int, str]] = []
+        for name_id, score in best:
+            name = self.name_at(name_id)
+            lowered = name.lower()
+            rank = 0 if name_id == exact else 1 if lowered.startswith(key) else 2 if key in lowered else 3
+            ranked.append((rank, -score, len(name), name))
+        ranked.sort()
+        return [entry[3] for entry in ranked[:limit]]
+
+    def _hash_at(self, name_id: int) -> int:
+        return _U32.unpack_from(self._data, self._hashes_at + name_id * 4)[0]
+
+    def _hash_order_id(self, index: int) -> int:
+        return _U32.unpack_from(self._data, self._hash_order_at + index * 4)[0]
+
+    def _lower_bound(self, key: str) -> int:
+        encoded = key.encode('utf-8')
+        if not encoded:
+            return 0
+        # Names are sorted lowercase, so the first byte narrows the search to one bucket
+        low, high = struct.unpack_from('<II', self._data, self._first_char_at + encoded[0] * 4)
+        while low < high:
+            middle = (low + high) // 2
+            if self.name_at(middle).lower() < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _postings(self, trigram: bytes) -> List[int]:
+        low, high = 0, self._trigram_count
+        while low < high:
+            middle = (low + high) // 2
+            if _TRIGRAM_ENTRY.unpack_from(self._data, self._trigrams_at + middle * _TRIGRAM_ENTRY.size)[0] < trigram:
+                low = middle + 1
+            else:
+                high = middle
+        if low >= self._trigram_count:
+            return []
+        entry_trigram, start = _TRIGRAM_ENTRY.unpack_from(self._data, self._trigrams_at + low * _TRIGRAM_ENTRY.size)
+        if entry_trigram != trigram:
+            return []
+        end = _TRIGRAM_ENTRY.unpack_from(self._data, self._trigrams_at + (low + 1) * _TRIGRAM_ENTRY.size)[1]
+
+        # Delta encoded varints
+        name_ids = []
+        view = self._view
+        position = self._postings_at + start
+        end += self._postings_at
+        name_id = 0
+        while position < end:
+            value = 0
+            shift = 0
+            while True:
+                byte = view[position]
+                position += 1
+                value |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            name_id += value
+            name_ids.append(name_id)
+        return name_ids
+
+
+class TikTokAssetCatalog:
+    """Animation and VFX names shipped with the mod, each section loaded the first time it is used"""
+
+    ANIMATION = 'animation'
+    VFX = 'vfx'
+
+    def __init__(self):
+        self._sections: Dict[str, Optional[TikTokAssetCatalogSection]] = {}
+
+    @property
+    def animations(self) -> Optional[TikTokAssetCatalogSection]:
+        return self.get_section(TikTokAssetCatalog.ANIMATION)
+
+    @property
+    def vfx(self) -> Optional[TikTokAssetCatalogSection]:
+        return self.get_section(TikTokAssetCatalog.VFX)
+
+    def get_section(self, kind: str) -> Optional[TikTokAssetCatalogSection]:
+        """The section for a kind of asset, or None if the catalog was not built into this copy of the mod"""
+        if kind in self._sections:
+            return self._sections[kind]
+
+        section = None
+        try:
+            from sims_tik_tok_mod.tiktok_asset_catalog_data import CATALOG_SECTIONS
+            section = TikTokAssetCatalogSection(kind, zlib.decompress(CATALOG_SECTIONS[kind]))
+            if not section.hashes_verified:
+                log.error(f"The {kind} catalog hashes do not match the game, hashing names on lookup instead")
+            log.info(f"Loaded {len(section)} {kind} names")
+        except ImportError:
+            log.error("The asset catalog was not built, run Utilities/build_asset_catalog.py before compiling")
+        except Exception as e:
+            log.error(f"Error loading the {kind} catalog: {e}")
+
+        self._sections[kind] = section
+        return section
+
+    def validate_names(self, kind: str, owner: str, names: Iterable[str]) -> List[str]:
+        """Check names of one kind of asset, returns a message per unknown name with the closest known names"""
+        section = self.get_section(kind)
+        if section is None:
+            return []
+
+        problems = []
+        for name in names:
+            if name in section:
+                continue
+            suggestions = section.search(name, limit=3)
+            problems.append(f"{owner} uses unknown {kind} '{name}' (closest: {', '.join(suggestions) or 'none'})")
+        for problem in problems:
+            log.error(problem)
+        return problems
+
+    def validate_registered_actions(self) -> List[str]:
+        """Check the animation and VFX names of every registered action"""
+        problems = []
+        for definition in TikTokActionRegistry.get_all():
+            owner = f"Action '{definition.name}'"
+            problems.extend(self.validate_names(TikTokAssetCatalog.ANIMATION, owner, definition.animation_names))
+            problems.extend(self.validate_names(TikTokAssetCatalog.VFX, owner, definition.vfx_names))
+        return problems
+
+
+# Global instance
+_asset_catalog: Optional[TikTokAssetCatalog] = None
+
+
+def get_asset_catalog() -> TikTokAssetCatalog:
+    """Get the global asset catalog instance"""
+    global _asset_catalog
+    if _asset_catalog is None:
+        _asset_catalog = TikTokAssetCatalog()
+    return _asset_catalog
@@ -3,9 +3,10 @@ TikTok Bridge WebSocket Client for Sims 4 Mod
 Connects to the Node.js bridge service and handles gift events
 """
 import json
+import random
 import threading
 import time
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, List, Union
 
 try:
     # Try to import websocket-client (already present in Scripts folder)
@@ -16,6 +17,12 @@ except ImportError:
 
 from sims4communitylib.utils.common_log_registry import CommonLogRegistry
 from sims_tik_tok_mod.modinfo import ModInfo
+from sims_tik_tok_mod.tiktok_action_registry import TikTokActionRegistry
+from sims_tik_tok_mod.tiktok_latency_tracer import get_latency_tracer
+from sims_tik_tok_mod.tiktok_like_aggregator import get_like_aggregator
+from sims_tik_tok_mod.tiktok_sequence_tracker import TikTokSequenceTracker
+from sims_tik_tok_mod.utils.latency_histogram import TikTokLatencyHistogram
+from sims_tik_tok_mod.tiktok_compact_protocol import TikTokCompactDecoder, TikTokCompactProtocolError, COMPACT_PROTOCOL, JSON_PROTOCOL
 
 # Create a logger for this module
 log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokBridge')  # type: ignore[attr-defined]
@@ -34,27 +41,53 @@ class TikTokBridgeClient:
         self.connection_thread: Optional[threading.Thread] = None
         
         # Callback for when action events are received
-        self.on_action_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.on_action_callback: Optional[Callable[[Dict[str, Any]], Optional[bool]]] = None
         
         
         # Callback for connection status changes
         self.on_connection_callback: Optional[Callable[[bool, str], None]] = None
+
+        # Wire protocol, negotiated with the bridge after every connect
+        self.compact_protocol_enabled = True
+        self.protocol = JSON_PROTOCOL
+        self._compact_decoder = TikTokCompactDecoder()
+
+        # Sequence numbers already received, used to resume after a reconnect without duplicates
+        self.sequence_tracker = TikTokSequenceTracker()
+
+        # Responses for applied actions, sent to the bridge as one ack per drain
+        self._pending_responses: List[Dict[str, Any]] = []
+        # Epoch milliseconds the message being handled was received, stamped into action traces
+        self._message_received_at = 0.0
         
-        # Connection retry settings
-        self.max_retries = 5
-        self.retry_delay = 5  # seconds
-        self.max_retry_delay = 60  # maximum 60 seconds between retries
+        # Connection retry settings, jittered exponential backoff between attempts
+        self.max_retries = 5  # failed attempts before the player is told the bridge is unreachable
+        self.retry_delay = 0.25  # seconds
+        self.max_retry_delay = 30  # maximum 30 seconds between retries
+        self.retry_jitter = 0.5  # fraction of each delay that is randomised
         self.current_retries = 0
         self.last_retry_time = 0  # timestamp of last retry attempt
+
+        # A bridge that closes with 1012 (service restart) is retried quickly for a short window
+        self.restart_retry_delay = 0.2  # seconds
+        self.restart_retry_window = 30  # seconds
+        self._restart_deadline = 0.0
+        
+        # Heartbeat settings, a link that misses a pong for heartbeat_timeout seconds is treated as dead
+        self.heartbeat_interval = 5.0  # seconds between pings
+        self.heartbeat_timeout = 3.0  # seconds to wait for each pong
+        self.rtt_histogram = TikTokLatencyHistogram()
+        self.last_frame_time = 0.0  # monotonic time of the last frame received from the bridge
         
         # Auto-reconnection settings
         self.auto_reconnect_enabled = True
-        self.auto_reconnect_interval = 30  # seconds
-        self.auto_reconnect_thread: Optional[threading.Thread] = None
         self.last_successful_connection = 0  # timestamp of last successful connection
+
+        # Wakes the connection thread from its backoff wait on stop or force_reconnect
+        self._wake_event = threading.Event()
         
-    def set_action_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
-        """Set the callback function to be called when action events are received"""
+    def set_action_callback(self, callback: Callable[[Dict[str, Any]], Optional[bool]]) -> None:
+        """Set the callback function to be called when action events are received, returning False if it dropped one"""
         self.on_action_callback = callback
         
         
@@ -83,23 +116,19 @@ class TikTokBridgeClient:
         log.info("[TikTokBridge] Make sure the bridge service is running with: cd bridge_service && node start.js")
         
         self.is_running = True
-        self.current_retries = 0
+        self._wake_event.clear()
         
-        # Start connection in a separate thread
+        # A single thread owns the connection and all reconnection attempts
         self.connection_thread = threading.Thread(target=self._run_connection, daemon=True)
         self.connection_thread.start()
         
-        # Start auto-reconnection monitor thread
-        if self.auto_reconnect_enabled:
-            self.auto_reconnect_thread = threading.Thread(target=self._auto_reconnect_monitor, daemon=True)
-            self.auto_reconnect_thread.start()
-        
         return True
         
     def stop(self) -> None:
         """Stop the WebSocket client"""
         log.info("[TikTokBridge] Stopping TikTok bridge client...")
         self.is_running = False
+        self._wake_event.set()
         
         if self.ws:
             self.ws.close()
@@ -107,88 +136,84 @@ class TikTokBridgeClient:
         if self.connection_thread and self.connection_thread.is_alive():
             self.connection_thread.join(timeout=5)
             
-        if self.auto_reconnect_thread and self.auto_reconnect_thread.is_alive():
-            self.auto_reconnect_thread.join(timeout=2)
-            
     def _run_connection(self) -> None:
-        """Run the WebSocket connection with automatic reconnection"""
-        while self.is_running and self.current_retries < self.max_retries:
+        """Run the WebSocket connection, reconnecting until the client is stopped"""
+        self.current_retries = 0
+        
+        while self.is_running:
+            # Anything that wakes the thread from here on is handled by this attempt
+            self._wake_event.clear()
+            current_time = time.time()
+            
+            # Only log connection attempts for first try or after significant delays
+            if self.current_retries == 0 or current_time - self.last_retry_time >= self.max_retry_delay:
+                log.info(f"[TikTokBridge] Attempting to connect to {self.url}")
+            self.last_retry_time = current_time
+            
             try:
-                # Check if enough time has passed since last retry (minimum 1 minute)
-                current_time = time.time()
-                time_since_last_retry = current_time - self.last_retry_time
-                
-                if self.current_retries > 0 and time_since_last_retry < self.max_retry_delay:
-                    # Wait for the remaining time to reach 1 minute
-                    wait_time = self.max_retry_delay - time_since_last_retry
-                    if self.is_running:
-                        time.sleep(wait_time)
-                    continue
-                
-                # Only log connection attempts for first try or after significant delays
-                if self.current_retries == 0 or time_since_last_retry >= self.max_retry_delay:
-                    log.info(f"[TikTokBridge] Attempting to connect to {self.url}")
-                
-                self.last_retry_time = current_time
-                
                 # Create WebSocket connection
                 self.ws = websocket.WebSocketApp(
                     self.url,
                     on_open=self._on_open,
                     on_message=self._on_message,
                     on_error=self._on_error,
-                    on_close=self._on_close
+                    on_close=self._on_close,
+                    on_pong=self._on_pong
                 )
                 
-                # Start the connection (this will block until connection is closed)
-                self.ws.run_forever()
-                
-                # If we get here, connection was closed
-                if self.is_running:
-                    self.current_retries += 1
-                    if self.current_retries < self.max_retries:
-                        # Use exponential backoff with max delay of 60 seconds
-                        delay = min(self.retry_delay * (2 ** (self.current_retries - 1)), self.max_retry_delay)
-                        log.info(f"[TikTokBridge] Connection lost. Will retry in {delay} seconds... ({self.current_retries}/{self.max_retries})")
-                        time.sleep(delay)
-                    else:
-                        log.info("[TikTokBridge] Max retries reached. Stopping TikTok bridge client.")
-                        # Notify about connection failure
-                        if self.on_connection_callback:
-                            try:
-                                self.on_connection_callback(False, "Failed to connect to TikTok bridge after maximum retry attempts")
-                            except Exception as e:
-                                log.error(f"Error in connection callback: {e}")
-                        break
-                        
+                # Start the connection (this will block until connection is closed or the heartbeat times out)
+                self.ws.run_forever(ping_interval=self.heartbeat_interval, ping_timeout=self.heartbeat_timeout)
             except Exception as e:
-                # Handle different types of connection errors
-                current_time = time.time()
-                time_since_last_retry = current_time - self.last_retry_time
-                
-                # Determine error type and create appropriate user message
-                error_message = self._get_user_friendly_error_message(e)
-                
-                # Only log and notify on first attempt or after significant delays
-                if self.current_retries == 0 or time_since_last_retry >= self.max_retry_delay:
-                    log.error(f"[TikTokBridge] Connection error: {e}")
-                    
-                    # Notify user about the connection error (only on first attempt to avoid spam)
-                    if self.current_retries == 0 and self.on_connection_callback:
-                        try:
-                            self.on_connection_callback(False, error_message)
-                        except Exception as callback_error:
-                            log.error(f"Error in connection callback: {callback_error}")
+                self._report_connection_error(e)
+            
+            self.is_connected = False
+            if not self.is_running:
+                break
+            
+            self.current_retries += 1
+            if self.current_retries == self.max_retries:
+                log.info(f"[TikTokBridge] Could not reach the bridge after {self.max_retries} attempts")
+                # Notify about connection failure
+                if self.on_connection_callback:
+                    try:
+                        self.on_connection_callback(False, "Failed to connect to TikTok bridge after maximum retry attempts")
+                    except Exception as e:
+                        log.error(f"Error in connection callback: {e}")
+                if not self.auto_reconnect_enabled:
+                    log.info("[TikTokBridge] Auto-reconnection is disabled. Stopping TikTok bridge client.")
+                    break
+            
+            delay = self._get_retry_delay()
+            if self.current_retries == 1:
+                log.info(f"[TikTokBridge] Connection lost. Will retry in {delay:.2f} seconds...")
+            
+            # Returns early when force_reconnect or stop is called
+            if self._wake_event.wait(delay):
+                self.current_retries = 0
                 
-                self.current_retries += 1
-                if self.is_running and self.current_retries < self.max_retries:
-                    # Use exponential backoff with max delay of 60 seconds
-                    delay = min(self.retry_delay * (2 ** (self.current_retries - 1)), self.max_retry_delay)
-                    time.sleep(delay)
-                    
         self.is_running = False
         self.is_connected = False
     
+    def _get_retry_delay(self) -> float:
+        """Delay before the next connection attempt, with jitter so clients do not retry in lockstep"""
+        if time.monotonic() < self._restart_deadline:
+            delay = self.restart_retry_delay
+        else:
+            delay = min(self.retry_delay * (2 ** (self.current_retries - 1)), self.max_retry_delay)
+        return delay * (1.0 - self.retry_jitter * random.random())
+    
+    def _report_connection_error(self, error: Exception) -> None:
+        """Log a connection error and tell the player about it on the first attempt"""
+        # Only log and notify on first attempt to avoid spam
+        if self.current_retries == 0:
+            log.error(f"[TikTokBridge] Connection error: {error}")
+            
+            if self.on_connection_callback:
+                try:
+                    self.on_connection_callback(False, self._get_user_friendly_error_message(error))
+                except Exception as callback_error:
+                    log.error(f"Error in connection callback: {callback_error}")
+    
     def _get_user_friendly_error_message(self, error: Exception) -> str:
         """Convert technical errors into user-friendly messages"""
         error_name = type(error).__name__
@@ -215,7 +240,14 @@ class TikTokBridgeClient:
         log.info("[TikTokBridge] ✅ Connected to TikTok bridge!")
         self.is_connected = True
         self.current_retries = 0  # Reset retry counter on successful connection
+        self._restart_deadline = 0.0
+        self.last_frame_time = time.monotonic()
         self.last_successful_connection = time.time()  # Track successful connection time
+
+        # Offer the compact protocol, bridges that do not know it keep sending JSON
+        self.protocol = JSON_PROTOCOL
+        self._compact_decoder.reset()
+        self._send_hello()
         
         # Notify about successful connection
         if self.on_connection_callback:
@@ -224,32 +256,84 @@ class TikTokBridgeClient:
             except Exception as e:
                 log.error(f"Error in connection callback: {e}")
         
-    def _on_message(self, ws, message: str) -> None:
+    def _on_message(self, ws, message: Union[str, bytes]) -> None:
         """Called when a message is received from the bridge"""
+        self.last_frame_time = time.monotonic()
+        self._message_received_at = time.time() * 1000.0
         try:
-            data = json.loads(message)
-            event_type = data.get('type', 'unknown')
-            
-            log.debug(f"Received event: {event_type}")
-            
-            if event_type == 'sims_action' and self.on_action_callback:
-                # Call the action callback
-                self.on_action_callback(data)
-            elif event_type == 'like':
-                # Like events are now handled by the bridge service
-                log.debug(f"Like event received but not processed (handled by bridge): {data.get('user', 'unknown')}")
-            elif event_type == 'connection':
-                log.info(f"Bridge connection message: {data.get('message', '')}")
+            if isinstance(message, bytes):
+                # Binary frames carry batches of events in the compact protocol
+                for data in self._compact_decoder.decode(message):
+                    self._handle_event(data)
             else:
-                log.debug(f"Unhandled event type: {event_type}")
-                
+                self._handle_event(json.loads(message))
+
         except json.JSONDecodeError as e:
             log.error(f"Failed to parse message from bridge: {e}")
+        except TikTokCompactProtocolError as e:
+            log.error(f"Failed to decode compact message from bridge: {e}")
         except Exception as e:
             log.error(f"Error handling bridge message: {e}")
-            
+
+    def _handle_event(self, data: Dict[str, Any]) -> None:
+        """Handle a single decoded event from the bridge"""
+        event_type = data.get('type', 'unknown')
+
+        log.debug(f"Received event: {event_type}")
+
+        if event_type == 'sims_action' and self.on_action_callback:
+            self._dispatch_action(data)
+        elif event_type == 'sims_action_batch' and self.on_action_callback:
+            # Several actions the bridge collected within its batching window
+            for action_data in data.get('actions', []):
+                self._dispatch_action(action_data)
+        elif event_type == 'connection':
+            log.info(f"Bridge connection message: {data.get('message', '')}")
+        elif event_type == 'protocol':
+            self.protocol = data.get('protocol', JSON_PROTOCOL)
+            self.sequence_tracker.start_session(data.get('sessionId'))
+            like_tracking = data.get('likeTracking')
+            if like_tracking:
+                get_like_aggregator().configure(like_tracking.get('threshold', 100), like_tracking.get('timeout', 60))
+            log.info(f"[TikTokBridge] Using {self.protocol} protocol")
+        elif event_type == 'get_action_registry':
+            self.send_action_registry()
+        else:
+            log.debug(f"Unhandled event type: {event_type}")
+
+    def _dispatch_action(self, action_data: Dict[str, Any]) -> None:
+        """Pass an action to the action callback unless it was already received"""
+        seq = action_data.get('seq')
+        if seq is not None and self.sequence_tracker.is_duplicate(seq):
+            log.debug(f"Skipping duplicate action {seq}: {action_data.get('action', 'unknown')} from {action_data.get('user', 'unknown')}")
+            return
+
+        action_data.setdefault('trace', {})['modReceivedAt'] = self._message_received_at
+        # Only remembered once queued, an action dropped by a full queue is replayed after the next reconnect
+        if self.on_action_callback(action_data) is not False and seq is not None:
+            self.sequence_tracker.record(seq)
+
+    def _on_pong(self, ws, data) -> None:
+        """Called when the bridge answers a heartbeat ping"""
+        self.last_frame_time = time.monotonic()
+        if ws.last_ping_tm:
+            self.rtt_histogram.record((time.time() - ws.last_ping_tm) * 1000.0)
+
+    @property
+    def seconds_since_last_frame(self) -> Optional[float]:
+        """Time since anything was received from the bridge, None if never connected"""
+        if not self.last_frame_time:
+            return None
+        return time.monotonic() - self.last_frame_time
+
     def _on_error(self, ws, error) -> None:
         """Called when a WebSocket error occurs"""
+        if isinstance(error, websocket.WebSocketTimeoutException):
+            # Half-open connection, reconnect straight away instead of waiting for the backoff
+            log.info(f"[TikTokBridge] Bridge missed its heartbeat for {self.heartbeat_timeout}s, reconnecting")
+            self._wake_event.set()
+            return
+
         try:
             # Handle errors gracefully and provide user feedback when appropriate
             current_time = time.time()
@@ -282,81 +366,104 @@ class TikTokBridgeClient:
             log.info("[TikTokBridge] Disconnected from TikTok bridge")
         
         self.is_connected = False
+
+        # The bridge is restarting, so the next one will be listening again shortly
+        if close_status_code == 1012:
+            log.info("[TikTokBridge] Bridge is restarting, reconnecting as soon as it is back")
+            self._restart_deadline = time.monotonic() + self.restart_retry_window
         
+    def _send_hello(self) -> None:
+        """Tell the bridge which wire protocols this client understands"""
+        hello: Dict[str, Any] = {
+            'type': 'hello',
+            'protocols': [COMPACT_PROTOCOL, JSON_PROTOCOL] if self.compact_protocol_enabled else [JSON_PROTOCOL]
+        }
+        # Ask the bridge to replay whatever was missed while disconnected
+        if self.sequence_tracker.session_id is not None:
+            hello['resume'] = {
+                'sessionId': self.sequence_tracker.session_id,
+                'lastSeq': self.sequence_tracker.resume_seq if self.sequence_tracker.resume_seq is not None else 0
+            }
+
+        try:
+            self.ws.send(json.dumps(hello))
+        except Exception as e:
+            log.error(f"Failed to send hello to bridge: {e}")
+
     def send_response(self, action_data: Dict[str, Any], action_description: str) -> None:
-        """Send a response back to the bridge (optional)"""
+        """Queue a response for an applied action, sent with the next ack"""
         if not self.is_connected or not self.ws:
             return
-            
-        response = {
-            'type': 'response',
-            'actionProcessed': action_data.get('action', 'unknown'),
+
+        if 'seqs' in action_data:
+            seqs = action_data['seqs']
+        else:
+            seqs = [action_data['seq']] if 'seq' in action_data else []
+
+        self._pending_responses.append({
+            'seqs': seqs,
+            'action': action_data.get('action', 'unknown'),
             'user': action_data.get('user', 'unknown'),
-            'description': action_description,
+            'count': action_data.get('count', 1),
+            'description': action_description
+        })
+
+    def flush_responses(self) -> None:
+        """Send one cumulative ack covering every response queued since the last flush"""
+        if not self._pending_responses:
+            return
+
+        responses = self._pending_responses
+        self._pending_responses = []
+        if not self.is_connected or not self.ws:
+            return
+
+        ack = {
+            'type': 'ack',
+            'seqs': sorted(seq for response in responses for seq in response['seqs']),
+            'actions': responses,
+            'latency': get_latency_tracer().to_dict(),
             'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
         }
-        
+
+        try:
+            self.ws.send(json.dumps(ack))
+            log.debug(f"[TikTokBridge] Sent ack to bridge for {len(responses)} action(s)")
+        except Exception as e:
+            log.error(f"Failed to send ack to bridge: {e}")
+
+    def send_action_registry(self) -> None:
+        """Send the metadata of every registered action so the bridge can validate its gift mappings"""
+        if not self.is_connected or not self.ws:
+            return
+
+        response = {
+            'type': 'action_registry',
+            'actions': TikTokActionRegistry.get_metadata(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+        }
+
         try:
             self.ws.send(json.dumps(response))
-            log.debug(f"[TikTokBridge] Sent response to bridge: {action_description}")
+            log.debug(f"[TikTokBridge] Sent action registry to bridge ({len(response['actions'])} actions)")
         except Exception as e:
-            log.error(f"Failed to send response to bridge: {e}")
-    
+            log.error(f"Failed to send action registry to bridge: {e}")
+
     def force_reconnect(self) -> bool:
         """Force a reconnection attempt"""
         log.info("[TikTokBridge] 🔄 Forcing reconnection to bridge service...")
         
-        # Close current connection if it exists
+        if not self.is_running:
+            return self.start()
+        
+        # Wake the connection thread if it is waiting, or end the current connection so it reconnects
+        self._wake_event.set()
         if self.ws:
             try:
                 self.ws.close()
             except:
                 pass
-        
-        self.is_connected = False
-        self.current_retries = 0
-        
-        # Start a new connection attempt
-        if not self.is_running:
-            return self.start()
-        else:
-            # If already running, the auto-reconnect will handle it
-            log.info("[TikTokBridge] Reconnection will be handled by auto-reconnect system")
-            return True
-    
-    def _auto_reconnect_monitor(self) -> None:
-        """Monitor connection and attempt reconnection every 30 seconds if disconnected"""
-        log.info("[TikTokBridge] 🔄 Auto-reconnection monitor started (checking every 30 seconds)")
-        
-        while self.is_running:
-            try:
-                time.sleep(self.auto_reconnect_interval)
-                
-                if not self.is_running:
-                    break
-                
-                # Check if we're disconnected
-                if not self.is_connected:
-                    current_time = time.time()
-                    time_since_last_connection = current_time - self.last_successful_connection
-                    
-                    # Only attempt reconnection if we've been disconnected for at least 5 seconds
-                    # and it's been at least 30 seconds since last successful connection
-                    if time_since_last_connection >= 5:
-                        log.info("[TikTokBridge] 🔄 Auto-reconnection: Attempting to reconnect...")
-                        
-                        # Reset retries for auto-reconnection attempt
-                        self.current_retries = 0
-                        
-                        # The main connection loop will handle the actual reconnection
-                        if not self.connection_thread or not self.connection_thread.is_alive():
-                            self.connection_thread = threading.Thread(target=self._run_connection, daemon=True)
-                            self.connection_thread.start()
-                    
-            except Exception as e:
-                log.error(f"[TikTokBridge] Error in auto-reconnect monitor: {e}")
-                
-        log.info("[TikTokBridge] Auto-reconnection monitor stopped")
+        return True
 
 
 # Global instance
@@ -10,7 +10,16 @@ from sims4communitylib.services.commands.common_console_command_output import Co
 
 from sims4communitylib.utils.sims.common_sim_utils import CommonSimUtils
 from sims_tik_tok_mod.modinfo import ModInfo
+from sims_tik_tok_mod.notifications.tiktok_notification_aggregator import get_notification_aggregator
+from sims_tik_tok_mod.tiktok_action_dispatcher import get_action_dispatcher
+from sims_tik_tok_mod.tiktok_asset_catalog import TikTokAssetCatalog, get_asset_catalog
 from sims_tik_tok_mod.tiktok_bridge_client import get_bridge_client
+from sims_tik_tok_mod.tiktok_latency_tracer import get_latency_tracer
+from sims_tik_tok_mod.tiktok_like_aggregator import get_like_aggregator
+from sims_tik_tok_mod.tiktok_sim_pool import get_sim_pool
+from sims_tik_tok_mod.tiktok_timer_wheel import get_timer_wheel
+from sims_tik_tok_mod.tiktok_vfx_manager import get_vfx_manager
+from sims_tik_tok_mod.tiktok_viewer_registry import get_viewer_registry
 from sims_tik_tok_mod.utils.cas_utils import TikTokCASUtils
 from sims_tik_tok_mod.utils.vfx_utils import TikTokVFXUtils
 from sims_tik_tok_mod.utils.animation_utils import TikTokAnimationUtils
@@ -67,9 +76,17 @@ class TikTokCheatCommands:
             output(f"   🔗 Connected: {'✅ Yes' if bridge_client.is_connected else '❌ No'}")
             output(f"   🔄 Running: {'✅ Yes' if bridge_client.is_running else '❌ No'}")
             output(f"   🌐 URL: {bridge_client.url}")
+            output(f"   📦 Protocol: {bridge_client.protocol}")
+            output(f"   🔢 Last action sequence: {bridge_client.sequence_tracker.last_seq} ({bridge_client.sequence_tracker.duplicate_count} duplicates skipped)")
             output(f"   🔁 Auto-reconnect: {'✅ Enabled' if bridge_client.auto_reconnect_enabled else '❌ Disabled'}")
-            output(f"   ⏱️  Auto-reconnect interval: {bridge_client.auto_reconnect_interval}s")
+            output(f"   ⏱️  Retry backoff: {bridge_client.retry_delay}s up to {bridge_client.max_retry_delay}s")
             output(f"   🔢 Current retries: {bridge_client.current_retries}")
+            output(f"   💓 Heartbeat RTT: {bridge_client.rtt_histogram.summary()}")
+            seconds_since_last_frame = bridge_client.seconds_since_last_frame
+            if seconds_since_last_frame is not None:
+                output(f"   📡 Last frame from bridge: {seconds_since_last_frame:.1f}s ago")
+            else:
+                output("   📡 Last frame from bridge: Never")
             
             if bridge_client.last_successful_connection > 0:
                 import time
@@ -77,11 +94,130 @@ class TikTokCheatCommands:
                 output(f"   ⏰ Last successful connection: {time_since_connection}s ago")
             else:
                 output("   ⏰ Last successful connection: Never")
+
+            action_dispatcher = get_action_dispatcher()
+            output(f"   📥 Pending actions: {action_dispatcher.queue_depth}")
+            output(f"   ✅ Applied actions: {action_dispatcher.processed_count}")
+            output(f"   🗑️  Dropped actions: {action_dispatcher.dropped_count}")
+            output(f"   🧩 Merged repeat actions: {action_dispatcher.coalescer.merged_count}")
+            output(f"   🔔 Pending gift notifications: {get_notification_aggregator().pending_count}")
+            output(f"   ⏳ Tick budget: {action_dispatcher.tick_budget_ms}ms")
+            for class_queue in action_dispatcher.class_queues:
+                output(
+                    f"      {class_queue.cost_class.name}: {len(class_queue.pending)} pending, "
+                    f"avg wait {class_queue.average_wait_ms:.0f}ms, max wait {class_queue.max_wait_ms:.0f}ms, "
+                    f"dropped {class_queue.dropped_count}"
+                )
+
+            sim_pool = get_sim_pool()
+            output(
+                f"   🧍 Pre-generated Sims: {sim_pool.pooled_count} ready "
+                f"({sim_pool.hit_count} used from pool, {sim_pool.miss_count} created on demand)"
+            )
+
+            output(f"   ⏲️  Timed effects pending: {get_timer_wheel().pending_count}")
+            vfx_manager = get_vfx_manager()
+            output(
+                f"   ✨ Live effects: {vfx_manager.live_count} ({vfx_manager.refreshed_count} extended instead of stacked, "
+                f"{vfx_manager.reused_count} reused, {vfx_manager.idle_count} idle)"
+            )
+            viewer_registry = get_viewer_registry()
+            output(f"   👥 Known viewers: {viewer_registry.viewer_count} ({viewer_registry.viewers_with_sims_count} with their own Sim)")
+            like_aggregator = get_like_aggregator()
+            output(
+                f"   ❤️  Likes: {like_aggregator.total_likes} from {like_aggregator.viewer_count} recent viewers, "
+                f"{like_aggregator.reward_count} rewards (every {like_aggregator.threshold} likes or {like_aggregator.timeout_seconds:g}s)"
+            )
+            top_likers = like_aggregator.top_likers()
+            if top_likers:
+                output(f"      Top likers: {', '.join(f'{nickname} ({likes})' for nickname, likes in top_likers)}")
                 
         except Exception as e:
             output(f"❌ Error getting status: {e}")
             log.error(f"Status cheat command error: {e}")
 
+    @staticmethod
+    @CommonConsoleCommand(
+        ModInfo.get_identity(),
+        'tiktok.set_tick_budget',
+        'Set how many milliseconds per game tick may be spent applying TikTok actions',
+        command_arguments=(
+            CommonConsoleCommandArgument('budget_ms', 'float', 'Milliseconds per tick', is_optional=False),
+        ),
+        show_with_help_command=False
+    )
+    def _tiktok_set_tick_budget_cheat(output: CommonConsoleCommandOutput, budget_ms: float):
+        """Cheat command to change the per-tick action budget"""
+        try:
+            if budget_ms <= 0:
+                output("❌ Tick budget must be greater than 0")
+                return
+
+            action_dispatcher = get_action_dispatcher()
+            action_dispatcher.tick_budget_ms = budget_ms
+            output(f"⏳ Tick budget set to {budget_ms}ms")
+            log.info(f"Cheat command: Tick budget set to {budget_ms}ms")
+
+        except Exception as e:
+            output(f"❌ Error setting tick budget: {e}")
+            log.error(f"Set tick budget cheat command error: {e}")
+
+    @staticmethod
+    @CommonConsoleCommand(
+        ModInfo.get_identity(),
+        'tiktok.set_notification_window',
+        'Set how many seconds of gifts are summarised into one notification',
+        command_arguments=(
+            CommonConsoleCommandArgument('window_seconds', 'float', 'Seconds per summary notification', is_optional=False),
+        ),
+        show_with_help_command=False
+    )
+    def _tiktok_set_notification_window_cheat(output: CommonConsoleCommandOutput, window_seconds: float):
+        """Cheat command to change the gift notification summary window"""
+        try:
+            if window_seconds < 0:
+                output("❌ Notification window cannot be negative")
+                return
+
+            get_notification_aggregator().window_seconds = window_seconds
+            output(f"🔔 Gift notifications will be summarised every {window_seconds}s")
+            log.info(f"Cheat command: Notification window set to {window_seconds}s")
+
+        except Exception as e:
+            output(f"❌ Error setting notification window: {e}")
+            log.error(f"Set notification window cheat command error: {e}")
+
+    @staticmethod
+    @CommonConsoleCommand(
+        ModInfo.get_identity(),
+        'tiktok.latency',
+        'Show gift latency per stage, from TikTok to the in-game effect',
+        command_arguments=(
+            CommonConsoleCommandArgument('reset', 'bool', 'Clear the collected samples afterwards', is_optional=True, default_value=False),
+        ),
+        show_with_help_command=False
+    )
+    def _tiktok_latency_cheat(output: CommonConsoleCommandOutput, reset: bool = False):
+        """Cheat command to show gift latency percentiles per stage"""
+        try:
+            latency_tracer = get_latency_tracer()
+
+            output("⏱️  TikTok Gift Latency:")
+            for stage, histogram in latency_tracer.histograms.items():
+                stats = histogram.to_dict()
+                if stats['count'] == 0:
+                    output(f"   {stage}: no samples")
+                    continue
+                output(f"   {stage}: p50 {stats['p50']:.1f}ms, p95 {stats['p95']:.1f}ms, p99 {stats['p99']:.1f}ms, max {stats['max']:.1f}ms ({stats['count']} samples)")
+
+            if reset:
+                latency_tracer.clear()
+                output("🧹 Latency samples cleared")
+
+        except Exception as e:
+            output(f"❌ Error showing latency: {e}")
+            log.error(f"Latency cheat command error: {e}")
+
     @staticmethod
     @CommonConsoleCommand(
         ModInfo.get_identity(),
@@ -233,6 +369,14 @@ class TikTokCheatCommands:
     def _tiktok_test_vfx_cheat(output: CommonConsoleCommandOutput, vfx_name: str = 'ep1_givebirth_alien', joint_name: str = 'b__Head__'):
         """Cheat command to test playing a VFX on a sim"""
         try:
+            vfx_catalog = get_asset_catalog().vfx
+            if vfx_catalog is not None and vfx_name not in vfx_catalog:
+                output(f"❌ Unknown VFX {vfx_name}")
+                suggestions = vfx_catalog.search(vfx_name, limit=5)
+                if suggestions:
+                    output(f"Did you mean: {', '.join(suggestions)}")
+                return
+
             output(f"🐕 Playing VFX {vfx_name}")
             log.info(f"Test VFX command: Playing VFX {vfx_name}")
             
@@ -357,12 +501,52 @@ class TikTokCheatCommands:
                 log.info("Test animation command: Success")
             else:
                 output(f"❌ Failed to start animation: {animation_name}")
+                animation_catalog = get_asset_catalog().animations
+                if animation_catalog is not None and animation_name not in animation_catalog:
+                    suggestions = animation_catalog.search(animation_name, limit=5)
+                    if suggestions:
+                        output(f"Did you mean: {', '.join(suggestions)}")
                 log.error("Test animation command: Failed")
                 
         except Exception as e:
             output(f"❌ Error during animation test: {e}")
             log.error(f"Test animation cheat command error: {e}")
 
+    @staticmethod
+    @CommonConsoleCommand(
+        ModInfo.get_identity(),
+        'tiktok.find_asset',
+        'Search the animation or VFX names known to the mod',
+        command_arguments=(
+            CommonConsoleCommandArgument('kind', 'str', 'animation or vfx', is_optional=False),
+            CommonConsoleCommandArgument('query', 'str', 'part of a name', is_optional=False),
+        ),
+        show_with_help_command=False
+    )
+    def _tiktok_find_asset_cheat(output: CommonConsoleCommandOutput, kind: str, query: str):
+        """Cheat command to look up asset names for the test commands and gift mappings"""
+        try:
+            kind = kind.lower()
+            if kind not in (TikTokAssetCatalog.ANIMATION, TikTokAssetCatalog.VFX):
+                output(f"❌ Unknown asset kind '{kind}', use {TikTokAssetCatalog.ANIMATION} or {TikTokAssetCatalog.VFX}")
+                return
+
+            section = get_asset_catalog().get_section(kind)
+            if section is None:
+                output("❌ The asset catalog is not available, check the log")
+                return
+
+            matches = section.search(query, limit=10)
+            if not matches:
+                output(f"No {kind} names match '{query}'")
+                return
+            output(f"{kind} names matching '{query}':")
+            for name in matches:
+                output(f"  {name} ({section.get_package(name) or 'unknown package'})")
+        except Exception as e:
+            output(f"❌ Error searching assets: {e}")
+            log.error(f"Find asset cheat command error: {e}")
+
     @staticmethod
     @CommonConsoleCommand(
         ModInfo.get_identity(),
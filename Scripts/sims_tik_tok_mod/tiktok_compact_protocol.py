@@ -0,0 +1,112 @@
+"""
+TikTok Compact Protocol for Sims 4 Mod
+Decodes the binary frames the bridge sends once the compact protocol has been negotiated
+"""
+import struct
+from typing import Dict, Any, List
+
+COMPACT_PROTOCOL = 'compact-v1'
+JSON_PROTOCOL = 'json'
+
+_FRAME_MAGIC = 0xc5
+_FRAME_VERSION = 1
+# magic, version, record count, bridge send time
+_FRAME_HEADER = struct.Struct('>BBHd')
+
+_RECORD_STRING = 1
+_RECORD_SIMS_ACTION = 2
+
+_STRING_HEADER = struct.Struct('>HH')
+# sequence, bridge receive time, user, nickname, action, gift name, gift id, diamond count, count, flags
+_SIMS_ACTION = struct.Struct('>IdHHHHHIIB')
+
+_FLAG_IS_MANUAL = 0x01
+# The gift had no diamond count, left out so the mod applies its default as it does for JSON
+_FLAG_NO_DIAMOND_COUNT = 0x02
+
+# Reserved string id meaning "no string"
+_NO_STRING = 0xffff
+
+
+class TikTokCompactProtocolError(Exception):
+    """Raised when a binary frame from the bridge cannot be decoded"""
+
+
+class TikTokCompactDecoder:
+    """Decodes compact frames into the same event dictionaries the JSON protocol produces"""
+
+    def __init__(self):
+        # String table for the current connection, indexed by string id
+        self._strings: List[str] = []
+
+    def reset(self) -> None:
+        """Forget the string table, must be called for every new connection"""
+        self._strings = []
+
+    def decode(self, data: bytes) -> List[Dict[str, Any]]:
+        """Decode a binary frame into a list of events"""
+        try:
+            magic, version, record_count, sent_at = _FRAME_HEADER.unpack_from(data, 0)
+        except struct.error as e:
+            raise TikTokCompactProtocolError(f"Truncated frame header: {e}")
+        if magic != _FRAME_MAGIC or version != _FRAME_VERSION:
+            raise TikTokCompactProtocolError(f"Unsupported frame (magic {magic:#x}, version {version})")
+
+        strings = self._strings
+        events = []
+        offset = _FRAME_HEADER.size
+        try:
+            for _ in range(record_count):
+                record_type = data[offset]
+                offset += 1
+
+                if record_type == _RECORD_SIMS_ACTION:
+                    (seq, received_at, user_id, nickname_id, action_id, gift_name_id, gift_id_id,
+                     diamond_count, count, flags) = _SIMS_ACTION.unpack_from(data, offset)
+                    offset += _SIMS_ACTION.size
+
+                    context: Dict[str, Any] = {}
+                    if not flags & _FLAG_NO_DIAMOND_COUNT:
+                        context['diamondCount'] = diamond_count
+                    if gift_name_id != _NO_STRING:
+                        context['giftName'] = strings[gift_name_id]
+                    if gift_id_id != _NO_STRING:
+                        context['giftId'] = strings[gift_id_id]
+                    if flags & _FLAG_IS_MANUAL:
+                        context['isManual'] = True
+
+                    event = {
+                        'type': 'sims_action',
+                        'user': strings[user_id],
+                        'action': strings[action_id],
+                        'count': count,
+                        'context': context
+                    }
+                    # Sequences start at 1, 0 marks an action sent best effort without one
+                    if seq:
+                        event['seq'] = seq
+                    if received_at:
+                        event['trace'] = {'bridgeReceivedAt': received_at, 'bridgeSentAt': sent_at}
+                    if nickname_id != _NO_STRING:
+                        event['userNickname'] = strings[nickname_id]
+                    events.append(event)
+
+                elif record_type == _RECORD_STRING:
+                    string_id, length = _STRING_HEADER.unpack_from(data, offset)
+                    offset += _STRING_HEADER.size
+                    value = data[offset:offset + length].decode('utf-8', 'replace')
+                    offset += length
+
+                    if string_id == len(strings):
+                        strings.append(value)
+                    elif string_id < len(strings):
+                        strings[string_id] = value
+                    else:
+                        raise TikTokCompactProtocolError(f"String id {string_id} defined out of order")
+
+                else:
+                    raise TikTokCompactProtocolError(f"Unknown record type {record_type}")
+        except (IndexError, struct.error) as e:
+            raise TikTokCompactProtocolError(f"Malformed frame: {e}")
+
+        return events
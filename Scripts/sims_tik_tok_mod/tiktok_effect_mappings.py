@@ -1,7 +1,6 @@
-from sims4communitylib.utils.sims.common_buff_utils import CommonBuffUtils
+import time
 from sims4communitylib.utils.sims.common_household_utils import CommonHouseholdUtils
 from sims4communitylib.utils.sims.common_sim_currency_utils import CommonSimCurrencyUtils
-from sims4communitylib.utils.sims.common_relationship_utils import CommonRelationshipUtils
 from sims4communitylib.enums.relationship_tracks_enum import CommonRelationshipTrackId
 from sims4communitylib.utils.sims.common_sim_interaction_utils import CommonSimInteractionUtils
 from sims_tik_tok_mod.utils.cas_utils import TikTokCASUtils
@@ -10,90 +9,136 @@ from sims4communitylib.enums.common_currency_modify_reasons import CommonCurrenc
 from sims4communitylib.enums.common_species import CommonSpecies
 from sims4communitylib.utils.common_log_registry import CommonLogRegistry
 from sims4communitylib.utils.sims.common_sim_utils import CommonSimUtils
+from sims_tik_tok_mod.enums.action_cost_class import TikTokActionCostClass
+from sims_tik_tok_mod.enums.action_target_scope import TikTokActionTargetScope
 from sims_tik_tok_mod.modinfo import ModInfo
+from sims_tik_tok_mod.tiktok_action_coalescer import TikTokActionCoalescer
+from sims_tik_tok_mod.tiktok_action_registry import TikTokActionRegistry
+from sims_tik_tok_mod.tiktok_latency_tracer import get_latency_tracer
+from sims_tik_tok_mod.tiktok_like_aggregator import get_like_aggregator
+from sims_tik_tok_mod.utils.group_effect_utils import TikTokGroupEffectUtils
 from sims_tik_tok_mod.utils.vfx_utils import TikTokVFXUtils
 from sims_tik_tok_mod.utils.pose_player_utils import TikTokPosePlayerUtils
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from sims.sim_info import SimInfo
 
 log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokEffectMappings')  # type: ignore[attr-defined]
 log.enable()
 
+HEART_SPIN_VFX = 'attraction_first_attraction_heart_spin'
+ALIEN_BIRTH_VFX = 'ep1_givebirth_alien'
+
 class TikTokEffectMappings:
-    ACTION_DESCRIPTIONS = {
-        'flirty_compliment': 'Applied flirty buff to all household members!',
-        'show_off': 'Active Sim is showing off with confidence!',
-        'romantic_hug': 'Active Sim is giving romantic hugs to nearby Sims!',
-        'create_sim': 'Created a Sim for the gifter!',
-        'create_small_dog_sim': 'Created a Small Dog for the gifter!',
-        'create_large_dog_sim': 'Created a Large Dog for the gifter!',
-        'create_cat_sim': 'Created a Cat for the gifter!',
-        'default': 'Thank you for the gift!'
-    }
 
     @staticmethod
-    def apply_action_effect(user_nickname: str, action: str, count: int, context: Dict[str, Any]) -> None:
+    def apply_action_effect(user_nickname: str, action: str, count: int, context: Dict[str, Any], trace: Optional[Dict[str, float]] = None) -> None:
         """Apply the actual game effect for a Sims action"""
-        if action == 'create_sim':
-            TikTokCASUtils.create_sim_and_open_cas(user_nickname)
+        definition = TikTokActionRegistry.get(action)
+        if definition is None:
+            log.info(f"No handler registered for action '{action}' x{count}")
+            return
 
-        elif action == 'create_small_dog_sim':
-            TikTokCASUtils.create_non_household_animal_sim(user_nickname, CommonSpecies.SMALL_DOG)
+        definition.handler(user_nickname, count, context)
 
-        elif action == 'create_large_dog_sim':
-            TikTokCASUtils.create_non_household_animal_sim(user_nickname, CommonSpecies.LARGE_DOG)
+        if trace is not None:
+            trace['effectDoneAt'] = time.time() * 1000.0
+            get_latency_tracer().record(trace)
 
-        elif action == 'create_cat_sim':
-            TikTokCASUtils.create_non_household_animal_sim(user_nickname, CommonSpecies.CAT)
+    @staticmethod
+    @TikTokActionRegistry.register(
+        'create_sim',
+        'Created a Sim for the gifter!',
+        cost_class=TikTokActionCostClass.EXPENSIVE,
+        target_scope=TikTokActionTargetScope.NEW_SIM
+    )
+    def _create_sim_action(user_nickname: str, count: int, context: Dict[str, Any]) -> None:
+        TikTokCASUtils.create_sim_and_open_cas(user_nickname, context.get('user'))
 
-        elif action == 'flirty_compliment':
-            TikTokVFXUtils.play_one_shot_on_sim('attraction_first_attraction_heart_spin', joint_name='b__Head__', duration=3)
-            
-            # Apply flirty buff to all sims in household
-            applied_count = 0
-            for sim_info in CommonHouseholdUtils.get_sim_info_of_all_sims_in_active_household_generator():
-                result = CommonBuffUtils.add_buff(sim_info, CommonBuffId.FLIRTY_BY_POTION, buff_reason="Flirty Compliment from TikTok")
-                if result:
-                    applied_count += 1
-                    log.info(f"Applied flirty buff to {sim_info.first_name}")
-                else:
-                    log.error(f"Failed to apply flirty buff to {sim_info.first_name}: {result.reason}")
-            log.info(f"Applied flirty buff to {applied_count} household member(s)")
-        
-        elif action == 'give_money':
-            # Add money to household funds
-            active_household = CommonHouseholdUtils.get_active_household()
-            if active_household:
-                amount = context.get('diamondCount', 10) * 10  # 10 simoleons per diamond
-                active_household.funds.add(amount * count, CommonCurrencyModifyReason.CHEAT)
-                log.info(f"Added {amount * count} simoleons")
-        
-        elif action == 'break_object':
-            # Find and break a random object
-            # Implementation would go here
-            pass
-        
-        elif action == 'show_off':
-            # Apply confident buff and make the active Sim show off
-            TikTokEffectMappings._apply_show_off_action(count)
-        
-        elif action == 'romantic_hug':
-            # Make the active Sim give romantic hugs to nearby Sims
-            TikTokEffectMappings._apply_romantic_hug_action(count)
-        
-        elif action == 'like_reward':
-            # Add simoleons to household for like milestone reward
-            TikTokEffectMappings._add_simoleons_for_like_reward(count, context)
-        
-        elif action == 'hand_heart':
-            # Make the active Sim give a hand heart to nearby Sims
-            TikTokEffectMappings._apply_hand_heart_action(count)
-        
+    @staticmethod
+    @TikTokActionRegistry.register(
+        'create_small_dog_sim',
+        'Created a Small Dog for the gifter!',
+        cost_class=TikTokActionCostClass.EXPENSIVE,
+        target_scope=TikTokActionTargetScope.NEW_SIM
+    )
+    def _create_small_dog_sim_action(user_nickname: str, count: int, context: Dict[str, Any]) -> None:
+        TikTokCASUtils.create_non_household_animal_sim(user_nickname, CommonSpecies.SMALL_DOG)
+
+    @staticmethod
+    @TikTokActionRegistry.register(
+        'create_large_dog_sim',
+        'Created a Large Dog for the gifter!',
+        cost_class=TikTokActionCostClass.EXPENSIVE,
+        target_scope=TikTokActionTargetScope.NEW_SIM
+    )
+    def _create_large_dog_sim_action(user_nickname: str, count: int, context: Dict[str, Any]) -> None:
+        TikTokCASUtils.create_non_household_animal_sim(user_nickname, CommonSpecies.LARGE_DOG)
+
+    @staticmethod
+    @TikTokActionRegistry.register(
+        'create_cat_sim',
+        'Created a Cat for the gifter!',
+        cost_class=TikTokActionCostClass.EXPENSIVE,
+        target_scope=TikTokActionTargetScope.NEW_SIM
+    )
+    def _create_cat_sim_action(user_nickname: str, count: int, context: Dict[str, Any]) -> None:
+        TikTokCASUtils.create_non_household_animal_sim(user_nickname, CommonSpecies.CAT)
+
+    @staticmethod
+    @TikTokActionRegistry.register(
+        'flirty_compliment',
+        'Applied flirty buff to all household members!',
+        target_scope=TikTokActionTargetScope.ACTIVE_HOUSEHOLD,
+        batchable=True,
+        vfx_names=(HEART_SPIN_VFX,)
+    )
+    def _apply_flirty_compliment_action(user_nickname: str, count: int, context: Dict[str, Any]) -> None:
+        TikTokVFXUtils.play_one_shot_on_sim(HEART_SPIN_VFX, joint_name='b__Head__', duration=3)
+
+        # Apply flirty buff to all sims in household
+        result = TikTokGroupEffectUtils.add_buff(
+            list(CommonHouseholdUtils.get_sim_info_of_all_sims_in_active_household_generator()),
+            CommonBuffId.FLIRTY_BY_POTION,
+            buff_reason="Flirty Compliment from TikTok"
+        )
+        if result.failed:
+            log.error(result.summary())
         else:
-            log.info(f"TODO: Apply effect for action '{action}' x{count}")
+            log.info(result.summary())
+
+    @staticmethod
+    @TikTokActionRegistry.register(
+        'give_money',
+        TikTokActionRegistry.DEFAULT_DESCRIPTION,
+        cost_class=TikTokActionCostClass.CHEAP,
+        target_scope=TikTokActionTargetScope.ACTIVE_HOUSEHOLD,
+        batchable=True
+    )
+    def _give_money_action(user_nickname: str, count: int, context: Dict[str, Any]) -> None:
+        # Add money to household funds
+        active_household = CommonHouseholdUtils.get_active_household()
+        if active_household:
+            # Merged actions carry the exact diamond total of every gift they replaced
+            total_diamonds = context.get('totalDiamondCount', context.get('diamondCount', TikTokActionCoalescer.DEFAULT_DIAMOND_COUNT) * count)
+            amount = total_diamonds * 10  # 10 simoleons per diamond
+            active_household.funds.add(amount, CommonCurrencyModifyReason.CHEAT)
+            log.info(f"Added {amount} simoleons")
+
+    @staticmethod
+    @TikTokActionRegistry.register(
+        'break_object',
+        TikTokActionRegistry.DEFAULT_DESCRIPTION,
+        cost_class=TikTokActionCostClass.CHEAP,
+        target_scope=TikTokActionTargetScope.NONE
+    )
+    def _break_object_action(user_nickname: str, count: int, context: Dict[str, Any]) -> None:
+        # Find and break a random object
+        # Implementation would go here
+        pass
 
     @staticmethod
-    def _apply_hand_heart_action(count: int) -> None:
+    @TikTokActionRegistry.register('hand_heart', TikTokActionRegistry.DEFAULT_DESCRIPTION, vfx_names=(ALIEN_BIRTH_VFX,))
+    def _apply_hand_heart_action(user_nickname: str, count: int, context: Dict[str, Any]) -> None:
         """Apply hand heart action - makes the active Sim give a hand heart to nearby Sims"""
         try:
             sim = CommonSimUtils.get_active_sim()
@@ -101,13 +146,14 @@ class TikTokEffectMappings:
                 log.error("No active sim found for hand heart action")
                 return
 
-            TikTokVFXUtils.play_one_shot_on_sim('ep1_givebirth_alien', joint_name='b__Root__')
+            TikTokVFXUtils.play_one_shot_on_sim(ALIEN_BIRTH_VFX, joint_name='b__Root__')
             TikTokPosePlayerUtils.play_pose_by_name(sim, 'flowurtheweirdo:PosePack_202302100125254978_set_1', pose_duration=1.4)
         except Exception as e:
             log.error(f"Error applying hand heart action: {e}")
 
     @staticmethod
-    def _apply_show_off_action(count: int) -> None:
+    @TikTokActionRegistry.register('show_off', 'Active Sim is showing off with confidence!', batchable=True)
+    def _apply_show_off_action(user_nickname: str, count: int, context: Dict[str, Any]) -> None:
         """Apply show off action - makes the active Sim confident and perform show-off interactions"""
         try:
             
@@ -118,11 +164,11 @@ class TikTokEffectMappings:
                 return
             
             # Apply confident buff to the active sim
-            result = CommonBuffUtils.add_buff(active_sim_info, CommonBuffId.CONFIDENCE_HIGH_CONFIDENCE_BOOST, buff_reason="Showing off from TikTok gift")
+            result = TikTokGroupEffectUtils.add_buff([active_sim_info], CommonBuffId.CONFIDENCE_HIGH_CONFIDENCE_BOOST, buff_reason="Showing off from TikTok gift")
             if result:
                 log.info(f"Applied confident buff to {active_sim_info.first_name} for show off action")
             else:
-                log.error(f"Failed to apply confident buff: {result.reason}")
+                log.error(f"Failed to apply confident buff: {result.summary()}")
             
             # Try to make the sim perform a confident/show-off interaction
             # Since we don't have specific show-off interactions in S4CL, we'll use confident posture and buff
@@ -134,7 +180,8 @@ class TikTokEffectMappings:
             log.error(f"Error applying show off action: {e}")
 
     @staticmethod
-    def _apply_romantic_hug_action(count: int) -> None:
+    @TikTokActionRegistry.register('romantic_hug', 'Active Sim is giving romantic hugs to nearby Sims!', vfx_names=(HEART_SPIN_VFX,))
+    def _apply_romantic_hug_action(user_nickname: str, count: int, context: Dict[str, Any]) -> None:
         """Apply romantic hug action - makes the active Sim give romantic hugs to nearby Sims"""
         try:
             # Get the active sim
@@ -143,14 +190,14 @@ class TikTokEffectMappings:
                 log.error("No active sim found for romantic_hug action")
                 return
 
-            TikTokVFXUtils.play_one_shot_on_sim('attraction_first_attraction_heart_spin', joint_name='b__Head__', duration=3)
+            TikTokVFXUtils.play_one_shot_on_sim(HEART_SPIN_VFX, joint_name='b__Head__', duration=3)
 
             # Apply flirty buff to the active sim
-            result = CommonBuffUtils.add_buff(active_sim_info, CommonBuffId.FLIRTY_BY_POTION, buff_reason="Romantic mood from TikTok gift")
+            result = TikTokGroupEffectUtils.add_buff([active_sim_info], CommonBuffId.FLIRTY_BY_POTION, buff_reason="Romantic mood from TikTok gift")
             if result:
                 log.info(f"Applied flirty buff to {active_sim_info.first_name} for romantic hug action")
             else:
-                log.error(f"Failed to apply flirty buff: {result.reason}")
+                log.error(f"Failed to apply flirty buff: {result.summary()}")
             
             # Get targets from current interactions
             interaction_targets = TikTokEffectMappings.get_all_running_interaction_targets(active_sim_info)
@@ -179,27 +226,19 @@ class TikTokEffectMappings:
             target_sim_info = unique_targets[0]
             try:
                 # Apply flirty buff to target as well
-                buff_result = CommonBuffUtils.add_buff(target_sim_info, CommonBuffId.FLIRTY_BY_POTION, buff_reason="Romantic hug from TikTok gift")
+                buff_result = TikTokGroupEffectUtils.add_buff([target_sim_info], CommonBuffId.FLIRTY_BY_POTION, buff_reason="Romantic hug from TikTok gift")
                 if buff_result:
                     log.info(f"Applied romantic buff to {target_sim_info.first_name}")
-                
+
                 # Try to improve relationship between the sims
-                try:
-                    CommonRelationshipUtils.change_relationship_level_of_sims(
-                        active_sim_info,
-                        target_sim_info,
-                        CommonRelationshipTrackId.FRIENDSHIP,
-                        20.0
-                    )
-                    CommonRelationshipUtils.change_relationship_level_of_sims(
-                        active_sim_info, 
-                        target_sim_info, 
-                        CommonRelationshipTrackId.ROMANCE,
-                        20.0
-                    )
-                except Exception as rel_error:
-                    log.debug(f"Could not change relationship: {rel_error}")
-                
+                relationship_result = TikTokGroupEffectUtils.change_relationship_levels(
+                    active_sim_info,
+                    [target_sim_info],
+                    ((CommonRelationshipTrackId.FRIENDSHIP, 20.0), (CommonRelationshipTrackId.ROMANCE, 20.0))
+                )
+                if relationship_result.failed:
+                    log.debug(f"Could not change relationship: {relationship_result.summary()}")
+
             except Exception as e:
                 log.error(f"Error applying romantic hug to {target_sim_info.first_name}: {e}")
             
@@ -209,7 +248,28 @@ class TikTokEffectMappings:
             log.error(f"Error applying romantic hug action: {e}")
     
     @staticmethod
-    def _add_simoleons_for_like_reward(like_count: int, context: Dict[str, Any]) -> None:
+    @TikTokActionRegistry.register(
+        'like',
+        'Likes counted toward a like reward',
+        cost_class=TikTokActionCostClass.CHEAP,
+        target_scope=TikTokActionTargetScope.NONE,
+        # The like aggregator already merges per viewer, so likes skip the coalescer window
+        batchable=False
+    )
+    def _count_likes_action(user_nickname: str, like_count: int, context: Dict[str, Any]) -> None:
+        """Count raw likes from the bridge, the aggregator applies a like_reward once a viewer earns one"""
+        get_like_aggregator().add_likes(context.get('user', user_nickname), user_nickname, like_count)
+
+    @staticmethod
+    @TikTokActionRegistry.register(
+        'like_reward',
+        TikTokActionRegistry.DEFAULT_DESCRIPTION,
+        cost_class=TikTokActionCostClass.CHEAP,
+        target_scope=TikTokActionTargetScope.ACTIVE_HOUSEHOLD,
+        # Applied straight from the like aggregator, never merged
+        batchable=False
+    )
+    def _add_simoleons_for_like_reward(user_nickname: str, like_count: int, context: Dict[str, Any]) -> None:
         """Add simoleons to the active household for TikTok like milestone reward"""
         try:
             active_sim_info = CommonSimUtils.get_active_sim_info()
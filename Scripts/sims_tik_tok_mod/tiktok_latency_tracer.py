@@ -0,0 +1,54 @@
+"""
+TikTok Latency Tracer for Sims 4 Mod
+Turns the trace timestamps carried by each action into per-stage latency histograms
+"""
+from typing import Dict, Any, Optional, Tuple
+
+from sims_tik_tok_mod.utils.latency_histogram import TikTokLatencyHistogram
+
+# Stage name and the trace timestamps (epoch milliseconds) it is measured between
+TRACE_STAGES: Tuple[Tuple[str, str, str], ...] = (
+    ('bridge', 'bridgeReceivedAt', 'bridgeSentAt'),
+    ('transport', 'bridgeSentAt', 'modReceivedAt'),
+    ('queue', 'modReceivedAt', 'dequeuedAt'),
+    ('effect', 'dequeuedAt', 'effectDoneAt'),
+    ('total', 'bridgeReceivedAt', 'effectDoneAt'),
+)
+
+
+class TikTokLatencyTracer:
+    """Fixed-size latency histograms for every stage between a TikTok gift and its in-game effect"""
+
+    def __init__(self, sample_count: int = 256):
+        self.histograms: Dict[str, TikTokLatencyHistogram] = {
+            stage: TikTokLatencyHistogram(sample_count) for stage, _, _ in TRACE_STAGES
+        }
+
+    def record(self, trace: Dict[str, float]) -> None:
+        """Record every stage the trace has both timestamps for"""
+        for stage, start_key, end_key in TRACE_STAGES:
+            start = trace.get(start_key)
+            end = trace.get(end_key)
+            if start is not None and end is not None:
+                # Bridge and mod share the machine clock, but never report a negative latency
+                self.histograms[stage].record(max(0.0, end - start))
+
+    def clear(self) -> None:
+        for histogram in self.histograms.values():
+            histogram.clear()
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Percentiles per stage, sent to the bridge with every ack"""
+        return {stage: histogram.to_dict() for stage, histogram in self.histograms.items()}
+
+
+# Global instance
+_latency_tracer: Optional[TikTokLatencyTracer] = None
+
+
+def get_latency_tracer() -> TikTokLatencyTracer:
+    """Get the global latency tracer instance"""
+    global _latency_tracer
+    if _latency_tracer is None:
+        _latency_tracer = TikTokLatencyTracer()
+    return _latency_tracer
@@ -0,0 +1,220 @@
+"""
+TikTok Like Aggregator for Sims 4 Mod
+Counts raw likes per viewer and turns them into like rewards as soon as a viewer reaches the threshold
+"""
+import heapq
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from sims4communitylib.events.event_handling.common_event_registry import CommonEventRegistry
+from sims4communitylib.events.zone_update.events.zone_update_event import S4CLZoneUpdateEvent
+from sims4communitylib.utils.common_log_registry import CommonLogRegistry
+
+from sims_tik_tok_mod.modinfo import ModInfo
+
+log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokLikeAggregator')  # type: ignore[attr-defined]
+log.enable()
+
+# (user, user nickname, likes)
+TikTokLikeRewardCallback = Callable[[str, str, int], None]
+
+
+class TikTokLikeCounter:
+    """Likes of one viewer, per second over the rolling window and in total since their last reward"""
+
+    __slots__ = ('user', 'user_nickname', 'buckets', 'window_total', 'pending', 'pending_since', 'last_like', 'check_at')
+
+    def __init__(self, user: str, user_nickname: str):
+        self.user = user
+        self.user_nickname = user_nickname
+        # [second, likes] for every second of the window that had likes, oldest first
+        self.buckets: Deque[List[int]] = deque()
+        self.window_total = 0
+        # Likes counted toward the next reward, and when the first of them arrived
+        self.pending = 0
+        self.pending_since = 0.0
+        self.last_like = 0.0
+        # When this viewer is next due for an expiry check, older heap entries for them are ignored
+        self.check_at = 0.0
+
+    def add(self, second: int, count: int) -> None:
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += count
+        else:
+            self.buckets.append([second, count])
+        self.window_total += count
+
+    def expire_buckets(self, oldest_second: int) -> None:
+        while self.buckets and self.buckets[0][0] < oldest_second:
+            self.window_total -= self.buckets.popleft()[1]
+
+    def total_since(self, oldest_second: int) -> int:
+        """Likes in the window without dropping expired buckets"""
+        total = self.window_total
+        for second, count in self.buckets:
+            if second >= oldest_second:
+                break
+            total -= count
+        return total
+
+
+class TikTokLikeAggregator:
+    """Per-viewer like counters that reward a viewer the moment they reach the threshold.
+
+    A viewer who stays below the threshold is rewarded for what they have once the timeout passes since their
+    first unrewarded like. Deadlines are kept in a heap, so each check only looks at viewers that are due.
+    """
+
+    def __init__(self, threshold: int = 100, timeout_seconds: float = 60.0, window_seconds: int = 60, max_viewers: int = 20000):
+        self.threshold = threshold
+        self.timeout_seconds = timeout_seconds
+        # Length of the rolling window the top likers are ranked over
+        self.window_seconds = window_seconds
+        # Beyond this many viewers the one who liked least recently is rewarded early and forgotten
+        self.max_viewers = max_viewers
+
+        # Least recently liked first
+        self._counters: 'OrderedDict[str, TikTokLikeCounter]' = OrderedDict()
+        # (check time, user), may hold outdated entries that no longer match the viewer's check_at
+        self._deadlines: List[Tuple[float, str]] = []
+        self.reward_callback: Optional[TikTokLikeRewardCallback] = None
+
+        self.total_likes = 0
+        self.rewarded_likes = 0
+        self.reward_count = 0
+        self.evicted_count = 0
+
+    @property
+    def viewer_count(self) -> int:
+        return len(self._counters)
+
+    @property
+    def pending_likes(self) -> int:
+        return sum(counter.pending for counter in self._counters.values())
+
+    def configure(self, threshold: int, timeout_seconds: float) -> None:
+        """Use the like reward settings of the bridge"""
+        self.threshold = max(1, int(threshold))
+        self.timeout_seconds = max(1.0, float(timeout_seconds))
+
+    def set_reward_callback(self, callback: TikTokLikeRewardCallback) -> None:
+        """Set the function called with (user, user nickname, likes) for every reward"""
+        self.reward_callback = callback
+
+    def add_likes(self, user: str, user_nickname: str, count: int, now: Optional[float] = None) -> None:
+        """Count likes from a viewer, rewarding them straight away if that takes them to the threshold"""
+        if count <= 0:
+            return
+        if now is None:
+            now = time.monotonic()
+
+        counter = self._counters.get(user)
+        if counter is None:
+            counter = TikTokLikeCounter(user, user_nickname)
+            self._counters[user] = counter
+            if len(self._counters) > self.max_viewers:
+                self._evict_least_recent()
+        else:
+            self._counters.move_to_end(user)
+            counter.user_nickname = user_nickname
+
+        second = int(now)
+        counter.expire_buckets(second - self.window_seconds + 1)
+        counter.add(second, count)
+        counter.last_like = now
+        self.total_likes += count
+
+        if counter.pending == 0:
+            counter.pending_since = now
+            self._schedule_check(counter, now + self.timeout_seconds)
+        counter.pending += count
+        if counter.pending >= self.threshold:
+            self._reward(counter)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Reward viewers whose timeout passed and forget viewers who stopped liking, returns how many were rewarded"""
+        if now is None:
+            now = time.monotonic()
+
+        rewarded = 0
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now:
+            check_at, user = heapq.heappop(deadlines)
+            counter = self._counters.get(user)
+            if counter is None or counter.check_at != check_at:
+                continue
+
+            if counter.pending > 0:
+                if now - counter.pending_since < self.timeout_seconds:
+                    self._schedule_check(counter, counter.pending_since + self.timeout_seconds)
+                    continue
+                self._reward(counter)
+                rewarded += 1
+
+            # Kept around while their likes still count toward the top likers
+            if now - counter.last_like >= self.window_seconds:
+                del self._counters[user]
+            else:
+                self._schedule_check(counter, counter.last_like + self.window_seconds)
+
+        # Viewers who like often leave outdated entries behind, rebuild before they outnumber the viewers
+        if len(deadlines) > 4 * len(self._counters) + 64:
+            self._deadlines = [(counter.check_at, counter.user) for counter in self._counters.values()]
+            heapq.heapify(self._deadlines)
+        return rewarded
+
+    def top_likers(self, count: int = 5, now: Optional[float] = None) -> List[Tuple[str, int]]:
+        """(nickname, likes) of the viewers with the most likes in the rolling window"""
+        if now is None:
+            now = time.monotonic()
+        oldest_second = int(now) - self.window_seconds + 1
+        totals = ((counter.total_since(oldest_second), counter.user_nickname) for counter in self._counters.values())
+        return [(user_nickname, total) for total, user_nickname in heapq.nlargest(count, totals) if total > 0]
+
+    def clear(self) -> None:
+        """Forget every viewer without rewarding them"""
+        self._counters.clear()
+        self._deadlines = []
+
+    def _schedule_check(self, counter: TikTokLikeCounter, check_at: float) -> None:
+        counter.check_at = check_at
+        heapq.heappush(self._deadlines, (check_at, counter.user))
+
+    def _evict_least_recent(self) -> None:
+        user, counter = self._counters.popitem(last=False)
+        if counter.pending > 0:
+            self._reward(counter)
+        self.evicted_count += 1
+
+    def _reward(self, counter: TikTokLikeCounter) -> None:
+        likes = counter.pending
+        counter.pending = 0
+        self.rewarded_likes += likes
+        self.reward_count += 1
+
+        log.info(f"Like reward for {counter.user}: {likes} likes")
+        if self.reward_callback is None:
+            return
+        try:
+            self.reward_callback(counter.user, counter.user_nickname, likes)
+        except Exception as e:
+            log.error(f"Error sending like reward for {counter.user}: {e}")
+
+    @staticmethod
+    @CommonEventRegistry.handle_events(ModInfo.get_identity().name)
+    def _expire_on_zone_update(event_data: S4CLZoneUpdateEvent) -> bool:
+        get_like_aggregator().expire()
+        return True
+
+
+# Global instance
+_like_aggregator: Optional[TikTokLikeAggregator] = None
+
+
+def get_like_aggregator() -> TikTokLikeAggregator:
+    """Get the global like aggregator instance"""
+    global _like_aggregator
+    if _like_aggregator is None:
+        _like_aggregator = TikTokLikeAggregator()
+    return _like_aggregator
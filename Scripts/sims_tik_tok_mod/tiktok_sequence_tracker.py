@@ -0,0 +1,68 @@
+"""
+TikTok Sequence Tracker for Sims 4 Mod
+Remembers which bridge actions were already received so replays after a reconnect are applied once
+"""
+from collections import deque
+from typing import Deque, Optional, Set
+
+
+class TikTokSequenceTracker:
+    """Dedupe window of action sequence numbers for the current bridge session"""
+
+    def __init__(self, window_size: int = 2000):
+        self.window_size = window_size
+
+        # Bridge session the sequence numbers belong to, they restart when the bridge restarts
+        self.session_id: Optional[str] = None
+        self.last_seq = 0
+        # Every sequence number up to this one was received, the bridge is asked to resume after it so an action
+        # that was received but could not be queued is sent again. None until the session's first action.
+        self.resume_seq: Optional[int] = None
+
+        self._seen: Set[int] = set()
+        self._seen_order: Deque[int] = deque()
+
+        self.duplicate_count = 0
+
+    def start_session(self, session_id: Optional[str]) -> None:
+        """Switch to the given bridge session, forgetting the old sequence numbers if it changed"""
+        if session_id == self.session_id:
+            return
+
+        self.session_id = session_id
+        self.last_seq = 0
+        self.resume_seq = None
+        self._seen.clear()
+        self._seen_order.clear()
+
+    def accept(self, seq: int) -> bool:
+        """Record a sequence number, returns False if it was already received"""
+        if self.is_duplicate(seq):
+            return False
+        self.record(seq)
+        return True
+
+    def is_duplicate(self, seq: int) -> bool:
+        """Whether a sequence number was already received, counted as a skipped duplicate if so"""
+        if seq in self._seen or seq <= self.last_seq - self.window_size:
+            self.duplicate_count += 1
+            return True
+        return False
+
+    def record(self, seq: int) -> None:
+        """Remember a sequence number once its action has been queued"""
+        self._seen.add(seq)
+        self._seen_order.append(seq)
+        if len(self._seen_order) > self.window_size:
+            self._seen.discard(self._seen_order.popleft())
+
+        if seq > self.last_seq:
+            self.last_seq = seq
+
+        # A client connecting mid-session starts at whatever the bridge sends first
+        if self.resume_seq is None:
+            self.resume_seq = seq - 1
+        # Gaps older than the window can no longer be told apart from duplicates, so stop waiting for them
+        self.resume_seq = max(self.resume_seq, self.last_seq - self.window_size)
+        while self.resume_seq + 1 in self._seen:
+            self.resume_seq += 1
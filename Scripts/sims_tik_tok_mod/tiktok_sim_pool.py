@@ -0,0 +1,176 @@
+"""
+TikTok Sim Pool for Sims 4 Mod
+Pre-generates Sims while the game is idle so creating a Sim for a gifter only renames and spawns one
+"""
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from sims4communitylib.enums.common_species import CommonSpecies
+from sims4communitylib.events.event_handling.common_event_registry import CommonEventRegistry
+from sims4communitylib.events.save.events.save_saved import S4CLSaveSavedEvent
+from sims4communitylib.events.zone_spin.events.zone_late_load import S4CLZoneLateLoadEvent
+from sims4communitylib.events.zone_spin.events.zone_teardown import S4CLZoneTeardownEvent
+from sims4communitylib.events.zone_update.events.zone_update_event import S4CLZoneUpdateEvent
+from sims4communitylib.utils.common_log_registry import CommonLogRegistry
+from sims4communitylib.utils.common_time_utils import CommonTimeUtils
+from sims4communitylib.utils.sims.common_household_utils import CommonHouseholdUtils
+from sims.sim_info import SimInfo
+
+from sims_tik_tok_mod.modinfo import ModInfo
+from sims_tik_tok_mod.tiktok_action_dispatcher import get_action_dispatcher
+from sims_tik_tok_mod.utils.cas_utils import TikTokCASUtils
+
+log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokSimPool')  # type: ignore[attr-defined]
+log.enable()
+
+
+class TikTokSimPool:
+    """Small per-species stock of generated but not yet spawned Sims, refilled on idle ticks"""
+
+    # Number of Sims kept ready per species
+    DEFAULT_TARGET_SIZES = {
+        CommonSpecies.HUMAN: 2,
+        CommonSpecies.SMALL_DOG: 1,
+        CommonSpecies.LARGE_DOG: 1,
+        CommonSpecies.CAT: 1,
+    }
+
+    def __init__(self, warm_window_seconds: float = 30.0, refill_interval_seconds: float = 1.0):
+        self.enabled = True
+        self.target_sizes: Dict[CommonSpecies, int] = dict(self.DEFAULT_TARGET_SIZES)
+
+        # Refilling is allowed for this long after a lot finished loading, and at any time while paused
+        self.warm_window_seconds = warm_window_seconds
+        # Minimum time between two generated Sims so refilling never costs more than one Sim per hitch
+        self.refill_interval_seconds = refill_interval_seconds
+
+        self._pools: Dict[CommonSpecies, Deque[SimInfo]] = {species: deque() for species in self.target_sizes}
+        self._warm_until: Optional[float] = None
+        self._last_refill_time: Optional[float] = None
+
+        self.hit_count = 0
+        self.miss_count = 0
+
+    @property
+    def pooled_count(self) -> int:
+        """Number of Sims ready to be handed out"""
+        return sum(len(pool) for pool in self._pools.values())
+
+    def size_of(self, species: CommonSpecies) -> int:
+        pool = self._pools.get(species)
+        return len(pool) if pool is not None else 0
+
+    def acquire(self, species: CommonSpecies) -> Optional[SimInfo]:
+        """Take a pooled Sim of the species, or generate one on the spot if none are ready.
+
+        Humans come from a hidden household and animals from a household of their own, the caller
+        renames them and moves them wherever they belong.
+        """
+        pool = self._pools.get(species)
+        while pool:
+            sim_info = pool.popleft()
+            # A pooled Sim can be gone if something else cleaned up hidden households in the meantime
+            if sim_info.household is not None:
+                self.hit_count += 1
+                return sim_info
+
+        self.miss_count += 1
+        return TikTokCASUtils.generate_sim_info(species)
+
+    def start_warm_window(self) -> None:
+        """Allow refilling for a while, used right after a lot has loaded"""
+        self._warm_until = time.perf_counter() + self.warm_window_seconds
+
+    def refill_one(self) -> bool:
+        """Generate a single Sim for the emptiest pool, returns True if one was added"""
+        species = self._next_species_to_refill()
+        if species is None:
+            return False
+
+        sim_info = TikTokCASUtils.generate_sim_info(species)
+        if sim_info is None:
+            return False
+
+        self._pools[species].append(sim_info)
+        return True
+
+    def clear(self) -> None:
+        """Permanently remove every pooled Sim along with the household it was generated in"""
+        for pool in self._pools.values():
+            while pool:
+                sim_info = pool.popleft()
+                try:
+                    household = sim_info.household
+                    sim_info.remove_permanently(household=household)
+                    if household is not None and CommonHouseholdUtils.get_number_of_sims_in_household(household) == 0:
+                        CommonHouseholdUtils.delete_household(household)
+                except Exception as e:
+                    log.error(f"Error removing pooled Sim: {e}")
+
+    def _next_species_to_refill(self) -> Optional[CommonSpecies]:
+        missing = [
+            (len(self._pools[species]) - target_size, species)
+            for species, target_size in self.target_sizes.items()
+            if len(self._pools[species]) < target_size
+        ]
+        if not missing:
+            return None
+        return min(missing, key=lambda entry: entry[0])[1]
+
+    def _should_refill(self, now: float) -> bool:
+        if not self.enabled or self._next_species_to_refill() is None:
+            return False
+        if self._last_refill_time is not None and now - self._last_refill_time < self.refill_interval_seconds:
+            return False
+        # Never compete with gifts that are still waiting to be applied
+        if get_action_dispatcher().queue_depth > 0:
+            return False
+        in_warm_window = self._warm_until is not None and now < self._warm_until
+        return in_warm_window or CommonTimeUtils.game_is_paused()
+
+    @staticmethod
+    @CommonEventRegistry.handle_events(ModInfo.get_identity().name)
+    def _refill_on_zone_update(event_data: S4CLZoneUpdateEvent) -> bool:
+        sim_pool = get_sim_pool()
+        now = time.perf_counter()
+        if sim_pool._should_refill(now):
+            sim_pool._last_refill_time = now
+            sim_pool.refill_one()
+        return True
+
+    @staticmethod
+    @CommonEventRegistry.handle_events(ModInfo.get_identity().name)
+    def _warm_on_zone_late_load(event_data: S4CLZoneLateLoadEvent) -> bool:
+        get_sim_pool().start_warm_window()
+        return True
+
+    @staticmethod
+    @CommonEventRegistry.handle_events(ModInfo.get_identity().name)
+    def _clear_on_save(event_data: S4CLSaveSavedEvent) -> bool:
+        # Dispatched before the game writes the save. Pooled Sims and their households would otherwise be saved,
+        # and a pool created after loading that save would not know about them. The pool refills afterwards.
+        sim_pool = get_sim_pool()
+        if sim_pool.pooled_count > 0:
+            log.info(f"Removing {sim_pool.pooled_count} pooled Sim(s) before saving")
+            sim_pool.clear()
+        return True
+
+    @staticmethod
+    @CommonEventRegistry.handle_events(ModInfo.get_identity().name)
+    def _clear_on_zone_teardown(event_data: S4CLZoneTeardownEvent) -> bool:
+        # Pooled Sims are never spawned, so they should not carry over to another lot
+        get_sim_pool().clear()
+        return True
+
+
+# Global instance
+_sim_pool: Optional[TikTokSimPool] = None
+
+
+def get_sim_pool() -> TikTokSimPool:
+    """Get the global Sim pool instance"""
+    global _sim_pool
+    if _sim_pool is None:
+        _sim_pool = TikTokSimPool()
+    return _sim_pool
@@ -0,0 +1,146 @@
+"""
+TikTok Timer Wheel for Sims 4 Mod
+Runs every timed effect cleanup from a single repeating game alarm instead of one alarm per effect
+"""
+import itertools
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import alarms
+from date_and_time import REAL_MILLISECONDS_PER_SIM_SECOND, TimeSpan
+from sims4communitylib.events.event_handling.common_event_registry import CommonEventRegistry
+from sims4communitylib.events.zone_spin.events.zone_teardown import S4CLZoneTeardownEvent
+from sims4communitylib.utils.common_log_registry import CommonLogRegistry
+from sims4communitylib.utils.common_time_utils import CommonTimeUtils
+
+from sims_tik_tok_mod.modinfo import ModInfo
+
+log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokTimerWheel')  # type: ignore[attr-defined]
+log.enable()
+
+
+class TikTokTimerWheel:
+    """Hashed timer wheel over game time, deadlines are bucketed by slot and checked once per slot"""
+
+    def __init__(self, slot_ticks: int = REAL_MILLISECONDS_PER_SIM_SECOND, slot_count: int = 256):
+        # Game ticks covered by a slot, which is also how often the alarm fires while timers are pending
+        self.slot_ticks = slot_ticks
+        self.slot_count = slot_count
+
+        # Handle ids per slot, a timer further away than one rotation simply stays in its slot until due
+        self._slots: List[List[int]] = [[] for _ in range(slot_count)]
+        # (deadline in absolute ticks, callback) by handle id, cancelling only removes the entry
+        self._timers: Dict[int, Tuple[int, Callable[[], None]]] = {}
+        self._handle_ids: Iterator[int] = itertools.count(1)
+
+        self._alarm_handle = None
+        # Last slot number that has been processed
+        self._last_slot = 0
+
+        self.fired_count = 0
+
+    @property
+    def pending_count(self) -> int:
+        """Number of timers waiting to fire"""
+        return len(self._timers)
+
+    def schedule(self, delay: TimeSpan, callback: Callable[[], None]) -> int:
+        """Call the callback once the delay has passed in game time, returns a handle for cancel()"""
+        now = CommonTimeUtils.get_total_ticks()
+        if self._alarm_handle is None:
+            self._start(now)
+
+        deadline = now + max(int(delay.in_ticks()), 0)
+        # Round up so a timer never fires early, and never land in a slot that was already processed
+        deadline_slot = max(-(-deadline // self.slot_ticks), self._last_slot + 1)
+
+        handle = next(self._handle_ids)
+        self._timers[handle] = (deadline, callback)
+        self._slots[deadline_slot % self.slot_count].append(handle)
+        return handle
+
+    def cancel(self, handle: int) -> bool:
+        """Cancel a pending timer, returns False if it already fired or was cancelled"""
+        return self._timers.pop(handle, None) is not None
+
+    def clear(self) -> None:
+        """Drop every pending timer and stop the alarm"""
+        self._timers.clear()
+        for slot in self._slots:
+            slot.clear()
+        self._stop()
+
+    def _start(self, now: int) -> None:
+        self._last_slot = now // self.slot_ticks
+        self._alarm_handle = alarms.add_alarm(
+            self,
+            TimeSpan(self.slot_ticks),
+            self._on_alarm,
+            repeating=True,
+            repeating_time_span=TimeSpan(self.slot_ticks)
+        )
+
+    def _stop(self) -> None:
+        if self._alarm_handle is not None:
+            alarms.cancel_alarm(self._alarm_handle)
+            self._alarm_handle = None
+
+    def _on_alarm(self, _) -> None:
+        self.advance(CommonTimeUtils.get_total_ticks())
+        # Nothing left to wait for, so the alarm stops until the next timer is scheduled
+        if not self._timers:
+            self._stop()
+
+    def advance(self, now: int) -> int:
+        """Fire every timer due at the given time, returns how many fired"""
+        current_slot = now // self.slot_ticks
+        # A late alarm catches up on every missed slot, but never walks the wheel more than once
+        first_slot = max(self._last_slot + 1, current_slot - self.slot_count + 1)
+        self._last_slot = max(self._last_slot, current_slot)
+
+        fired = 0
+        for slot_number in range(first_slot, current_slot + 1):
+            slot_index = slot_number % self.slot_count
+            slot = self._slots[slot_index]
+            if not slot:
+                continue
+            # Swapped out first, callbacks may schedule new timers into this same slot
+            self._slots[slot_index] = []
+
+            waiting = []
+            for handle in slot:
+                timer = self._timers.get(handle)
+                if timer is None:
+                    continue
+                if timer[0] > now:
+                    waiting.append(handle)
+                    continue
+
+                del self._timers[handle]
+                try:
+                    timer[1]()
+                except Exception as e:
+                    log.error(f"Error running timer {handle}: {e}")
+                fired += 1
+            self._slots[slot_index].extend(waiting)
+
+        self.fired_count += fired
+        return fired
+
+    @staticmethod
+    @CommonEventRegistry.handle_events(ModInfo.get_identity().name)
+    def _clear_on_zone_teardown(event_data: S4CLZoneTeardownEvent) -> bool:
+        # Effects and interactions do not survive the zone, and neither does the alarm
+        get_timer_wheel().clear()
+        return True
+
+
+# Global instance
+_timer_wheel: Optional[TikTokTimerWheel] = None
+
+
+def get_timer_wheel() -> TikTokTimerWheel:
+    """Get the global timer wheel instance"""
+    global _timer_wheel
+    if _timer_wheel is None:
+        _timer_wheel = TikTokTimerWheel()
+    return _timer_wheel
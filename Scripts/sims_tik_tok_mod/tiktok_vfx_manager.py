@@ -0,0 +1,185 @@
+"""
+TikTok VFX Manager for Sims 4 Mod
+Caps how many copies of an effect play on the same Sim and joint, and reuses stopped effects
+"""
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from date_and_time import TimeSpan
+from sims.sim import Sim
+from sims4communitylib.events.event_handling.common_event_registry import CommonEventRegistry
+from sims4communitylib.events.zone_spin.events.zone_teardown import S4CLZoneTeardownEvent
+from sims4communitylib.utils.common_log_registry import CommonLogRegistry
+from _math import Vector3
+from vfx import PlayEffect
+
+from sims_tik_tok_mod.modinfo import ModInfo
+from sims_tik_tok_mod.tiktok_timer_wheel import get_timer_wheel
+
+log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokVFXManager')  # type: ignore[attr-defined]
+log.enable()
+
+# (sim id, joint hash, effect name, offset)
+VFXKey = Tuple[int, int, str, Optional[Tuple[float, float, float]]]
+
+
+class TikTokLiveEffect:
+    """A started effect and the timer that stops it"""
+
+    __slots__ = ('vfx', 'timer_handle')
+
+    def __init__(self, vfx: PlayEffect):
+        self.vfx = vfx
+        self.timer_handle = 0
+
+
+class TikTokVFXManager:
+    """Plays timed effects with a cap per Sim, joint and effect, keeping stopped effects for reuse"""
+
+    def __init__(self, max_live_per_key: int = 3, max_idle_per_key: int = 3):
+        # Beyond this many copies on the same joint, another play extends the oldest copy instead
+        self.max_live_per_key = max_live_per_key
+        self.max_idle_per_key = max_idle_per_key
+
+        # Live effects per key, oldest expiry first
+        self._live: Dict[VFXKey, Deque[TikTokLiveEffect]] = {}
+        # Stopped effects per key, ready to be started again on the same Sim
+        self._idle: Dict[VFXKey, List[PlayEffect]] = {}
+
+        self.started_count = 0
+        self.reused_count = 0
+        self.refreshed_count = 0
+
+    @property
+    def live_count(self) -> int:
+        return sum(len(live) for live in self._live.values())
+
+    @property
+    def idle_count(self) -> int:
+        return sum(len(idle) for idle in self._idle.values())
+
+    def play(
+        self,
+        target: Sim,
+        effect_name: str,
+        joint_hash: int,
+        offset: Optional[Tuple[float, float, float]],
+        duration: TimeSpan
+    ) -> bool:
+        """Play an effect on the target until the duration has passed"""
+        key: VFXKey = (target.id, joint_hash, effect_name, offset)
+        live = self._live.get(key)
+        if live is None:
+            live = deque()
+            self._live[key] = live
+
+        if len(live) >= self.max_live_per_key:
+            # Already at the cap, so the oldest copy keeps playing for another full duration instead
+            live_effect = live.popleft()
+            get_timer_wheel().cancel(live_effect.timer_handle)
+            self._schedule_stop(key, live_effect, duration)
+            live.append(live_effect)
+            self.refreshed_count += 1
+            return True
+
+        vfx = self._take_idle(key, target)
+        if vfx is not None:
+            # PlayEffect.start() returns nothing, attaching is the only sign the effect is playing again
+            try:
+                vfx.start()
+            except Exception as e:
+                log.error(f"Failed to restart effect {effect_name}: {e}")
+            if vfx.is_attached:
+                self.reused_count += 1
+            else:
+                vfx = None
+        if vfx is None:
+            vfx = PlayEffect(
+                target=target,  # type: ignore[reportAssignmentType]
+                effect_name=effect_name,
+                joint_name=joint_hash,
+                target_joint_offset=Vector3(offset[0], offset[1], offset[2]) if offset is not None else None,
+                play_immediate=True
+            )
+            vfx.start()
+            if not vfx.is_attached:
+                # The target cannot show effects right now, e.g. it is not on the lot
+                if not live:
+                    del self._live[key]
+                return False
+            self.started_count += 1
+
+        live_effect = TikTokLiveEffect(vfx)
+        self._schedule_stop(key, live_effect, duration)
+        live.append(live_effect)
+        return True
+
+    def clear(self) -> None:
+        """Stop every live effect and forget the stopped ones"""
+        for live in self._live.values():
+            for live_effect in live:
+                get_timer_wheel().cancel(live_effect.timer_handle)
+                try:
+                    live_effect.vfx.stop(immediate=True)
+                except Exception as e:
+                    log.error(f"Error stopping effect: {e}")
+        self._live.clear()
+        self._idle.clear()
+
+    def _schedule_stop(self, key: VFXKey, live_effect: TikTokLiveEffect, duration: TimeSpan) -> None:
+        live_effect.timer_handle = get_timer_wheel().schedule(duration, lambda: self._expire(key, live_effect))
+
+    def _expire(self, key: VFXKey, live_effect: TikTokLiveEffect) -> None:
+        live = self._live.get(key)
+        if live is not None:
+            try:
+                live.remove(live_effect)
+            except ValueError:
+                pass
+            if not live:
+                del self._live[key]
+
+        log.info(f"Stopping effect {key[2]}")
+        try:
+            live_effect.vfx.stop()
+        except Exception as e:
+            log.error(f"Failed to stop VFX: {e}")
+            return
+
+        if live_effect.vfx.is_attached:
+            # stop() skips the detach while the target is not valid for distribution, such an effect cannot start again
+            return
+
+        idle = self._idle.get(key)
+        if idle is None:
+            idle = []
+            self._idle[key] = idle
+        if len(idle) < self.max_idle_per_key:
+            idle.append(live_effect.vfx)
+
+    def _take_idle(self, key: VFXKey, target: Sim) -> Optional[PlayEffect]:
+        idle = self._idle.get(key)
+        while idle:
+            vfx = idle.pop()
+            # A Sim that left and came back has a new instance with the same id, its old effects are useless
+            if vfx.target is target:
+                return vfx
+        return None
+
+    @staticmethod
+    @CommonEventRegistry.handle_events(ModInfo.get_identity().name)
+    def _clear_on_zone_teardown(event_data: S4CLZoneTeardownEvent) -> bool:
+        get_vfx_manager().clear()
+        return True
+
+
+# Global instance
+_vfx_manager: Optional[TikTokVFXManager] = None
+
+
+def get_vfx_manager() -> TikTokVFXManager:
+    """Get the global VFX manager instance"""
+    global _vfx_manager
+    if _vfx_manager is None:
+        _vfx_manager = TikTokVFXManager()
+    return _vfx_manager
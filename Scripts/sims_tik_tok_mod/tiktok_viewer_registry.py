@@ -0,0 +1,178 @@
+"""
+TikTok Viewer Registry for Sims 4 Mod
+Remembers which Sim was created for each TikTok viewer, persisted per save through S4CL
+"""
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sims4communitylib.events.event_handling.common_event_registry import CommonEventRegistry
+from sims4communitylib.events.save.events.save_loaded import S4CLSaveLoadedEvent
+from sims4communitylib.mod_support.mod_identity import CommonModIdentity
+from sims4communitylib.persistence.data_management.common_data_manager import CommonDataManager
+from sims4communitylib.persistence.data_management.common_data_manager_registry import CommonDataManagerRegistry
+from sims4communitylib.persistence.data_stores.common_data_store import CommonDataStore
+from sims4communitylib.persistence.persistence_services.common_persistence_service import CommonPersistenceService
+from sims4communitylib.utils.common_log_registry import CommonLogRegistry
+from sims4communitylib.utils.sims.common_sim_utils import CommonSimUtils
+from sims.sim_info import SimInfo
+
+from sims_tik_tok_mod.modinfo import ModInfo
+
+log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokViewerRegistry')  # type: ignore[attr-defined]
+log.enable()
+
+VIEWER_DATA_MANAGER_IDENTIFIER = 'tiktok_viewers'
+
+
+class TikTokViewerDataStore(CommonDataStore):
+    """Viewer records by TikTok user id, as plain dictionaries so they serialize straight to JSON"""
+
+    VIEWERS = 'viewers'
+
+    @classmethod
+    def get_identifier(cls) -> str:
+        return 'tiktok_viewer_registry'
+
+    @property
+    def _version(self) -> int:
+        return 1
+
+    @property
+    def _default_data(self) -> Dict[str, Any]:
+        return {TikTokViewerDataStore.VIEWERS: dict()}
+
+
+@CommonDataManagerRegistry.common_data_manager(identifier=VIEWER_DATA_MANAGER_IDENTIFIER)
+class TikTokViewerDataManager(CommonDataManager):
+    """Saves the viewer registry to a file next to each game save"""
+
+    @property
+    def mod_identity(self) -> CommonModIdentity:
+        return ModInfo.get_identity()
+
+    @property
+    def log_identifier(self) -> str:
+        return 'tiktok_viewer_data_manager'
+
+    @property
+    def persistence_services(self) -> Tuple[CommonPersistenceService]:
+        from sims4communitylib.persistence.persistence_services.common_file_persistence_service import \
+            CommonFilePersistenceService
+        # Sim ids only mean something inside the save they were created in
+        return (CommonFilePersistenceService(per_save=True),)
+
+
+class TikTokViewerRegistry:
+    """In-memory index over the persisted viewer records, by TikTok user id and by Sim id"""
+
+    def __init__(self):
+        # The persisted dictionary itself, so every change is picked up the next time the game saves
+        self._viewers: Optional[Dict[str, Dict[str, Any]]] = None
+        self._users_by_sim_id: Dict[int, str] = {}
+
+    @property
+    def viewer_count(self) -> int:
+        return len(self._get_viewers())
+
+    @property
+    def viewers_with_sims_count(self) -> int:
+        self._get_viewers()
+        return len(self._users_by_sim_id)
+
+    def get(self, user: str) -> Optional[Dict[str, Any]]:
+        """Get the record of a viewer, or None if they never gifted in this save"""
+        return self._get_viewers().get(user)
+
+    def record_gift(self, user: str, user_nickname: str, diamonds: int) -> Dict[str, Any]:
+        """Add a gift to the viewer's totals, creating their record on the first one"""
+        viewers = self._get_viewers()
+        record = viewers.get(user)
+        if record is None:
+            record = {'sim_id': 0, 'household_id': 0, 'total_diamonds': 0}
+            viewers[user] = record
+
+        record['nickname'] = user_nickname
+        record['total_diamonds'] += diamonds
+        record['last_seen'] = time.time()
+        return record
+
+    def assign_sim(self, user: str, sim_info: SimInfo) -> None:
+        """Remember the Sim created for a viewer"""
+        viewers = self._get_viewers()
+        record = viewers.get(user)
+        if record is None:
+            record = {'nickname': user, 'total_diamonds': 0, 'last_seen': time.time()}
+            viewers[user] = record
+
+        previous_sim_id = record.get('sim_id')
+        if previous_sim_id:
+            self._users_by_sim_id.pop(previous_sim_id, None)
+
+        record['sim_id'] = sim_info.sim_id
+        record['household_id'] = sim_info.household_id
+        self._users_by_sim_id[sim_info.sim_id] = user
+
+    def get_sim_info(self, user: str) -> Optional[SimInfo]:
+        """Get the Sim created for a viewer, or None if they have none or it no longer exists"""
+        record = self._get_viewers().get(user)
+        if record is None or not record.get('sim_id'):
+            return None
+
+        sim_info = CommonSimUtils.get_sim_info(record['sim_id'])
+        if sim_info is None:
+            # The Sim was deleted since, so the viewer gets a new one next time
+            log.info(f"Sim {record['sim_id']} of viewer {user} no longer exists")
+            self._users_by_sim_id.pop(record['sim_id'], None)
+            record['sim_id'] = 0
+            record['household_id'] = 0
+            return None
+        return sim_info
+
+    def get_user(self, sim_info: SimInfo) -> Optional[str]:
+        """Get the TikTok user id a Sim was created for, if any"""
+        self._get_viewers()
+        return self._users_by_sim_id.get(sim_info.sim_id)
+
+    def reset(self) -> None:
+        """Forget the loaded records, they are read again from the current save when next needed"""
+        self._viewers = None
+        self._users_by_sim_id = {}
+
+    def _get_viewers(self) -> Dict[str, Dict[str, Any]]:
+        if self._viewers is not None:
+            return self._viewers
+
+        viewers: Dict[str, Dict[str, Any]] = {}
+        try:
+            data_manager = CommonDataManagerRegistry().locate_data_manager(ModInfo.get_identity(), identifier=VIEWER_DATA_MANAGER_IDENTIFIER)
+            if data_manager is None:
+                log.error("Viewer data manager is not registered, viewers will not be saved.")
+            else:
+                data_store = data_manager.get_data_store_by_type(TikTokViewerDataStore)
+                viewers = data_store.get_value_by_key(TikTokViewerDataStore.VIEWERS)
+        except Exception as e:
+            log.error(f"Error loading viewer registry: {e}")
+
+        self._viewers = viewers
+        self._users_by_sim_id = {record['sim_id']: user for user, record in viewers.items() if record.get('sim_id')}
+        log.info(f"Loaded {len(viewers)} viewer(s), {len(self._users_by_sim_id)} with a Sim")
+        return viewers
+
+    @staticmethod
+    @CommonEventRegistry.handle_events(ModInfo.get_identity().name)
+    def _reset_on_save_loaded(event_data: S4CLSaveLoadedEvent) -> bool:
+        # S4CL clears its data managers when a save loads, the records belong to the new save now
+        get_viewer_registry().reset()
+        return True
+
+
+# Global instance
+_viewer_registry: Optional[TikTokViewerRegistry] = None
+
+
+def get_viewer_registry() -> TikTokViewerRegistry:
+    """Get the global viewer registry instance"""
+    global _viewer_registry
+    if _viewer_registry is None:
+        _viewer_registry = TikTokViewerRegistry()
+    return _viewer_registry
@@ -3,7 +3,7 @@ Animation Utils for TikTok Mod
 Provides utilities for playing animations on sims
 """
 
-from typing import Optional, Union
+from typing import Any, Dict, Optional, Union
 import services
 from sims.sim_info import SimInfo
 from sims.sim import Sim
@@ -13,6 +13,7 @@ from sims4.resources import Types
 import sims4.hash_util
 
 from sims_tik_tok_mod.modinfo import ModInfo
+from sims_tik_tok_mod.tiktok_asset_catalog import get_asset_catalog
 
 log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokAnimationUtils')  # type: ignore[attr-defined]
 log.enable()
@@ -53,6 +54,9 @@ class TikTokAnimationUtils:
         'a_trait_generous_giveHeart_x'
     ]
 
+    # Animation resources by name hash, so repeated gestures skip the instance manager lookup
+    _animation_resources: Dict[int, Any] = {}
+
     @staticmethod
     def get_active_sim() -> Optional[Sim]:
         """Get the currently active sim"""
@@ -97,19 +101,29 @@ class TikTokAnimationUtils:
                 
             log.info(f"Attempting to play animation '{animation_name}' on sim {sim}")
             
-            # Hash the animation name to get the resource key
-            animation_hash = sims4.hash_util.hash32(animation_name)
-            
-            # Get the animation resource
-            animation_manager = services.get_instance_manager(Types.ANIMATION)
-            if animation_manager is None:
-                log.error("Could not get animation manager")
-                return False
-                
-            animation_resource = animation_manager.get(animation_hash)
+            # Hash the animation name to get the resource key, unknown names are rejected without touching the game
+            animations = get_asset_catalog().animations
+            if animations is not None:
+                animation_hash = animations.get_hash(animation_name)
+                if animation_hash is None:
+                    log.error(f"Unknown animation '{animation_name}', did you mean: {', '.join(animations.search(animation_name, limit=3)) or 'nothing close'}")
+                    return False
+            else:
+                animation_hash = sims4.hash_util.hash32(animation_name)
+
+            animation_resource = TikTokAnimationUtils._animation_resources.get(animation_hash)
             if animation_resource is None:
-                log.error(f"Could not find animation resource for '{animation_name}' (hash: {animation_hash})")
-                return False
+                # Get the animation resource
+                animation_manager = services.get_instance_manager(Types.ANIMATION)
+                if animation_manager is None:
+                    log.error("Could not get animation manager")
+                    return False
+
+                animation_resource = animation_manager.get(animation_hash)
+                if animation_resource is None:
+                    log.error(f"Could not find animation resource for '{animation_name}' (hash: {animation_hash})")
+                    return False
+                TikTokAnimationUtils._animation_resources[animation_hash] = animation_resource
             
             # Create animation element - this is a simplified approach
             # In practice, animations usually need proper interactions
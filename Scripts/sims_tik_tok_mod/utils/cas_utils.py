@@ -4,6 +4,7 @@ from sims4communitylib.utils.common_log_registry import CommonLogRegistry
 from sims4communitylib.utils.sims.common_sim_spawn_utils import CommonSimSpawnUtils
 from sims4communitylib.utils.sims.common_sim_location_utils import CommonSimLocationUtils
 from sims4communitylib.utils.sims.common_household_utils import CommonHouseholdUtils
+from sims4communitylib.utils.sims.common_sim_name_utils import CommonSimNameUtils
 from sims4communitylib.enums.common_gender import CommonGender
 from sims4communitylib.enums.common_age import CommonAge
 from sims_tik_tok_mod.modinfo import ModInfo
@@ -12,6 +13,7 @@ import sims4.commands
 import services
 from sims.sim_info import SimInfo
 import random
+from typing import Optional, Tuple
 from sims.household import Household
 
 log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokCASUtils')  # type: ignore[attr-defined]
@@ -34,9 +36,70 @@ class TikTokCASUtils:
         return random.choice(suitable_ages)
 
     @staticmethod
-    def create_sim_and_open_cas(user_nickname: str) -> bool:
+    def split_nickname(user_nickname: str) -> Tuple[str, str]:
+        """
+        Splits a TikTok nickname into a first and last name that fit a Sim.
+        Nicknames without a space get an empty last name, extra words stay in the last name.
+        """
+        name_parts = user_nickname.split(None, 1)
+        first_name = name_parts[0][:20] if name_parts else "TikTok"
+        last_name = name_parts[1][:20] if len(name_parts) > 1 else ""
+        return first_name, last_name
+
+    @staticmethod
+    def generate_sim_info(species: CommonSpecies) -> Optional[SimInfo]:
+        """
+        Generates a randomized Sim that is not spawned yet.
+        Humans are placed in a hidden household, animals in a temporary household of their own.
+        """
+        try:
+            if species == CommonSpecies.HUMAN:
+                return CommonSimSpawnUtils.create_human_sim_info(
+                    gender=TikTokCASUtils.get_random_gender(),
+                    age=TikTokCASUtils.get_random_age(),
+                    source="TikTok"
+                )
+
+            household_manager = services.household_manager()
+            temp_household = household_manager.create_household(account=None)
+            if temp_household is None:
+                log.error("Failed to create temporary household for animal.")
+                return None
+
+            if species == CommonSpecies.CAT:
+                sim_info = CommonSimSpawnUtils.create_cat_sim_info(
+                    gender=TikTokCASUtils.get_random_gender(),
+                    age=TikTokCASUtils.get_random_age(),
+                    household=temp_household,
+                    source="TikTok_NonHousehold"
+                )
+            elif species == CommonSpecies.LARGE_DOG:
+                sim_info = CommonSimSpawnUtils.create_large_dog_sim_info(
+                    gender=TikTokCASUtils.get_random_gender(),
+                    age=TikTokCASUtils.get_random_age(),
+                    household=temp_household,
+                    source="TikTok_NonHousehold"
+                )
+            else:
+                sim_info = CommonSimSpawnUtils.create_small_dog_sim_info(
+                    gender=TikTokCASUtils.get_random_gender(),
+                    age=TikTokCASUtils.get_random_age(),
+                    household=temp_household,
+                    source="TikTok_NonHousehold"
+                )
+
+            if sim_info is None:
+                CommonHouseholdUtils.delete_household(temp_household)
+            return sim_info
+        except Exception as e:
+            log.error(f"Error generating {species} sim info: {e}")
+            return None
+
+    @staticmethod
+    def create_sim_and_open_cas(user_nickname: str, user: Optional[str] = None) -> bool:
         """
         Opens the Create-A-Sim screen to add a new Sim to the active household.
+        A viewer that already has a Sim gets that Sim back on the lot instead of a new one.
         """
         try:
             client: Client = services.client_manager().get_first_client()  # pyright: ignore[reportAssignmentType]
@@ -56,24 +119,34 @@ class TikTokCASUtils:
                 log.error("Active sim has no household.")
                 return False
 
-            first_name, last_name = user_nickname.split(" ")
-            sim_info: SimInfo = CommonSimSpawnUtils.create_human_sim_info(  # pyright: ignore[reportAssignmentType]
-                gender=TikTokCASUtils.get_random_gender(),
-                age=TikTokCASUtils.get_random_age(),
-                first_name=first_name[:20],
-                last_name=last_name[:20],
-                source="TikTok",
-                household=target_household  # type: ignore[arg-type]
-            )
+            if user is not None:
+                from sims_tik_tok_mod.tiktok_viewer_registry import get_viewer_registry
+                existing_sim_info = get_viewer_registry().get_sim_info(user)
+                if existing_sim_info is not None:
+                    return TikTokCASUtils._bring_back_viewer_sim(existing_sim_info)
+
+            first_name, last_name = TikTokCASUtils.split_nickname(user_nickname)
+            from sims_tik_tok_mod.tiktok_sim_pool import get_sim_pool
+            sim_info: SimInfo = get_sim_pool().acquire(CommonSpecies.HUMAN)  # pyright: ignore[reportAssignmentType]
             
             if sim_info is None:
                 log.error("Failed to create sim info.")
                 return False
+
+            CommonSimNameUtils.set_first_name(sim_info, first_name)
+            CommonSimNameUtils.set_last_name(sim_info, last_name)
+            if not CommonHouseholdUtils.move_sim_to_household(sim_info, household_id=target_household.id):  # type: ignore[attr-defined]
+                log.error("Failed to move sim into the active household.")
+                return False
             
             target_household.save_data()
             
             log.info(f"Created sim info for {sim_info.first_name} {sim_info.last_name} (ID: {sim_info.sim_id})")
 
+            if user is not None:
+                from sims_tik_tok_mod.tiktok_viewer_registry import get_viewer_registry
+                get_viewer_registry().assign_sim(user, sim_info)
+
             success = CommonSimSpawnUtils.spawn_sim_at_active_sim_location(sim_info)  # type: ignore[arg-type]
             if not success:
                 log.error("Failed to spawn sim at active sim location.")
@@ -121,51 +194,18 @@ class TikTokCASUtils:
                 log.error("No active sim found. Cannot create non-household animal.")
                 return False
 
-            # Create a temporary household for the animal
-            household_manager = services.household_manager()
-            temp_household = household_manager.create_household(account=None)
-            if temp_household is None:
-                log.error("Failed to create temporary household for animal.")
-                return False
-
-            # Parse name
-            name_parts = user_nickname.split(" ")
-            first_name = name_parts[0][:20]
-            last_name = name_parts[1][:20] if len(name_parts) > 1 else ""
-
-            # Create the animal sim info without specifying household (will be added later)
-            if animal_type == CommonSpecies.CAT:
-                sim_info = CommonSimSpawnUtils.create_cat_sim_info(
-                    gender=TikTokCASUtils.get_random_gender(),
-                    age=TikTokCASUtils.get_random_age(),
-                    first_name=first_name,
-                    last_name=last_name,
-                    source="TikTok_NonHousehold"
-                )
-            elif animal_type == CommonSpecies.LARGE_DOG:
-                sim_info = CommonSimSpawnUtils.create_large_dog_sim_info(
-                    gender=TikTokCASUtils.get_random_gender(),
-                    age=TikTokCASUtils.get_random_age(),
-                    first_name=first_name,
-                    last_name=last_name,
-                    source="TikTok_NonHousehold"
-                )
-            else:
-                sim_info = CommonSimSpawnUtils.create_small_dog_sim_info(
-                    gender=TikTokCASUtils.get_random_gender(),
-                    age=TikTokCASUtils.get_random_age(),
-                    first_name=first_name,
-                    last_name=last_name,
-                    source="TikTok_NonHousehold"
-                )
+            first_name, last_name = TikTokCASUtils.split_nickname(user_nickname)
 
+            # Pooled animals already live in a temporary household of their own
+            from sims_tik_tok_mod.tiktok_sim_pool import get_sim_pool
+            sim_info = get_sim_pool().acquire(animal_type)
             if sim_info is None:
                 log.error(f"Failed to create {animal_type} sim info.")
-                CommonHouseholdUtils.delete_household(temp_household)
                 return False
 
-            # Add the sim to the temporary household
-            temp_household.add_sim_info(sim_info)
+            temp_household = sim_info.household
+            CommonSimNameUtils.set_first_name(sim_info, first_name)
+            CommonSimNameUtils.set_last_name(sim_info, last_name)
 
             # Get active sim's location for spawning
             active_sim_location = CommonSimLocationUtils.get_location(active_sim_info)
@@ -192,6 +232,23 @@ class TikTokCASUtils:
             log.error(f"Error creating non-household animal sim: {e}")
             return False
 
+    @staticmethod
+    def _bring_back_viewer_sim(sim_info: SimInfo) -> bool:
+        """
+        Spawns a viewer's existing Sim next to the active Sim if they are not on the lot already.
+        """
+        if CommonSimUtils.get_sim_instance(sim_info) is not None:
+            log.info(f"{sim_info.first_name} {sim_info.last_name} is already on the lot")
+            return True
+
+        success = CommonSimSpawnUtils.spawn_sim_at_active_sim_location(sim_info)  # type: ignore[arg-type]
+        if not success:
+            log.error(f"Failed to spawn {sim_info.first_name} {sim_info.last_name} at active sim location.")
+            return False
+
+        log.info(f"Brought {sim_info.first_name} {sim_info.last_name} back to the lot")
+        return True
+
     @staticmethod
     def _create_visitor_situation_for_animal(sim_info) -> bool:
         """
@@ -0,0 +1,162 @@
+"""
+Group Effect Utils for TikTok Mod
+Applies buffs, statistic changes and relationship changes to several Sims in one pass
+"""
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+from sims.sim_info import SimInfo
+from sims4communitylib.enums.buffs_enum import CommonBuffId
+from sims4communitylib.enums.relationship_tracks_enum import CommonRelationshipTrackId
+from sims4communitylib.enums.statistics_enum import CommonStatisticId
+from sims4communitylib.enums.types.component_types import CommonComponentType
+from sims4communitylib.utils.common_component_utils import CommonComponentUtils
+from sims4communitylib.utils.common_log_registry import CommonLogRegistry
+from sims4communitylib.utils.localization.common_localization_utils import CommonLocalizationUtils
+from sims4communitylib.utils.resources.common_statistic_utils import CommonStatisticUtils
+from sims4communitylib.utils.sims.common_buff_utils import CommonBuffUtils
+from sims4communitylib.utils.sims.common_relationship_utils import CommonRelationshipUtils
+
+from sims_tik_tok_mod.modinfo import ModInfo
+
+log = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokGroupEffectUtils')  # type: ignore[attr-defined]
+log.enable()
+
+
+class TikTokGroupEffectResult:
+    """Outcome of applying one effect to a group of Sims"""
+
+    def __init__(self, effect: str):
+        self.effect = effect
+        self.applied: List[SimInfo] = []
+        self.failed: List[Tuple[SimInfo, str]] = []
+
+    def __bool__(self) -> bool:
+        return len(self.applied) > 0
+
+    @property
+    def applied_count(self) -> int:
+        return len(self.applied)
+
+    @property
+    def failed_count(self) -> int:
+        return len(self.failed)
+
+    def summary(self) -> str:
+        """One line describing the whole group, for a single log entry per gift"""
+        text = f"{self.effect}: applied to {self.applied_count} Sim(s)"
+        if self.failed:
+            text += ", failed for " + ', '.join(f"{sim_info.first_name} ({reason})" for sim_info, reason in self.failed)
+        return text
+
+
+class TikTokGroupEffectUtils:
+    """Group versions of the S4CL buff, statistic and relationship helpers.
+
+    S4CL resolves the tuning, localizes the reason and writes several log entries for every Sim it is called
+    with. These resolve everything once per call, cache the tuning for the session and log once per group.
+    """
+
+    # Tuning does not change once the game has loaded it
+    _buffs: Dict[int, Any] = {}
+    _statistics: Dict[int, Any] = {}
+    _relationship_tracks: Dict[int, Any] = {}
+    _buff_reasons: Dict[str, Any] = {}
+
+    @staticmethod
+    def add_buff(sim_infos: Iterable[SimInfo], buff_id: Union[int, CommonBuffId], buff_reason: str = None) -> TikTokGroupEffectResult:
+        """Add a buff to every Sim"""
+        result = TikTokGroupEffectResult(f"Buff {TikTokGroupEffectUtils._label(buff_id)}")
+        buff = TikTokGroupEffectUtils._load(TikTokGroupEffectUtils._buffs, buff_id, CommonBuffUtils.load_buff_by_id)
+        if buff is None:
+            result.failed.extend((sim_info, 'buff not found') for sim_info in sim_infos)
+            return result
+
+        localized_buff_reason = TikTokGroupEffectUtils._localize_buff_reason(buff_reason)
+        for sim_info in sim_infos:
+            try:
+                if not CommonComponentUtils.has_component(sim_info, CommonComponentType.BUFF):
+                    result.failed.append((sim_info, 'no buff component'))
+                    continue
+                add_result = sim_info.add_buff_from_op(buff, buff_reason=localized_buff_reason)
+                if add_result:
+                    result.applied.append(sim_info)
+                else:
+                    result.failed.append((sim_info, 'buff rejected'))
+            except Exception as e:
+                result.failed.append((sim_info, str(e)))
+        return result
+
+    @staticmethod
+    def add_statistic_value(sim_infos: Iterable[SimInfo], statistic_id: Union[int, CommonStatisticId], amount: float) -> TikTokGroupEffectResult:
+        """Add an amount to a statistic or commodity of every Sim"""
+        result = TikTokGroupEffectResult(f"Statistic {TikTokGroupEffectUtils._label(statistic_id)} {amount:+g}")
+        statistic = TikTokGroupEffectUtils._load(TikTokGroupEffectUtils._statistics, statistic_id, CommonStatisticUtils.load_statistic_by_id)
+        if statistic is None:
+            result.failed.extend((sim_info, 'statistic not found') for sim_info in sim_infos)
+            return result
+
+        for sim_info in sim_infos:
+            try:
+                tracker = sim_info.get_tracker(statistic)
+                if tracker is None:
+                    result.failed.append((sim_info, 'no statistic tracker'))
+                    continue
+                tracker.add_value(statistic, amount)
+                result.applied.append(sim_info)
+            except Exception as e:
+                result.failed.append((sim_info, str(e)))
+        return result
+
+    @staticmethod
+    def change_relationship_levels(
+        sim_info: SimInfo,
+        target_sim_infos: Iterable[SimInfo],
+        track_levels: Iterable[Tuple[Union[int, CommonRelationshipTrackId], float]]
+    ) -> TikTokGroupEffectResult:
+        """Change several relationship tracks between one Sim and every target"""
+        result = TikTokGroupEffectResult(f"Relationship with {sim_info.first_name}")
+        tracks = []
+        for track_id, level in track_levels:
+            track = TikTokGroupEffectUtils._load(TikTokGroupEffectUtils._relationship_tracks, track_id, CommonRelationshipUtils.load_relationship_track_by_id)
+            if track is None:
+                log.error(f"Relationship track {TikTokGroupEffectUtils._label(track_id)} not found")
+                continue
+            tracks.append((track, level))
+        if not tracks:
+            result.failed.extend((target_sim_info, 'no relationship tracks found') for target_sim_info in target_sim_infos)
+            return result
+
+        relationship_tracker = sim_info.relationship_tracker
+        for target_sim_info in target_sim_infos:
+            try:
+                for track, level in tracks:
+                    relationship_tracker.add_relationship_score(target_sim_info.sim_id, level, track)
+                result.applied.append(target_sim_info)
+            except Exception as e:
+                result.failed.append((target_sim_info, str(e)))
+        return result
+
+    @staticmethod
+    def _load(cache: Dict[int, Any], tuning_id: int, loader) -> Any:
+        tuning = cache.get(tuning_id)
+        if tuning is None:
+            tuning = loader(tuning_id)
+            # Misses are not cached, the tuning may belong to a pack that is still loading
+            if tuning is not None:
+                cache[tuning_id] = tuning
+        return tuning
+
+    @staticmethod
+    def _label(tuning_id: Union[int, Any]) -> str:
+        # Enum members read better in the log than their decimal ids
+        return str(getattr(tuning_id, 'name', tuning_id))
+
+    @staticmethod
+    def _localize_buff_reason(buff_reason: str) -> Any:
+        if buff_reason is None:
+            return None
+        localized_buff_reason = TikTokGroupEffectUtils._buff_reasons.get(buff_reason)
+        if localized_buff_reason is None:
+            localized_buff_reason = CommonLocalizationUtils.create_localized_string(buff_reason)
+            TikTokGroupEffectUtils._buff_reasons[buff_reason] = localized_buff_reason
+        return localized_buff_reason
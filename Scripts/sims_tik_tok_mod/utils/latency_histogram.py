@@ -0,0 +1,88 @@
+"""
+Latency Histogram for TikTok Mod
+Keeps bucketed percentiles over the most recent latency samples without sorting them
+"""
+import bisect
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+class TikTokLatencyHistogram:
+    """Rolling histogram of the most recent latency samples, in milliseconds."""
+
+    # Bucket upper bounds grow by 25% from 0.05ms, which covers everything up to about two minutes
+    _BUCKET_BOUNDS: List[float] = [0.05 * (1.25 ** index) for index in range(67)]
+
+    def __init__(self, sample_count: int = 256):
+        self.sample_count = sample_count
+        self._counts = [0] * (len(self._BUCKET_BOUNDS) + 1)
+        # Bucket index of every sample in the window, oldest first
+        self._window: Deque[int] = deque()
+        # (sample number, value) pairs with falling values, the first is the largest sample still in the window
+        self._max_candidates: Deque[Tuple[int, float]] = deque()
+        self._recorded_count = 0
+        self.last_ms: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    @property
+    def max_ms(self) -> float:
+        """Largest sample in the window, 0 without samples."""
+        if not self._max_candidates:
+            return 0.0
+        return self._max_candidates[0][1]
+
+    def record(self, value_ms: float) -> None:
+        """Add a sample, forgetting the oldest one once the window is full."""
+        bucket = bisect.bisect_left(self._BUCKET_BOUNDS, value_ms)
+        self._counts[bucket] += 1
+        self._window.append(bucket)
+        if len(self._window) > self.sample_count:
+            self._counts[self._window.popleft()] -= 1
+
+        self.last_ms = value_ms
+        self._recorded_count += 1
+        # A sample can never be the maximum again once a newer one is at least as large
+        while self._max_candidates and self._max_candidates[-1][1] <= value_ms:
+            self._max_candidates.pop()
+        self._max_candidates.append((self._recorded_count, value_ms))
+        if self._max_candidates[0][0] <= self._recorded_count - len(self._window):
+            self._max_candidates.popleft()
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile, or None without samples."""
+        if not self._window:
+            return None
+
+        rank = max(1, int(round(len(self._window) * percent / 100.0)))
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                if bucket < len(self._BUCKET_BOUNDS):
+                    return self._BUCKET_BOUNDS[bucket]
+                return self.max_ms
+        return self.max_ms
+
+    def clear(self) -> None:
+        self._counts = [0] * (len(self._BUCKET_BOUNDS) + 1)
+        self._window.clear()
+        self._max_candidates.clear()
+        self.last_ms = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sample count and percentiles, with None percentiles when there are no samples."""
+        return {
+            'count': len(self._window),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max_ms,
+        }
+
+    def summary(self) -> str:
+        """Short p50/p99 description for status output."""
+        if not self._window:
+            return "no samples"
+        return f"p50 {self.percentile(50):.1f}ms, p99 {self.percentile(99):.1f}ms ({len(self._window)} samples)"
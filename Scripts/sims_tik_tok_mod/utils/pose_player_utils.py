@@ -1,4 +1,3 @@
-import random
 from sims.sim import Sim
 from sims4communitylib.utils.common_log_registry import CommonLogRegistry
 from interactions.context import QueueInsertStrategy, InteractionContext
@@ -7,8 +6,8 @@ from sims4communitylib.utils.sims.common_sim_interaction_utils import CommonSimI
 from sims4communitylib.utils.sims.common_sim_utils import CommonSimUtils
 from sims_tik_tok_mod.modinfo import ModInfo
 from interactions.interaction_finisher import FinishingType
-import alarms
 from date_and_time import REAL_MILLISECONDS_PER_SIM_SECOND, TimeSpan
+from sims_tik_tok_mod.tiktok_timer_wheel import get_timer_wheel
 
 LOG = CommonLogRegistry.get().register_log(ModInfo.get_identity(), 'TikTokPosePlayerUtils')  # type: ignore[attr-defined]
 LOG.enable()
@@ -16,10 +15,11 @@ LOG.enable()
 SA_POSE = 12880964001135365186
 SA_POSE_STOP = 12580983238869710811
 
+# How long a queued pose may take to start running before its timeout gives up on it
+POSE_START_TIMEOUT_SECONDS = 30
 
-class TikTokPosePlayerUtils:
-    _active_alarms = {}
 
+class TikTokPosePlayerUtils:
     @staticmethod
     def play_pose_by_name(sim: Sim, pose_name: str, pose_duration: float = 1.1) -> bool:
         """Push PoseInteraction directly with a pose_name"""
@@ -32,33 +32,40 @@ class TikTokPosePlayerUtils:
             interaction_context=context,
             pose_name=pose_name
         )
+        if not queue_result:
+            return False
 
-        alarm_id = random.randint(0, 1000000)
-
-        def _on_alarm(_):
+        def _on_timeout(waited_seconds: float):
             try:
-                LOG.info(f'Stopping pose {pose_name}')
-                for si in sim.si_state:
-                    if hasattr(si, 'pose_name') and si.pose_name == pose_name:
-                        time_running = si.consecutive_running_time_span.in_real_world_seconds()
-                        LOG.info(f'Pose {pose_name} has been running for {time_running} seconds')
+                pose_interaction = TikTokPosePlayerUtils._find_pose_interaction(sim, pose_name)
+                if pose_interaction is None:
+                    # Still waiting behind the current interaction, or it already finished on its own
+                    if waited_seconds < POSE_START_TIMEOUT_SECONDS:
+                        TikTokPosePlayerUtils._schedule_timeout(1.0, lambda: _on_timeout(waited_seconds + 1.0))
+                    return
 
-                        if time_running > pose_duration:
-                            LOG.info(f'Stopping pose {pose_name} after {time_running} seconds')
-                            si.cancel(FinishingType.SI_FINISHED, 'Stop Posing')
-                            TikTokPosePlayerUtils._active_alarms.pop(alarm_id, None).cancel()
+                time_running = pose_interaction.consecutive_running_time_span.in_real_world_seconds()
+                if time_running >= pose_duration:
+                    LOG.info(f'Stopping pose {pose_name} after {time_running} seconds')
+                    pose_interaction.cancel(FinishingType.SI_FINISHED, 'Stop Posing')
+                else:
+                    # Started later than it was queued, check again once the rest of the duration has passed
+                    remaining = pose_duration - time_running
+                    TikTokPosePlayerUtils._schedule_timeout(remaining, lambda: _on_timeout(waited_seconds + remaining))
             except Exception as e:
                 LOG.error(f'Error stopping pose {pose_name}: {e}')
 
-        alarm_time_span = TimeSpan(REAL_MILLISECONDS_PER_SIM_SECOND)
-        alarm_handle = alarms.add_alarm(
-            sim,
-            alarm_time_span,
-            _on_alarm,
-            repeating=True,
-            repeating_time_span=alarm_time_span
-        )
+        TikTokPosePlayerUtils._schedule_timeout(pose_duration, lambda: _on_timeout(pose_duration))
 
-        TikTokPosePlayerUtils._active_alarms[alarm_id] = alarm_handle
+        return True
 
-        return bool(queue_result)
+    @staticmethod
+    def _find_pose_interaction(sim: Sim, pose_name: str):
+        for si in sim.si_state:
+            if getattr(si, 'pose_name', None) == pose_name:
+                return si
+        return None
+
+    @staticmethod
+    def _schedule_timeout(seconds: float, callback) -> int:
+        return get_timer_wheel().schedule(TimeSpan(max(int(seconds * REAL_MILLISECONDS_PER_SIM_SECOND), 1)), callback)
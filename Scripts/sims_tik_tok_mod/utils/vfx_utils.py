@@ -1,13 +1,11 @@
-import random
-import alarms
 from date_and_time import create_time_span
 from sims.sim import Sim
 from sims4.hash_util import hash32
-from _math import Vector3
 from typing import Tuple, Optional
 from sims_tik_tok_mod.modinfo import ModInfo
 from sims4communitylib.utils.common_log_registry import CommonLogRegistry
 from sims4communitylib.utils.sims.common_sim_utils import CommonSimUtils
+from sims_tik_tok_mod.tiktok_vfx_manager import get_vfx_manager
 
 # Core effect player
 from vfx import PlayEffect
@@ -18,8 +16,6 @@ log.enable()
 class TikTokVFXUtils:
     """Convenience helpers to play attached VFX on a Sim."""
 
-    _active_alarms = {}
-
     @staticmethod
     def play_one_shot_on_sim(
         effect_name: str,
@@ -29,42 +25,10 @@ class TikTokVFXUtils:
     ) -> bool:
         try:
             target: Sim = CommonSimUtils.get_active_sim() # type: ignore[reportAssignmentType]
-            transform_override = None
             joint_hash = hash32(joint_name) if joint_name else PlayEffect.JOINT_NAME_CURRENT_POSITION
+            offset_key = tuple(offset) if offset is not None else None
 
-            if offset is not None:
-                transform_override = Vector3(offset[0], offset[1], offset[2])
-
-            vfx = PlayEffect(
-                target=target, # type: ignore[reportAssignmentType]
-                effect_name=effect_name,
-                joint_name=joint_hash,
-                target_joint_offset=transform_override,
-                play_immediate=True
-            )
-            vfx.start()
-
-            alarm_id = random.randint(0, 1000000)
-
-            def _on_alarm(_):
-                try:
-                    log.info(f'Stopping effect {effect_name}')
-                    TikTokVFXUtils.stop(vfx)
-                    TikTokVFXUtils._active_alarms.pop(alarm_id, None).cancel()
-                except Exception as e:
-                    log.error(f'Error stopping effect {effect_name}: {e}')
-
-            time_span = create_time_span(minutes=duration)
-            alarm_handle = alarms.add_alarm(
-                target,
-                time_span,
-                _on_alarm,
-                repeating=False
-            )
-
-            TikTokVFXUtils._active_alarms[alarm_id] = alarm_handle
-
-            return True
+            return get_vfx_manager().play(target, effect_name, joint_hash, offset_key, create_time_span(minutes=duration))  # type: ignore[arg-type]
         except Exception as ex:
             log.error(f'Failed to play one-shot VFX "{effect_name}": {ex}')
             return False
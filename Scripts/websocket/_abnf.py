@@ -1,10 +1,9 @@
-import array
 import os
 import struct
 import sys
 
 from ._exceptions import *
-from ._utils import validate_utf8
+from ._utils import IncrementalUtf8Validator, validate_utf8
 from threading import Lock
 
 """
@@ -33,18 +32,40 @@ try:
     # Note that wsaccel is unmaintained.
     from wsaccel.xormask import XorMaskerSimple
 
-    def _mask(_m, _d) -> bytes:
-        return XorMaskerSimple(_m).process(_d)
+    def _mask_into(mask_key: bytes, data: bytes, out: memoryview) -> None:
+        out[:] = XorMaskerSimple(mask_key).process(data)
 
 except ImportError:
-    # wsaccel is not available, use websocket-client _mask()
+    # wsaccel is not available, XOR the data as big ints instead.
     native_byteorder = sys.byteorder
-
-    def _mask(mask_value: array.array, data_value: array.array) -> bytes:
-        datalen = len(data_value)
-        data_value = int.from_bytes(data_value, native_byteorder)
-        mask_value = int.from_bytes(mask_value * (datalen // 4) + mask_value[: datalen % 4], native_byteorder)
-        return (data_value ^ mask_value).to_bytes(datalen, native_byteorder)
+    # Bytes XORed per int. Converting to and from ints costs more per byte
+    # the longer the int gets, so large payloads are masked a chunk at a
+    # time with a mask int built once per frame. A multiple of 8 keeps the
+    # mask aligned from one chunk to the next.
+    _MASK_CHUNK = 8192
+
+    def _mask_chunk(mask_value: int, data: memoryview, length: int) -> bytes:
+        return (int.from_bytes(data, native_byteorder) ^ mask_value).to_bytes(length, native_byteorder)
+
+    def _mask_value(mask_key: bytes, length: int) -> int:
+        return int.from_bytes(mask_key * (length // 4) + mask_key[:length % 4], native_byteorder)
+
+    def _mask_into(mask_key: bytes, data: bytes, out: memoryview) -> None:
+        datalen = len(data)
+        if datalen <= _MASK_CHUNK:
+            mask_value = int.from_bytes(mask_key * (datalen // 4) + mask_key[:datalen % 4], native_byteorder)
+            out[:] = (int.from_bytes(data, native_byteorder) ^ mask_value).to_bytes(datalen, native_byteorder)
+            return
+
+        data = memoryview(data)
+        chunk_mask = _mask_value(mask_key, _MASK_CHUNK)
+        end = datalen - datalen % _MASK_CHUNK
+        for start in range(0, end, _MASK_CHUNK):
+            stop = start + _MASK_CHUNK
+            out[start:stop] = _mask_chunk(chunk_mask, data[start:stop], _MASK_CHUNK)
+        if end < datalen:
+            tail = datalen - end
+            out[end:] = _mask_chunk(_mask_value(mask_key, tail), data[end:], tail)
 
 
 __all__ = [
@@ -211,39 +232,75 @@ class ABNF:
         """
         Format this object to string(byte array) to send data to server.
         """
+        buffer = bytearray(self.format_size())
+        return b"".join(self.format_into(buffer))
+
+    def format_size(self) -> int:
+        """
+        Number of bytes format_into() writes: the header and mask key, plus
+        the payload if it is masked.
+        """
+        length = len(self.data)
+        if length < ABNF.LENGTH_7:
+            size = 2
+        elif length < ABNF.LENGTH_16:
+            size = 4
+        else:
+            size = 10
+        if self.mask:
+            size += 4 + length
+        return size
+
+    def format_into(self, buffer: bytearray) -> list:
+        """
+        Format this object for sending without building it up from pieces.
+
+        The header is packed into buffer, followed by the mask key and the
+        masked payload for masked frames. An unmasked payload is not copied.
+
+        Parameters
+        ----------
+        buffer: bytearray
+            Writable buffer of at least format_size() bytes.
+
+        Returns
+        -------
+        list of memoryview objects to send in order.
+        """
         if any(x not in (0, 1) for x in [self.fin, self.rsv1, self.rsv2, self.rsv3]):
             raise ValueError("not 0 or 1")
         if self.opcode not in ABNF.OPCODES:
             raise ValueError("Invalid OPCODE")
-        length = len(self.data)
+        data = self.data
+        if isinstance(data, str):
+            data = data.encode('latin-1')
+        length = len(data)
         if length >= ABNF.LENGTH_63:
             raise ValueError("data is too long")
 
-        frame_header = chr(self.fin << 7 |
-                           self.rsv1 << 6 | self.rsv2 << 5 | self.rsv3 << 4 |
-                           self.opcode).encode('latin-1')
+        b1 = self.fin << 7 | self.rsv1 << 6 | self.rsv2 << 5 | self.rsv3 << 4 | self.opcode
+        b2 = self.mask << 7
         if length < ABNF.LENGTH_7:
-            frame_header += chr(self.mask << 7 | length).encode('latin-1')
+            struct.pack_into("!BB", buffer, 0, b1, b2 | length)
+            position = 2
         elif length < ABNF.LENGTH_16:
-            frame_header += chr(self.mask << 7 | 0x7e).encode('latin-1')
-            frame_header += struct.pack("!H", length)
+            struct.pack_into("!BBH", buffer, 0, b1, b2 | 0x7e, length)
+            position = 4
         else:
-            frame_header += chr(self.mask << 7 | 0x7f).encode('latin-1')
-            frame_header += struct.pack("!Q", length)
+            struct.pack_into("!BBQ", buffer, 0, b1, b2 | 0x7f, length)
+            position = 10
 
+        view = memoryview(buffer)
         if not self.mask:
-            return frame_header + self.data
-        else:
-            mask_key = self.get_mask_key(4)
-            return frame_header + self._get_masked(mask_key)
-
-    def _get_masked(self, mask_key: str or bytes) -> bytes:
-        s = ABNF.mask(mask_key, self.data)
+            return [view[:position], memoryview(data)]
 
+        mask_key = self.get_mask_key(4)
         if isinstance(mask_key, str):
-            mask_key = mask_key.encode('utf-8')
-
-        return mask_key + s
+            mask_key = mask_key.encode('latin-1')
+        view[position:position + 4] = mask_key
+        position += 4
+        ABNF.mask_into(mask_key, data, view[position:position + length])
+        return [view[:position + length]]
 
     @staticmethod
     def mask(mask_key: str or bytes, data: str or bytes) -> bytes:
@@ -266,19 +323,47 @@ class ABNF:
         if isinstance(data, str):
             data = data.encode('latin-1')
 
-        return _mask(array.array("B", mask_key), array.array("B", data))
+        out = bytearray(len(data))
+        _mask_into(mask_key, data, memoryview(out))
+        return bytes(out)
+
+    @staticmethod
+    def mask_into(mask_key: bytes, data: bytes, out: memoryview) -> None:
+        """
+        Mask or unmask data into out, a writable buffer of the same length.
+
+        Parameters
+        ----------
+        mask_key: bytes
+            4 byte mask.
+        data: bytes
+            data to mask/unmask.
+        out: memoryview
+            buffer receiving the result.
+        """
+        _mask_into(mask_key, data, out)
 
 
 class frame_buffer:
     _HEADER_MASK_INDEX = 5
     _HEADER_LENGTH_INDEX = 6
+    # Initial size of the receive buffer. It grows to fit larger frames and
+    # goes back to this size once such a frame has been consumed.
+    _BUFFER_SIZE = 65536
 
-    def __init__(self, recv_fn: int, skip_utf8_validation: bool) -> None:
+    def __init__(self, recv_fn: int, skip_utf8_validation: bool, recv_into_fn=None,
+                 read_ahead: bool = False) -> None:
         self.recv = recv_fn
+        # Fills a writable buffer and returns the number of bytes received.
+        # Without it, bytes from recv_fn are copied into the buffer instead.
+        self.recv_into = recv_into_fn
+        # Receive whatever fits in the buffer rather than only the rest of the
+        # current frame. Later frames then wait here, not in the socket.
+        self.read_ahead = read_ahead and recv_into_fn is not None
         self.skip_utf8_validation = skip_utf8_validation
-        # Buffers over the packets from the layer beneath until desired amount
-        # bytes of bytes are received.
-        self.recv_buffer = []
+        # Received bytes that have not been consumed yet are
+        # self._buffer[self._start:self._end]. Frames are parsed in place.
+        self._allocate(frame_buffer._BUFFER_SIZE)
         self.clear()
         self.lock = Lock()
 
@@ -287,18 +372,60 @@ class frame_buffer:
         self.length = None
         self.mask = None
 
+    @property
+    def buffered(self) -> int:
+        """Number of received bytes that have not been consumed yet"""
+        return self._end - self._start
+
+    def has_complete_frame(self) -> bool:
+        """Whether the buffer holds the rest of the next frame"""
+        position = self._start
+        end = self._end
+        buffer = self._buffer
+
+        if self.header is None:
+            if end - position < 2:
+                return False
+            has_mask = buffer[position + 1] >> 7 & 1
+            length_bits = buffer[position + 1] & 0x7f
+            position += 2
+        else:
+            has_mask = self.header[frame_buffer._HEADER_MASK_INDEX]
+            length_bits = self.header[frame_buffer._HEADER_LENGTH_INDEX] & 0x7f
+
+        length = self.length
+        if length is None:
+            if length_bits == 0x7e:
+                if end - position < 2:
+                    return False
+                length = struct.unpack_from("!H", buffer, position)[0]
+                position += 2
+            elif length_bits == 0x7f:
+                if end - position < 8:
+                    return False
+                length = struct.unpack_from("!Q", buffer, position)[0]
+                position += 8
+            else:
+                length = length_bits
+
+        if self.mask is None and has_mask:
+            position += 4
+
+        return end - position >= length
+
     def has_received_header(self) -> bool:
         return self.header is None
 
     def recv_header(self) -> None:
-        header = self.recv_strict(2)
-        b1 = header[0]
+        self._fill(2)
+        b1 = self._buffer[self._start]
+        b2 = self._buffer[self._start + 1]
+        self._consume(2)
         fin = b1 >> 7 & 1
         rsv1 = b1 >> 6 & 1
         rsv2 = b1 >> 5 & 1
         rsv3 = b1 >> 4 & 1
         opcode = b1 & 0xf
-        b2 = header[1]
         has_mask = b2 >> 7 & 1
         length_bits = b2 & 0x7f
 
@@ -316,11 +443,13 @@ class frame_buffer:
         bits = self.header[frame_buffer._HEADER_LENGTH_INDEX]
         length_bits = bits & 0x7f
         if length_bits == 0x7e:
-            v = self.recv_strict(2)
-            self.length = struct.unpack("!H", v)[0]
+            self._fill(2)
+            self.length = struct.unpack_from("!H", self._buffer, self._start)[0]
+            self._consume(2)
         elif length_bits == 0x7f:
-            v = self.recv_strict(8)
-            self.length = struct.unpack("!Q", v)[0]
+            self._fill(8)
+            self.length = struct.unpack_from("!Q", self._buffer, self._start)[0]
+            self._consume(8)
         else:
             self.length = length_bits
 
@@ -348,7 +477,8 @@ class frame_buffer:
                 self.recv_mask()
             mask = self.mask
 
-            # Payload
+            # Payload, copied out of the receive buffer once. Servers never
+            # mask their frames, so unmasking can afford a second copy.
             payload = self.recv_strict(length)
             if has_mask:
                 payload = ABNF.mask(mask, payload)
@@ -362,26 +492,60 @@ class frame_buffer:
         return frame
 
     def recv_strict(self, bufsize: int) -> bytes:
-        shortage = bufsize - sum(map(len, self.recv_buffer))
-        while shortage > 0:
-            # Limit buffer size that we pass to socket.recv() to avoid
-            # fragmenting the heap -- the number of bytes recv() actually
-            # reads is limited by socket buffer and is relatively small,
-            # yet passing large numbers repeatedly causes lots of large
-            # buffers allocated and then shrunk, which results in
-            # fragmentation.
-            bytes_ = self.recv(min(16384, shortage))
-            self.recv_buffer.append(bytes_)
-            shortage -= len(bytes_)
-
-        unified = b"".join(self.recv_buffer)
-
-        if shortage == 0:
-            self.recv_buffer = []
-            return unified
-        else:
-            self.recv_buffer = [unified[bufsize:]]
-            return unified[:bufsize]
+        self._fill(bufsize)
+        data = self._view[self._start:self._start + bufsize].tobytes()
+        self._consume(bufsize)
+        return data
+
+    def _allocate(self, size: int) -> None:
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+    def _fill(self, bufsize: int) -> None:
+        """Receive until at least bufsize bytes are buffered"""
+        while self._end - self._start < bufsize:
+            free = len(self._buffer) - self._end
+            if len(self._buffer) - self._start < bufsize or (self.read_ahead and free < 4096):
+                self._make_room(bufsize)
+            shortage = bufsize - (self._end - self._start)
+            if self.read_ahead:
+                received = self.recv_into(self._view[self._end:])
+            elif self.recv_into is not None:
+                # Only what the current read still needs, so bytes of later
+                # frames stay in the socket where select() can see them
+                received = self.recv_into(self._view[self._end:self._end + shortage])
+            else:
+                # Limit buffer size that we pass to socket.recv() to avoid
+                # fragmenting the heap.
+                bytes_ = self.recv(min(16384, shortage))
+                received = len(bytes_)
+                self._view[self._end:self._end + received] = bytes_
+            self._end += received
+
+    def _make_room(self, bufsize: int) -> None:
+        pending = self._end - self._start
+        if bufsize > len(self._buffer):
+            view = self._view
+            start = self._start
+            self._allocate(max(bufsize, len(self._buffer) * 2))
+            self._view[:pending] = view[start:start + pending]
+            view.release()
+        elif pending:
+            # memoryview assignment moves overlapping bytes correctly
+            self._view[:pending] = self._view[self._start:self._end]
+        self._start = 0
+        self._end = pending
+
+    def _consume(self, size: int) -> None:
+        self._start += size
+        if self._start == self._end:
+            if len(self._buffer) > frame_buffer._BUFFER_SIZE:
+                self._view.release()
+                self._allocate(frame_buffer._BUFFER_SIZE)
+            self._start = 0
+            self._end = 0
 
 
 class continuous_frame:
@@ -391,6 +555,8 @@ class continuous_frame:
         self.skip_utf8_validation = skip_utf8_validation
         self.cont_data = None
         self.recving_frames = None
+        # Text is validated fragment by fragment as it arrives
+        self.utf8_validator = IncrementalUtf8Validator()
 
     def validate(self, frame: ABNF) -> None:
         if not self.recving_frames and frame.opcode == ABNF.OPCODE_CONT:
@@ -406,6 +572,14 @@ class continuous_frame:
             if frame.opcode in (ABNF.OPCODE_TEXT, ABNF.OPCODE_BINARY):
                 self.recving_frames = frame.opcode
             self.cont_data = [frame.opcode, frame.data]
+            self.utf8_validator.reset()
+
+        if not self.fire_cont_frame and self.cont_data[0] == ABNF.OPCODE_TEXT and not self.skip_utf8_validation and \
+                not self.utf8_validator.validate(frame.data, frame.fin):
+            self.cont_data = None
+            self.recving_frames = None
+            raise WebSocketPayloadException(
+                "cannot decode: " + repr(frame.data))
 
         if frame.fin:
             self.recving_frames = None
@@ -417,8 +591,4 @@ class continuous_frame:
         data = self.cont_data
         self.cont_data = None
         frame.data = data[1]
-        if not self.fire_cont_frame and data[0] == ABNF.OPCODE_TEXT and not self.skip_utf8_validation and not validate_utf8(frame.data):
-            raise WebSocketPayloadException(
-                "cannot decode: " + repr(frame.data))
-
         return [data[0], frame]
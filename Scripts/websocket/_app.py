@@ -47,10 +47,28 @@ class DispatcherBase:
     """
     DispatcherBase
     """
+    # Frames read per wakeup before pings and timeouts are checked again
+    max_frames_per_read = 100
+
     def __init__(self, app: Any, ping_timeout: float) -> None:
         self.app = app
         self.ping_timeout = ping_timeout
 
+    def has_buffered_frame(self) -> bool:
+        return bool(self.app.sock) and self.app.sock.has_buffered_frame()
+
+    def drain(self, read_callback: Callable) -> bool:
+        """
+        Read a frame, then keep reading frames that were received along with
+        it, up to max_frames_per_read. Returns False once read_callback does.
+        """
+        for _ in range(self.max_frames_per_read):
+            if not read_callback():
+                return False
+            if not self.has_buffered_frame():
+                break
+        return True
+
     def timeout(self, seconds: int, callback: Callable) -> None:
         time.sleep(seconds)
         callback()
@@ -75,9 +93,9 @@ class Dispatcher(DispatcherBase):
         sel.register(self.app.sock.sock, selectors.EVENT_READ)
         try:
             while self.app.keep_running:
-                r = sel.select(self.ping_timeout)
+                r = self.has_buffered_frame() or sel.select(self.ping_timeout)
                 if r:
-                    if not read_callback():
+                    if not self.drain(read_callback):
                         break
                 check_callback()
         finally:
@@ -96,7 +114,7 @@ class SSLDispatcher(DispatcherBase):
             while self.app.keep_running:
                 r = self.select(sock, sel)
                 if r:
-                    if not read_callback():
+                    if not self.drain(read_callback):
                         break
                 check_callback()
         finally:
@@ -104,7 +122,7 @@ class SSLDispatcher(DispatcherBase):
 
     def select(self, sock, sel:selectors.DefaultSelector):
         sock = self.app.sock.sock
-        if sock.pending():
+        if sock.pending() or self.has_buffered_frame():
             return [sock,]
 
         r = sel.select(self.ping_timeout)
@@ -405,7 +423,9 @@ class WebSocketApp:
                 self.get_mask_key, sockopt=sockopt, sslopt=sslopt,
                 fire_cont_frame=self.on_cont_message is not None,
                 skip_utf8_validation=skip_utf8_validation,
-                enable_multithread=True)
+                enable_multithread=True,
+                # Custom dispatchers only read when the socket is readable
+                read_ahead=not custom_dispatcher)
 
             self.sock.settimeout(getdefaulttimeout())
             try:
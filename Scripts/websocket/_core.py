@@ -71,11 +71,19 @@ class WebSocket:
         If set to True, lock send method.
     skip_utf8_validation: bool
         Skip utf8 validation.
+    read_ahead: bool
+        Receive as many bytes as are available instead of only the rest of
+        the current frame. Frames received this way are buffered and no
+        longer make the socket readable, so only enable it when the caller
+        drains them with has_buffered_frame(). Default is False.
     """
 
+    # Frames up to this size are formatted without allocating
+    _SEND_BUFFER_SIZE = 65536
+
     def __init__(self, get_mask_key=None, sockopt=None, sslopt=None,
                  fire_cont_frame: bool = False, enable_multithread: bool = True,
-                 skip_utf8_validation: bool = False, **_):
+                 skip_utf8_validation: bool = False, read_ahead: bool = False, **_):
         """
         Initialize WebSocket object.
 
@@ -91,7 +99,9 @@ class WebSocket:
         self.connected = False
         self.get_mask_key = get_mask_key
         # These buffer over the build-up of a single frame.
-        self.frame_buffer = frame_buffer(self._recv, skip_utf8_validation)
+        # Header, mask key and masked payload of frames being sent
+        self._send_buffer = bytearray(self._SEND_BUFFER_SIZE)
+        self.frame_buffer = frame_buffer(self._recv, skip_utf8_validation, self._recv_into, read_ahead)
         self.cont_frame = continuous_frame(
             fire_cont_frame, skip_utf8_validation)
 
@@ -301,15 +311,16 @@ class WebSocket:
         """
         if self.get_mask_key:
             frame.get_mask_key = self.get_mask_key
-        data = frame.format()
-        length = len(data)
-        if (isEnabledForTrace()):
-            trace("++Sent raw: " + repr(data))
-            trace("++Sent decoded: " + frame.__str__())
         with self.lock:
-            while data:
-                l = self._send(data)
-                data = data[l:]
+            size = frame.format_size()
+            # Frames that do not fit the reusable buffer get one of their own
+            buffer = self._send_buffer if size <= len(self._send_buffer) else bytearray(size)
+            buffers = frame.format_into(buffer)
+            length = sum(len(b) for b in buffers)
+            if (isEnabledForTrace()):
+                trace("++Sent raw: " + repr(b"".join(buffers)))
+                trace("++Sent decoded: " + frame.__str__())
+            self._send_buffers(buffers)
 
         return length
 
@@ -444,6 +455,13 @@ class WebSocket:
         """
         return self.frame_buffer.recv_frame()
 
+    def has_buffered_frame(self) -> bool:
+        """
+        Whether a whole frame has already been received and can be read
+        without waiting for the socket.
+        """
+        return self.frame_buffer.has_complete_frame()
+
     def send_close(self, status: int = STATUS_NORMAL, reason: bytes = b""):
         """
         Send close data to the server.
@@ -524,6 +542,16 @@ class WebSocket:
     def _send(self, data: str or bytes):
         return send(self.sock, data)
 
+    def _send_buffers(self, buffers: list):
+        while buffers:
+            sent = sendmsg(self.sock, buffers)
+            # Skip past what was sent without copying what is left
+            while buffers and sent >= len(buffers[0]):
+                sent -= len(buffers[0])
+                del buffers[0]
+            if sent:
+                buffers[0] = buffers[0][sent:]
+
     def _recv(self, bufsize):
         try:
             return recv(self.sock, bufsize)
@@ -534,6 +562,16 @@ class WebSocket:
             self.connected = False
             raise
 
+    def _recv_into(self, buffer):
+        try:
+            return recv_into(self.sock, buffer)
+        except WebSocketConnectionClosedException:
+            if self.sock:
+                self.sock.close()
+            self.sock = None
+            self.connected = False
+            raise
+
 
 def create_connection(url: str, timeout=None, class_=WebSocket, **options):
     """
@@ -38,7 +38,7 @@ if hasattr(socket, "TCP_KEEPCNT"):
 _default_timeout = None
 
 __all__ = ["DEFAULT_SOCKET_OPTION", "sock_opt", "setdefaulttimeout", "getdefaulttimeout",
-           "recv", "recv_line", "send"]
+           "recv", "recv_into", "recv_line", "send", "sendmsg"]
 
 
 class sock_opt:
@@ -125,6 +125,57 @@ def recv(sock: socket.socket, bufsize: int) -> bytes:
     return bytes_
 
 
+def recv_into(sock: socket.socket, buffer: memoryview) -> int:
+    """
+    Receive into a writable buffer, returning the number of bytes received.
+    Errors and timeouts are handled the same way as in recv().
+    """
+    if not sock:
+        raise WebSocketConnectionClosedException("socket is already closed.")
+
+    def _recv_into():
+        try:
+            return sock.recv_into(buffer)
+        except SSLWantReadError:
+            pass
+        except socket.error as exc:
+            error_code = extract_error_code(exc)
+            if error_code != errno.EAGAIN and error_code != errno.EWOULDBLOCK:
+                raise
+
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ)
+
+        r = sel.select(sock.gettimeout())
+        sel.close()
+
+        if r:
+            return sock.recv_into(buffer)
+
+    try:
+        if sock.gettimeout() == 0:
+            received = sock.recv_into(buffer)
+        else:
+            received = _recv_into()
+    except TimeoutError:
+        raise WebSocketTimeoutException("Connection timed out")
+    except socket.timeout as e:
+        message = extract_err_message(e)
+        raise WebSocketTimeoutException(message)
+    except SSLError as e:
+        message = extract_err_message(e)
+        if isinstance(message, str) and 'timed out' in message:
+            raise WebSocketTimeoutException(message)
+        else:
+            raise
+
+    if not received:
+        raise WebSocketConnectionClosedException(
+            "Connection to remote host was lost.")
+
+    return received
+
+
 def recv_line(sock: socket.socket) -> bytes:
     line = []
     while True:
@@ -139,12 +190,35 @@ def send(sock: socket.socket, data: bytes) -> int:
     if isinstance(data, str):
         data = data.encode('utf-8')
 
+    return _send_with_retry(sock, lambda: sock.send(data))
+
+
+def sendmsg(sock: socket.socket, buffers: list) -> int:
+    """
+    Send several buffers with a single sendmsg() call, returning the number
+    of bytes sent. Sockets without a usable sendmsg(), such as SSL sockets
+    and sockets on Windows, send the first buffer only.
+    """
+    if not _has_sendmsg(sock):
+        return _send_with_retry(sock, lambda: sock.send(buffers[0]))
+
+    return _send_with_retry(sock, lambda: sock.sendmsg(buffers))
+
+
+def _has_sendmsg(sock: socket.socket) -> bool:
+    if not hasattr(sock, "sendmsg"):
+        return False
+    # SSLSocket.sendmsg() raises NotImplementedError
+    return not (HAVE_SSL and isinstance(sock, ssl.SSLSocket))
+
+
+def _send_with_retry(sock: socket.socket, send_fn) -> int:
     if not sock:
         raise WebSocketConnectionClosedException("socket is already closed.")
 
     def _send():
         try:
-            return sock.send(data)
+            return send_fn()
         except SSLWantWriteError:
             pass
         except socket.error as exc:
@@ -161,11 +235,11 @@ def send(sock: socket.socket, data: bytes) -> int:
         sel.close()
 
         if w:
-            return sock.send(data)
+            return send_fn()
 
     try:
         if sock.gettimeout() == 0:
-            return sock.send(data)
+            return send_fn()
         else:
             return _send()
     except socket.timeout as e:
@@ -16,7 +16,9 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-__all__ = ["NoLock", "validate_utf8", "extract_err_message", "extract_error_code"]
+import codecs
+
+__all__ = ["NoLock", "IncrementalUtf8Validator", "validate_utf8", "extract_err_message", "extract_error_code"]
 
 
 class NoLock:
@@ -28,6 +30,46 @@ class NoLock:
         pass
 
 
+# Non-ASCII text is decoded this many bytes at a time, so validating a large
+# message never builds a str of the whole message.
+_UTF8_CHUNK = 65536
+
+
+class IncrementalUtf8Validator:
+    """
+    Validates UTF-8 that arrives in pieces, such as the fragments of a text
+    message. A character may be split between two pieces.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")("strict")
+
+    def reset(self) -> None:
+        self._decoder.reset()
+
+    def validate(self, utfbytes: bytes, final: bool = False) -> bool:
+        """
+        Validate the next piece.
+        utfbytes: the next bytes of the text.
+        final: whether this is the last piece, a character it leaves
+            incomplete is invalid then.
+        return value: False once the bytes so far cannot be valid utf8.
+        """
+        decoder = self._decoder
+        try:
+            # ASCII is valid on its own unless a character is still pending
+            if utfbytes.isascii() and not decoder.getstate()[0]:
+                return True
+            view = memoryview(utfbytes)
+            for start in range(0, len(view), _UTF8_CHUNK):
+                decoder.decode(view[start:start + _UTF8_CHUNK])
+            if final:
+                decoder.decode(b"", True)
+        except UnicodeDecodeError:
+            return False
+        return True
+
+
 try:
     # If wsaccel is available we use compiled routines to validate UTF-8
     # strings.
@@ -37,58 +79,21 @@ try:
         return Utf8Validator().validate(utfbytes)[0]
 
 except ImportError:
-    # UTF-8 validator
-    # python implementation of http://bjoern.hoehrmann.de/utf-8/decoder/dfa/
-
-    _UTF8_ACCEPT = 0
-    _UTF8_REJECT = 12
-
-    _UTF8D = [
-        # The first part of the table maps bytes to character classes that
-        # to reduce the size of the transition table and create bitmasks.
-        0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,  0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,
-        0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,  0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,
-        0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,  0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,
-        0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,  0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,
-        1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,  9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,
-        7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,  7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,
-        8,8,2,2,2,2,2,2,2,2,2,2,2,2,2,2,  2,2,2,2,2,2,2,2,2,2,2,2,2,2,2,2,
-        10,3,3,3,3,3,3,3,3,3,3,3,3,4,3,3, 11,6,6,6,5,8,8,8,8,8,8,8,8,8,8,8,
-
-        # The second part is a transition table that maps a combination
-        # of a state of the automaton and a character class to a state.
-        0,12,24,36,60,96,84,12,12,12,48,72, 12,12,12,12,12,12,12,12,12,12,12,12,
-        12, 0,12,12,12,12,12, 0,12, 0,12,12, 12,24,12,12,12,12,12,24,12,24,12,12,
-        12,12,12,12,12,12,12,24,12,12,12,12, 12,24,12,12,12,12,12,12,12,24,12,12,
-        12,12,12,12,12,12,12,36,12,36,12,12, 12,36,12,12,12,12,12,36,12,36,12,12,
-        12,36,12,12,12,12,12,12,12,12,12,12, ]
-
-    def _decode(state: int, codep: int, ch: int) -> tuple:
-        tp = _UTF8D[ch]
-
-        codep = (ch & 0x3f) | (codep << 6) if (
-            state != _UTF8_ACCEPT) else (0xff >> tp) & ch
-        state = _UTF8D[256 + state + tp]
-
-        return state, codep
-
-    def _validate_utf8(utfbytes: str or bytes) -> bool:
-        state = _UTF8_ACCEPT
-        codep = 0
-        for i in utfbytes:
-            state, codep = _decode(state, codep, i)
-            if state == _UTF8_REJECT:
-                return False
+    # The utf-8 codec validates in C, one bounded chunk at a time.
 
-        return True
+    def _validate_utf8(utfbytes: bytes) -> bool:
+        return IncrementalUtf8Validator().validate(utfbytes, True)
 
 
-def validate_utf8(utfbytes: str or bytes) -> bool:
+def validate_utf8(utfbytes: bytes) -> bool:
     """
     validate utf8 byte string.
     utfbytes: utf byte string to check.
     return value: if valid utf8 string, return true. Otherwise, return false.
     """
+    # Most text is plain ASCII, which is valid without decoding it
+    if utfbytes.isascii():
+        return True
     return _validate_utf8(utfbytes)
 
 
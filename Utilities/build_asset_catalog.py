@@ -0,0 +1,165 @@
+"""
+Builds the animation and VFX name catalog the mod validates and looks up names with.
+
+The name lists (animations_list.txt, vfx_list.txt) are turned into compact binary sections: names sorted
+case-insensitively with their hash32 and package of origin, a hash lookup table, a first-letter prefix table
+and a trigram index. A ts4script is a zip archive, so the sections are embedded zlib compressed in a generated
+module (sims_tik_tok_mod/tiktok_asset_catalog_data.py) that compile.py packs with the rest of the scripts.
+
+Usage (from the project root):
+    python -m Utilities.build_asset_catalog
+"""
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, List, Tuple
+
+CATALOG_SOURCES = (
+    ('animation', 'animations_list.txt'),
+    ('vfx', 'vfx_list.txt'),
+)
+
+DEFAULT_OUTPUT = os.path.join('Scripts', 'sims_tik_tok_mod', 'tiktok_asset_catalog_data.py')
+
+# Must match Scripts/sims_tik_tok_mod/tiktok_asset_catalog.py
+SECTION_MAGIC = b'TTCS'
+SECTION_VERSION = 1
+SECTION_HEADER = struct.Struct('<4sBIHI')
+U32 = struct.Struct('<I')
+TRIGRAM_ENTRY = struct.Struct('<3sI')
+
+FNV_OFFSET_32 = 0x811C9DC5
+FNV_PRIME_32 = 0x01000193
+
+
+def hash32(name: str) -> int:
+    """FNV-1 32 bit hash of the lowercased name, the same as sims4.hash_util.hash32"""
+    value = FNV_OFFSET_32
+    for byte in name.lower().encode('utf-8'):
+        value = (value * FNV_PRIME_32) & 0xFFFFFFFF
+        value ^= byte
+    return value
+
+
+def trigrams(name: str) -> Iterable[bytes]:
+    encoded = name.lower().encode('utf-8')
+    return {encoded[index:index + 3] for index in range(len(encoded) - 2)}
+
+
+def read_name_list(path: str) -> Dict[str, str]:
+    """Names and the package they first appear in. Lines like [/path/File.package] start a package."""
+    names: Dict[str, str] = {}
+    package = ''
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                package = line[1:-1]
+                continue
+            names.setdefault(line, package)
+    return names
+
+
+def _encode_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def build_section(names: Dict[str, str]) -> bytes:
+    ordered = sorted(names, key=lambda name: (name.lower(), name))
+    packages: List[str] = sorted(set(names.values()))
+    package_ids = {package: index for index, package in enumerate(packages)}
+    if len(packages) > 255:
+        raise ValueError(f'Too many packages for a u8 package id: {len(packages)}')
+
+    name_blob = bytearray()
+    offsets = bytearray()
+    hashes = bytearray()
+    hash_values: List[Tuple[int, int]] = []
+    package_column = bytearray()
+    first_char_index = [0] * 257
+    postings: Dict[bytes, List[int]] = {}
+
+    for name_id, name in enumerate(ordered):
+        offsets += U32.pack(len(name_blob))
+        encoded = name.encode('utf-8')
+        name_blob += encoded
+        value = hash32(name)
+        hashes += U32.pack(value)
+        hash_values.append((value, name_id))
+        package_column.append(package_ids[names[name]])
+        first_char_index[name.lower().encode('utf-8')[0] + 1] += 1
+        for trigram in trigrams(name):
+            postings.setdefault(trigram, []).append(name_id)
+    offsets += U32.pack(len(name_blob))
+
+    # Running totals, so entry c is the first name starting with byte c and entry c + 1 is one past the last
+    for index in range(1, 257):
+        first_char_index[index] += first_char_index[index - 1]
+
+    # Name ids ordered by hash, for finding the name behind a hash
+    hash_order = bytearray()
+    for _, name_id in sorted(hash_values):
+        hash_order += U32.pack(name_id)
+
+    trigram_table = bytearray()
+    posting_blob = bytearray()
+    for trigram in sorted(postings):
+        trigram_table += TRIGRAM_ENTRY.pack(trigram, len(posting_blob))
+        previous = 0
+        for name_id in postings[trigram]:
+            _encode_varint(name_id - previous, posting_blob)
+            previous = name_id
+    trigram_table += TRIGRAM_ENTRY.pack(b'\xff\xff\xff', len(posting_blob))
+
+    package_table = bytearray()
+    for package in packages:
+        encoded = package.encode('utf-8')
+        package_table += struct.pack('<H', len(encoded)) + encoded
+
+    return b''.join((
+        SECTION_HEADER.pack(SECTION_MAGIC, SECTION_VERSION, len(ordered), len(packages), len(postings)),
+        package_table,
+        offsets,
+        hashes,
+        hash_order,
+        bytes(package_column),
+        b''.join(U32.pack(value) for value in first_char_index),
+        trigram_table,
+        U32.pack(len(posting_blob)),
+        posting_blob,
+        name_blob,
+    ))
+
+
+def build_catalog_module(project_root: str = '.', output_path: str = DEFAULT_OUTPUT) -> Dict[str, int]:
+    """Write the generated catalog module, returns the number of names per section"""
+    counts = {}
+    lines = [
+        '# Generated by Utilities/build_asset_catalog.py from the name lists in the project root. Do not edit.',
+        'CATALOG_VERSION = {}'.format(SECTION_VERSION),
+        'CATALOG_SECTIONS = {',
+    ]
+    for kind, file_name in CATALOG_SOURCES:
+        names = read_name_list(os.path.join(project_root, file_name))
+        section = zlib.compress(build_section(names), 9)
+        counts[kind] = len(names)
+        lines.append(f'    {kind!r}: (')
+        for index in range(0, len(section), 96):
+            lines.append(f'        {section[index:index + 96]!r}')
+        lines.append('    ),')
+    lines.append('}')
+
+    with open(os.path.join(project_root, output_path), 'w', encoding='utf-8') as file:
+        file.write('\n'.join(lines) + '\n')
+    return counts
+
+
+if __name__ == '__main__':
+    for section_kind, name_count in build_catalog_module().items():
+        print(f'{section_kind}: {name_count} names')
+    print(f'Wrote {DEFAULT_OUTPUT}')
@@ -0,0 +1,522 @@
+"""
+Offline load harness for the bridge -> mod pipeline.
+
+Plays synthetic or recorded gift/like streams into TikTokBridgeClient through a local websocket server that
+stands in for the Node bridge, while the main thread plays the game and ticks the dispatcher. Nothing from the
+game is needed: S4CL and the game modules are stubbed, the mod code and the vendored websocket package are real.
+
+Usage (from the project root):
+    python -m Utilities.perf.bridge_load_harness --rates 10 100 1000 --duration 5
+    python -m Utilities.perf.bridge_load_harness --protocol json --replay recorded_events.jsonl
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import socket
+import struct
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+from Utilities.perf.game_stubs import install_game_stubs
+
+install_game_stubs()
+
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod import tiktok_action_dispatcher, tiktok_bridge_client, tiktok_latency_tracer, tiktok_like_aggregator, tiktok_viewer_registry  # noqa: E402
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod import tiktok_compact_protocol as compact  # noqa: E402
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod.notifications import tiktok_notification_aggregator  # noqa: E402
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod.notifications.tiktok_gift_notifications import TikTokActionNotifications  # noqa: E402
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod.tiktok_action_registry import TikTokActionRegistry  # noqa: E402
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod.utils.latency_histogram import TikTokLatencyHistogram  # noqa: E402
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_GIFT_MAPPINGS_JS = os.path.join(_PROJECT_ROOT, 'bridge_service', 'gift-mappings.js')
+_WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+# Same names as generateRandomName() in bridge-service.js
+_FIRST_NAMES = ('Alice', 'Bob', 'Charlie', 'Diana', 'Eve', 'Frank')
+_LAST_NAMES = ('Smith', 'Jones', 'Williams', 'Brown', 'Davis', 'Miller')
+
+_OPCODE_TEXT = 0x1
+_OPCODE_BINARY = 0x2
+_OPCODE_CLOSE = 0x8
+_OPCODE_PING = 0x9
+_OPCODE_PONG = 0xa
+
+
+def load_tiktok_gifts() -> List[Dict[str, Any]]:
+    """Read the TIKTOK_GIFTS catalogue from the bridge's gift-mappings.js."""
+    pattern = re.compile(r"\{ name: '((?:[^'\\]|\\.)*)', icon: '([^']*)', cost: (\d+), tier: '(\w+)', id: '(\w+)' \}")
+    with open(_GIFT_MAPPINGS_JS, encoding='utf-8') as file:
+        source = file.read()
+    return [
+        {'name': name.replace("\\'", "'"), 'icon': icon, 'cost': int(cost), 'tier': tier, 'id': gift_id}
+        for name, icon, cost, tier, gift_id in pattern.findall(source)
+    ]
+
+
+def generate_random_name(rng: random.Random) -> str:
+    return f'{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}'
+
+
+class SyntheticEventSource:
+    """Endless stream of events shaped like the manual gift commands of the bridge."""
+
+    def __init__(self, actions: List[str], viewer_count: int = 50, like_ratio: float = 0.0, seed: int = 1):
+        self.actions = actions
+        self.viewer_count = viewer_count
+        self.like_ratio = like_ratio
+        self.rng = random.Random(seed)
+        self.gifts = load_tiktok_gifts()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        rng = self.rng
+        while True:
+            user = f'viewer{rng.randrange(self.viewer_count)}'
+            if rng.random() < self.like_ratio:
+                # Raw likes, forwarded by the bridge as they arrive from TikTok
+                yield {
+                    'type': 'sims_action',
+                    'user': user,
+                    'userNickname': generate_random_name(rng),
+                    'action': 'like',
+                    'count': rng.randint(1, 15),
+                    'context': {'giftName': 'Like', 'giftId': 0, 'diamondCount': 0},
+                }
+                continue
+
+            gift = rng.choice(self.gifts)
+            yield {
+                'type': 'sims_action',
+                'user': user,
+                'userNickname': generate_random_name(rng),
+                'action': rng.choice(self.actions),
+                'count': 1,
+                'context': {
+                    'giftName': gift['name'],
+                    'giftId': gift['id'],
+                    'diamondCount': gift['cost'],
+                    'profilePictureUrl': 'https://via.placeholder.com/150/4ECDC4/FFFFFF?text=Manual',
+                    'tier': gift['tier'],
+                    'icon': gift['icon'],
+                    'isManual': True
+                },
+            }
+
+
+class ReplayEventSource:
+    """Loops over recorded bridge payloads, one JSON object per line."""
+
+    def __init__(self, path: str):
+        with open(path, encoding='utf-8') as file:
+            self.events = [json.loads(line) for line in file if line.strip()]
+        if not self.events:
+            raise ValueError(f'No events in {path}')
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        while True:
+            for event in self.events:
+                yield json.loads(json.dumps(event))
+
+
+class CompactFrameEncoder:
+    """Python twin of CompactEncoder in bridge_service/compact-protocol.js."""
+
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        self.records: List[bytes] = []
+
+    def intern(self, value: Any) -> int:
+        if value is None:
+            return compact._NO_STRING
+        text = str(value)
+        string_id = self.strings.get(text)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings[text] = string_id
+            data = text.encode('utf-8')
+            self.records.append(bytes((compact._RECORD_STRING,)) + compact._STRING_HEADER.pack(string_id, len(data)) + data)
+        return string_id
+
+    def add_action(self, payload: Dict[str, Any]) -> None:
+        context = payload.get('context', {})
+        string_ids = [self.intern(value) for value in (
+            payload.get('user'), payload.get('userNickname'), payload.get('action'), context.get('giftName'), context.get('giftId')
+        )]
+        flags = (compact._FLAG_IS_MANUAL if context.get('isManual') else 0) | (0 if 'diamondCount' in context else compact._FLAG_NO_DIAMOND_COUNT)
+        self.records.append(bytes((compact._RECORD_SIMS_ACTION,)) + compact._SIMS_ACTION.pack(
+            payload.get('seq', 0), payload['trace']['bridgeReceivedAt'], *string_ids,
+            context.get('diamondCount', 0), payload.get('count', 1), flags
+        ))
+
+    def flush(self, sent_at: float) -> bytes:
+        frame = compact._FRAME_HEADER.pack(compact._FRAME_MAGIC, compact._FRAME_VERSION, len(self.records), sent_at) + b''.join(self.records)
+        self.records = []
+        return frame
+
+
+class BridgeStandIn:
+    """Minimal websocket server speaking the bridge side of the protocol to a single mod client."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, allow_compact: bool = True):
+        self.allow_compact = allow_compact
+        self.session_id = str(uuid.uuid4())
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((host, port))
+        self._server.listen(1)
+        self.host, self.port = self._server.getsockname()
+
+        self._client: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.closed = threading.Event()
+
+        self.protocol = compact.JSON_PROTOCOL
+        self.acked_seqs = set()
+        self.ack_count = 0
+        self.last_latency: Dict[str, Any] = {}
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        try:
+            client, _ = self._server.accept()
+        except OSError:
+            return
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._client = client
+        try:
+            self._handshake(client)
+            self.send_text(json.dumps({'type': 'connection', 'message': 'Connected to the load harness'}))
+            while True:
+                opcode, payload = self._read_frame(client)
+                if opcode == _OPCODE_CLOSE:
+                    self._send_frame(_OPCODE_CLOSE, payload[:2])
+                    break
+                if opcode == _OPCODE_PING:
+                    self._send_frame(_OPCODE_PONG, payload)
+                elif opcode == _OPCODE_TEXT:
+                    self._handle_message(json.loads(payload.decode('utf-8')))
+        except (OSError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.closed.set()
+            client.close()
+
+    @staticmethod
+    def _read_exact(client: socket.socket, size: int) -> bytes:
+        data = b''
+        while len(data) < size:
+            chunk = client.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError('Client disconnected')
+            data += chunk
+        return data
+
+    def _handshake(self, client: socket.socket) -> None:
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = client.recv(4096)
+            if not chunk:
+                raise ConnectionError('Client disconnected during handshake')
+            request += chunk
+        key = re.search(rb'Sec-WebSocket-Key: *(\S+)', request, re.IGNORECASE).group(1)
+        accept = base64.b64encode(hashlib.sha1(key + _WEBSOCKET_GUID.encode('ascii')).digest())
+        client.sendall(
+            b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+            b'Sec-WebSocket-Accept: ' + accept + b'\r\n\r\n'
+        )
+
+    def _read_frame(self, client: socket.socket):
+        first, second = self._read_exact(client, 2)
+        length = second & 0x7f
+        if length == 126:
+            length = struct.unpack('!H', self._read_exact(client, 2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', self._read_exact(client, 8))[0]
+        mask = self._read_exact(client, 4) if second & 0x80 else b''
+        payload = self._read_exact(client, length)
+        if mask:
+            repeated = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(length, 'big')
+        return first & 0x0f, payload
+
+    def _send_frame(self, opcode: int, payload: bytes) -> None:
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+        elif length < 0x10000:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+        with self._send_lock:
+            self._client.sendall(header + payload)
+            self.frames_sent += 1
+            self.bytes_sent += len(header) + length
+
+    def send_text(self, text: str) -> None:
+        self._send_frame(_OPCODE_TEXT, text.encode('utf-8'))
+
+    def send_binary(self, data: bytes) -> None:
+        self._send_frame(_OPCODE_BINARY, data)
+
+    def _handle_message(self, data: Dict[str, Any]) -> None:
+        message_type = data.get('type')
+        if message_type == 'hello':
+            if self.allow_compact and compact.COMPACT_PROTOCOL in data.get('protocols', []):
+                self.protocol = compact.COMPACT_PROTOCOL
+            self.send_text(json.dumps({'type': 'protocol', 'protocol': self.protocol, 'sessionId': self.session_id}))
+            self.ready.set()
+        elif message_type == 'ack':
+            self.acked_seqs.update(data.get('seqs', []))
+            self.ack_count += 1
+            self.last_latency = data.get('latency', {})
+
+    def close(self) -> None:
+        self._server.close()
+        self._thread.join(timeout=5)
+
+
+class LoadGenerator:
+    """Sends events from a source at a fixed rate, batched every batch_delay_ms like the bridge does."""
+
+    def __init__(self, server: BridgeStandIn, events: Iterator[Dict[str, Any]], rate: float, duration: float, batch_delay_ms: float = 5.0):
+        self.server = server
+        self.events = events
+        self.rate = rate
+        self.duration = duration
+        self.batch_delay_ms = batch_delay_ms
+
+        self.sent_actions = 0
+        self.sent_likes = 0
+        self.elapsed = 0.0
+        self.finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _run(self) -> None:
+        server = self.server
+        encoder = CompactFrameEncoder() if server.protocol == compact.COMPACT_PROTOCOL else None
+        total = int(self.rate * self.duration)
+        start = time.perf_counter()
+        sent = 0
+
+        try:
+            while sent < total:
+                now = time.perf_counter()
+                due = min(total, int((now - start) * self.rate) + 1)
+                now_ms = time.time() * 1000.0
+                actions = []
+                while sent < due:
+                    event = next(self.events)
+                    sent += 1
+                    if event.get('type') != 'sims_action':
+                        server.send_text(json.dumps(event))
+                        continue
+                    # Like the bridge, likes are sent best effort without a sequence and are never acked
+                    if event.get('action') == 'like':
+                        self.sent_likes += 1
+                    else:
+                        self.sent_actions += 1
+                        event['seq'] = self.sent_actions
+                    event['trace'] = {'bridgeReceivedAt': now_ms}
+                    actions.append(event)
+
+                if actions:
+                    sent_at = time.time() * 1000.0
+                    if encoder is not None:
+                        for event in actions:
+                            encoder.add_action(event)
+                        server.send_binary(encoder.flush(sent_at))
+                    else:
+                        for event in actions:
+                            event['trace']['bridgeSentAt'] = sent_at
+                        if len(actions) == 1:
+                            server.send_text(json.dumps(actions[0]))
+                        else:
+                            server.send_text(json.dumps({'type': 'sims_action_batch', 'actions': actions}))
+
+                time.sleep(self.batch_delay_ms / 1000.0)
+        except OSError:
+            pass
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self.finished.set()
+
+
+def run_load(rate: float, duration: float, events: Iterator[Dict[str, Any]], protocol: str = compact.COMPACT_PROTOCOL,
+             tick_rate: float = 30.0, settle_seconds: float = 5.0, effect_cost_ms: float = 0.0) -> Dict[str, Any]:
+    """Play one stream at the given rate and return the measurements."""
+    server = BridgeStandIn(allow_compact=protocol == compact.COMPACT_PROTOCOL)
+
+    # Fresh globals so every run starts from an empty pipeline
+    client = tiktok_bridge_client.TikTokBridgeClient(server.host, server.port)
+    tiktok_bridge_client._bridge_client = client
+    tiktok_action_dispatcher._action_dispatcher = None
+    tiktok_notification_aggregator._notification_aggregator = None
+    tiktok_latency_tracer._latency_tracer = None
+    tiktok_viewer_registry._viewer_registry = None
+    tiktok_like_aggregator._like_aggregator = None
+
+    # Time everything the websocket thread does per frame: decoding, dedupe and enqueueing
+    frame_times = TikTokLatencyHistogram(sample_count=100000)
+    handle_message = client._on_message
+
+    def _timed_on_message(ws, message) -> None:
+        started = time.perf_counter()
+        handle_message(ws, message)
+        frame_times.record((time.perf_counter() - started) * 1000.0)
+
+    client._on_message = _timed_on_message
+
+    TikTokActionNotifications.initialize()
+    dispatcher = tiktok_action_dispatcher.get_action_dispatcher()
+
+    if effect_cost_ms > 0:
+        apply_action = dispatcher.action_handler
+
+        def _slow_action(action_data: Dict[str, Any]) -> None:
+            busy_until = time.perf_counter() + effect_cost_ms / 1000.0
+            apply_action(action_data)
+            while time.perf_counter() < busy_until:
+                pass
+
+        dispatcher.set_action_handler(_slow_action)
+
+    if not server.ready.wait(10):
+        client.stop()
+        server.close()
+        raise RuntimeError('Mod client did not connect to the harness')
+
+    generator = LoadGenerator(server, events, rate, duration)
+    generator.start()
+
+    tick_interval = 1.0 / tick_rate
+    queue_depths = []
+    drain_times = TikTokLatencyHistogram(sample_count=100000)
+    depth_at_end_of_load = 0
+    settle_deadline: Optional[float] = None
+
+    # The main thread plays the game: one zone update per tick
+    while True:
+        tick_start = time.perf_counter()
+        tiktok_action_dispatcher.TikTokActionDispatcher._drain_on_zone_update(None)
+        tiktok_notification_aggregator.TikTokNotificationAggregator._show_summary_on_zone_update(None)
+        drain_times.record((time.perf_counter() - tick_start) * 1000.0)
+        queue_depths.append(dispatcher.queue_depth)
+
+        if generator.finished.is_set():
+            if settle_deadline is None:
+                settle_deadline = time.perf_counter() + settle_seconds
+                depth_at_end_of_load = dispatcher.queue_depth
+            if len(server.acked_seqs) >= generator.sent_actions or time.perf_counter() >= settle_deadline:
+                break
+
+        time.sleep(max(0.0, tick_interval - (time.perf_counter() - tick_start)))
+
+    client.stop()
+    server.close()
+
+    acked = len(server.acked_seqs)
+    load_seconds = generator.elapsed or duration
+    return {
+        'rate': rate,
+        'protocol': server.protocol,
+        'duration_s': round(load_seconds, 3),
+        'sent_actions': generator.sent_actions,
+        'sent_likes': generator.sent_likes,
+        'achieved_rate': round((generator.sent_actions + generator.sent_likes) / load_seconds, 1),
+        'frames_sent': server.frames_sent,
+        'bytes_sent': server.bytes_sent,
+        'acked_actions': acked,
+        'throughput_per_s': round(acked / (load_seconds + (settle_seconds if acked < generator.sent_actions else 0.0)), 1),
+        'applied_actions': dispatcher.processed_count,
+        'merged_actions': dispatcher.coalescer.merged_count,
+        'dropped_actions': dispatcher.dropped_count,
+        'duplicate_actions': client.sequence_tracker.duplicate_count,
+        'lost_actions': generator.sent_actions - acked,
+        'frame_handling_ms': frame_times.to_dict(),
+        'drain_tick_ms': drain_times.to_dict(),
+        'queue_depth_max': max(queue_depths) if queue_depths else 0,
+        'queue_depth_end_of_load': depth_at_end_of_load,
+        'queue_growth_per_s': round(depth_at_end_of_load / load_seconds, 1),
+        'latency_ms': server.last_latency,
+    }
+
+
+def _format_ms(stats: Dict[str, Any]) -> str:
+    if not stats or not stats.get('count'):
+        return 'n/a'
+    return f"p50 {stats['p50']:.2f}ms p99 {stats['p99']:.2f}ms"
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(f"=== {result['rate']:g} events/s over {result['duration_s']}s ({result['protocol']}) ===")
+    print(f"  sent:        {result['sent_actions']} actions, {result['sent_likes']} likes "
+          f"({result['achieved_rate']}/s in {result['frames_sent']} frames, {result['bytes_sent']} bytes)")
+    print(f"  throughput:  {result['throughput_per_s']} acked actions/s")
+    print(f"  acked:       {result['acked_actions']} (applied {result['applied_actions']}, merged {result['merged_actions']})")
+    print(f"  drops:       {result['dropped_actions']} dropped, {result['lost_actions']} never acked, {result['duplicate_actions']} duplicates")
+    print(f"  parse:       {_format_ms(result['frame_handling_ms'])} per frame")
+    print(f"  drain tick:  {_format_ms(result['drain_tick_ms'])}")
+    print(f"  queue:       max {result['queue_depth_max']}, {result['queue_depth_end_of_load']} at end of load "
+          f"({result['queue_growth_per_s']}/s growth)")
+    latency = result['latency_ms']
+    for stage in ('transport', 'queue', 'total'):
+        print(f"  {stage + ':':<12} {_format_ms(latency.get(stage, {}))}")
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description='Load test the bridge -> mod pipeline without the game')
+    parser.add_argument('--rates', type=float, nargs='+', default=[10, 100, 1000], help='Events per second, one run per rate')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds of load per run')
+    parser.add_argument('--protocol', choices=(compact.COMPACT_PROTOCOL, compact.JSON_PROTOCOL), default=compact.COMPACT_PROTOCOL)
+    parser.add_argument('--replay', help='JSONL file of recorded bridge payloads to play instead of synthetic gifts')
+    parser.add_argument('--actions', help='Comma separated actions for synthetic gifts, defaults to every registered action')
+    parser.add_argument('--viewers', type=int, default=50, help='Distinct synthetic viewers')
+    parser.add_argument('--like-ratio', type=float, default=0.0, help='Fraction of synthetic events that are likes')
+    parser.add_argument('--tick-rate', type=float, default=30.0, help='Simulated zone updates per second')
+    parser.add_argument('--effect-cost-ms', type=float, default=0.0, help='Simulated game time spent per applied action')
+    parser.add_argument('--settle', type=float, default=5.0, help='Seconds to wait for outstanding acks after the load')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    # Likes are generated separately through --like-ratio
+    actions = args.actions.split(',') if args.actions else [action['name'] for action in TikTokActionRegistry.get_metadata() if action['name'] != 'like']
+
+    results = []
+    for rate in args.rates:
+        if args.replay:
+            events = iter(ReplayEventSource(args.replay))
+        else:
+            events = iter(SyntheticEventSource(actions, args.viewers, args.like_ratio, args.seed))
+        result = run_load(rate, args.duration, events, args.protocol, args.tick_rate, args.settle, args.effect_cost_ms)
+        print_report(result)
+        results.append(result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import enum
+import importlib.abc
+import importlib.machinery
+import os
+import sys
+import types
+from collections import Counter
+from typing import Any, Callable, Dict
+
+# Top level packages that only exist inside the game (or in S4CL, which needs the game to import)
+STUBBED_PACKAGES = (
+    '_math',
+    'alarms',
+    'date_and_time',
+    'interactions',
+    'objects',
+    'server',
+    'services',
+    'sims',
+    'sims4',
+    'sims4communitylib',
+    'ui',
+    'vfx',
+)
+
+
+# Number of calls per stubbed name, e.g. 'sims4communitylib.utils.sims.common_buff_utils.CommonBuffUtils.add_buff'
+stub_calls: Counter = Counter()
+
+# Return value factories for specific stubbed calls, everything else returns another stub
+_stub_results: Dict[str, Callable[..., Any]] = {}
+
+# No S4CL data managers exist outside the game, so the mod keeps its persisted records in memory
+_LOCATE_DATA_MANAGER = (
+    'sims4communitylib.persistence.data_management.common_data_manager_registry.CommonDataManagerRegistry()'
+    '.locate_data_manager'
+)
+
+
+def set_stub_result(name: str, factory: Callable[..., Any]) -> None:
+    """Make calls to the stubbed name return factory(*args, **kwargs) instead of a stub."""
+    _stub_results[name] = factory
+
+
+class _StubMeta(type):
+    def __getattr__(cls, item: str):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return StubObject(f'{cls.__name__}.{item}')
+
+
+class _StubBase(metaclass=_StubMeta):
+    """Base class used when mod code subclasses a stubbed class, e.g. ModInfo(CommonModInfo)."""
+
+    def __getattr__(self, item: str):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return StubObject(f'{type(self).__name__}.{item}')
+
+
+class StubObject:
+    """Stands in for any game object: every attribute, call and iteration succeeds and does nothing."""
+
+    def __init__(self, name: str = 'stub'):
+        self._name = name
+
+    def __getattr__(self, item: str):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return StubObject(f'{self._name}.{item}')
+
+    def __call__(self, *args, **kwargs):
+        # Decorator factories such as CommonEventRegistry.handle_events(...) must hand back the function
+        if len(args) == 1 and not kwargs and callable(args[0]) and not isinstance(args[0], StubObject):
+            return args[0]
+        stub_calls[self._name] += 1
+        factory = _stub_results.get(self._name)
+        if factory is not None:
+            return factory(*args, **kwargs)
+        return StubObject(f'{self._name}()')
+
+    def __mro_entries__(self, bases):
+        return (_StubBase,)
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return f'<stub {self._name}>'
+
+
+class _StubModule(types.ModuleType):
+    def __getattr__(self, item: str):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return StubObject(f'{self.__name__}.{item}')
+
+
+class _StubLoader(importlib.abc.Loader):
+    def create_module(self, spec):
+        module = _StubModule(spec.name)
+        module.__path__ = []
+        return module
+
+    def exec_module(self, module) -> None:
+        pass
+
+
+class _StubFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, packages):
+        self.packages = tuple(packages)
+        self.loader = _StubLoader()
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname.split('.', 1)[0] in self.packages:
+            return importlib.machinery.ModuleSpec(fullname, self.loader, is_package=True)
+        return None
+
+
+def install_game_stubs(scripts_path: str = None) -> None:
+    """Make the mod importable outside the game.
+
+    Game and S4CL modules are replaced by no-op stubs, EA's enum.Int is mapped onto IntEnum and the
+    mod's Scripts folder (including the vendored websocket package) is put first on sys.path.
+    """
+    if scripts_path is None:
+        scripts_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'Scripts')
+    if scripts_path not in sys.path:
+        sys.path.insert(0, scripts_path)
+
+    if not hasattr(enum, 'Int'):
+        enum.Int = enum.IntEnum
+
+    _stub_results.setdefault(_LOCATE_DATA_MANAGER, lambda *args, **kwargs: None)
+
+    if not any(isinstance(finder, _StubFinder) for finder in sys.meta_path):
+        sys.meta_path.insert(0, _StubFinder(STUBBED_PACKAGES))
@@ -0,0 +1,110 @@
+"""
+Benchmark of the websocket payload masking used when wsaccel is not installed, which is always the case in-game.
+
+Compares the masking in the vendored websocket package against the implementation it replaced (one big int for
+the whole payload) and against XORing 8-byte words over a memoryview cast to 'Q'. The word loop runs one Python
+level iteration per 8 bytes, which is why the package masks int sized chunks instead.
+
+Usage (from the project root):
+    python -m Utilities.perf.mask_benchmark
+    python -m Utilities.perf.mask_benchmark --sizes 16 1024 1048576 --rounds 9
+"""
+import argparse
+import os
+import statistics
+import struct
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from Utilities.perf.game_stubs import install_game_stubs
+
+install_game_stubs()
+
+# noinspection PyUnresolvedReferences
+from websocket import _abnf  # noqa: E402
+
+DEFAULT_SIZES = [16, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576]
+
+# Bytes masked per round, so every size gets a comparable amount of work
+ROUND_BYTES = 4 * 1024 * 1024
+
+
+def previous_mask_into(mask_key: bytes, data: bytes, out: memoryview) -> None:
+    """The masking the package used before, a repeated mask and the payload converted to one int each"""
+    datalen = len(data)
+    data_value = int.from_bytes(data, sys.byteorder)
+    mask_value = int.from_bytes(mask_key * (datalen // 4) + mask_key[:datalen % 4], sys.byteorder)
+    out[:] = (data_value ^ mask_value).to_bytes(datalen, sys.byteorder)
+
+
+def word_mask_into(mask_key: bytes, data: bytes, out: memoryview) -> None:
+    """8-byte words XORed with a 64-bit mask over memoryviews cast to 'Q', then the tail byte by byte"""
+    datalen = len(data)
+    words_end = datalen - datalen % 8
+    if words_end:
+        mask_value = struct.unpack('=Q', mask_key * 2)[0]
+        source = memoryview(data)[:words_end].cast('Q')
+        target = out[:words_end].cast('Q')
+        for index in range(words_end // 8):
+            target[index] = source[index] ^ mask_value
+    for index in range(words_end, datalen):
+        out[index] = data[index] ^ mask_key[index & 3]
+
+
+IMPLEMENTATIONS: Dict[str, Callable[[bytes, bytes, memoryview], None]] = {
+    'previous': previous_mask_into,
+    'word loop': word_mask_into,
+    # What ABNF.mask_into() calls
+    'package': _abnf._mask_into,
+}
+
+
+def time_mask(mask_into: Callable[[bytes, bytes, memoryview], None], size: int, rounds: int) -> float:
+    """Median microseconds per call"""
+    mask_key = os.urandom(4)
+    data = os.urandom(size)
+    out = memoryview(bytearray(size))
+    number = max(1, ROUND_BYTES // size // 8)
+
+    round_times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            mask_into(mask_key, data, out)
+        round_times.append((time.perf_counter() - started) * 1e6 / number)
+    return statistics.median(round_times)
+
+
+def check_implementations(sizes: List[int]) -> None:
+    mask_key = os.urandom(4)
+    for size in sizes + [size + 3 for size in sizes]:
+        data = os.urandom(size)
+        expected = bytearray(size)
+        previous_mask_into(mask_key, data, memoryview(expected))
+        for name, mask_into in IMPLEMENTATIONS.items():
+            out = bytearray(size)
+            mask_into(mask_key, data, memoryview(out))
+            if out != expected:
+                raise AssertionError(f'{name} masks {size} bytes differently from the previous implementation')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark websocket payload masking without wsaccel')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Payload sizes in bytes')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    check_implementations(args.sizes)
+
+    names = list(IMPLEMENTATIONS)
+    print(f"{'size':>9} " + ' '.join(f'{name + " us":>14}' for name in names) + f" {'speedup':>8}")
+    for size in args.sizes:
+        timings = {name: time_mask(mask_into, size, args.rounds) for name, mask_into in IMPLEMENTATIONS.items()}
+        speedup = timings['previous'] / timings['package']
+        print(f'{size:>9} ' + ' '.join(f'{timings[name]:>14.2f}' for name in names) + f' {speedup:>7.2f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
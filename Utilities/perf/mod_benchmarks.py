@@ -0,0 +1,279 @@
+"""
+Micro-benchmarks for the mod's hot paths on plain CPython.
+
+The game and S4CL are stubbed (see game_stubs.py), so S4CL calls cost nothing here. Alongside the wall time of
+each benchmark the suite records how many S4CL calls a single run fans into, which catches an action that
+starts touching every Sim or buff more often than it used to.
+
+Usage (from the project root):
+    python -m Utilities.perf.mod_benchmarks --save benchmark_baseline.json
+    python -m Utilities.perf.mod_benchmarks --compare benchmark_baseline.json --threshold 10
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from Utilities.perf import game_stubs
+from Utilities.perf.game_stubs import StubObject, install_game_stubs, set_stub_result
+
+install_game_stubs()
+
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod import tiktok_action_dispatcher, tiktok_bridge_client, tiktok_latency_tracer, tiktok_like_aggregator, tiktok_viewer_registry  # noqa: E402
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod.notifications import tiktok_notification_aggregator  # noqa: E402
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod.notifications.tiktok_gift_notifications import TikTokActionNotifications  # noqa: E402
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod.tiktok_action_registry import TikTokActionRegistry  # noqa: E402
+# noinspection PyUnresolvedReferences
+from sims_tik_tok_mod.tiktok_effect_mappings import TikTokEffectMappings  # noqa: E402
+from Utilities.perf.bridge_load_harness import CompactFrameEncoder, SyntheticEventSource  # noqa: E402
+
+BASELINE_VERSION = 1
+
+# Size of the fake active household that household-wide actions fan out over
+HOUSEHOLD_SIZE = 4
+
+_S4CL_PREFIX = 'sims4communitylib.'
+
+
+def _install_fake_world() -> None:
+    household = [StubObject(f'sim_info_{index}') for index in range(HOUSEHOLD_SIZE)]
+    set_stub_result(
+        'sims4communitylib.utils.sims.common_household_utils.CommonHouseholdUtils.get_sim_info_of_all_sims_in_active_household_generator',
+        lambda *args, **kwargs: iter(household)
+    )
+    set_stub_result('sims4communitylib.utils.sims.common_sim_utils.CommonSimUtils.get_active_sim_info', lambda *args, **kwargs: household[0])
+    set_stub_result(
+        'sims4communitylib.utils.sims.common_sim_interaction_utils.CommonSimInteractionUtils.get_running_interactions_gen',
+        lambda *args, **kwargs: iter([StubObject('interaction')])
+    )
+
+
+class Benchmark:
+    """A named operation timed over several rounds of a fixed number of calls."""
+
+    def __init__(self, name: str, operation: Callable[[], None], setup: Optional[Callable[[], None]] = None, number: int = 1000):
+        self.name = name
+        self.operation = operation
+        self.setup = setup
+        self.number = number
+
+    def run(self, rounds: int) -> Dict[str, Any]:
+        # One warm-up call, which also counts the S4CL calls a single run makes
+        if self.setup is not None:
+            self.setup()
+        game_stubs.stub_calls.clear()
+        self.operation()
+        s4cl_calls = {
+            '.'.join(name.split('.')[-2:]): count
+            for name, count in sorted(game_stubs.stub_calls.items()) if name.startswith(_S4CL_PREFIX)
+        }
+
+        round_times = []
+        operation = self.operation
+        for _ in range(rounds):
+            if self.setup is not None:
+                self.setup()
+            started = time.perf_counter()
+            for _ in range(self.number):
+                operation()
+            round_times.append((time.perf_counter() - started) * 1e6 / self.number)
+
+        return {
+            'median_us': round(statistics.median(round_times), 3),
+            'min_us': round(min(round_times), 3),
+            'number': self.number,
+            'rounds': rounds,
+            's4cl_calls': s4cl_calls,
+        }
+
+
+def _build_message_benchmarks() -> List[Benchmark]:
+    client = tiktok_bridge_client.TikTokBridgeClient()
+    client.set_action_callback(lambda action_data: None)
+    events = iter(SyntheticEventSource([action['name'] for action in TikTokActionRegistry.get_metadata()]))
+    state = {'seq': 0}
+
+    def _next_actions(count: int) -> List[Dict[str, Any]]:
+        actions = []
+        for _ in range(count):
+            event = next(events)
+            state['seq'] += 1
+            event['seq'] = state['seq']
+            event['trace'] = {'bridgeReceivedAt': time.time() * 1000.0, 'bridgeSentAt': time.time() * 1000.0}
+            actions.append(event)
+        return actions
+
+    encoder = CompactFrameEncoder()
+
+    def _compact_frame() -> bytes:
+        for action in _next_actions(20):
+            encoder.add_action(action)
+        return encoder.flush(time.time() * 1000.0)
+
+    def _reset_compact() -> None:
+        # The string table is per connection, so both sides start over with every round of frames
+        encoder.strings.clear()
+        client._compact_decoder.reset()
+
+    # Every message carries fresh sequence numbers so none are skipped as duplicates
+    def _make_messages(build: Callable[[], Any], number: int, reset: Optional[Callable[[], None]] = None):
+        messages: List[Any] = []
+
+        def _setup() -> None:
+            if reset is not None:
+                reset()
+            messages[:] = [build() for _ in range(number)]
+            messages.reverse()
+
+        def _operation() -> None:
+            client._on_message(None, messages.pop())
+
+        return _setup, _operation
+
+    benchmarks = []
+    for name, build, number, reset in (
+        ('bridge_client.on_message.json_action', lambda: json.dumps(_next_actions(1)[0]), 2000, None),
+        ('bridge_client.on_message.json_batch_20', lambda: json.dumps({'type': 'sims_action_batch', 'actions': _next_actions(20)}), 200, None),
+        ('bridge_client.on_message.compact_batch_20', _compact_frame, 200, _reset_compact),
+    ):
+        setup, operation = _make_messages(build, number, reset)
+        benchmarks.append(Benchmark(name, operation, setup, number))
+    return benchmarks
+
+
+def _build_action_benchmarks() -> List[Benchmark]:
+    client = tiktok_bridge_client.TikTokBridgeClient()
+    client.is_connected = True
+    client.ws = StubObject('websocket')
+    tiktok_bridge_client._bridge_client = client
+    tiktok_notification_aggregator._notification_aggregator = None
+    tiktok_latency_tracer._latency_tracer = None
+    tiktok_viewer_registry._viewer_registry = None
+    tiktok_like_aggregator._like_aggregator = None
+
+    def _reset_pending() -> None:
+        client._pending_responses.clear()
+        tiktok_notification_aggregator.get_notification_aggregator()._reset()
+
+    benchmarks = []
+    for action in sorted(definition['name'] for definition in TikTokActionRegistry.get_metadata()):
+        context = {'giftName': 'Rose', 'giftId': 'rose', 'diamondCount': 1, 'totalDiamondCount': 1, 'coalescedCount': 1}
+        action_data = {'type': 'sims_action', 'user': 'viewer1', 'userNickname': 'Alice Smith', 'action': action, 'count': 1, 'context': context}
+
+        benchmarks.append(Benchmark(
+            f'effects.apply_action_effect.{action}',
+            lambda action=action, context=context: TikTokEffectMappings.apply_action_effect('Alice Smith', action, 1, context)
+        ))
+        benchmarks.append(Benchmark(
+            f'notifications.handle_action_event.{action}',
+            lambda action_data=action_data: TikTokActionNotifications._handle_action_event(action_data),
+            _reset_pending
+        ))
+    return benchmarks
+
+
+def _build_like_benchmarks() -> List[Benchmark]:
+    aggregator = tiktok_like_aggregator.TikTokLikeAggregator()
+    users = [f'viewer{index}' for index in range(20000)]
+    state = {'index': 0, 'now': 0.0}
+
+    def _reset() -> None:
+        aggregator.clear()
+        state['index'] = 0
+        state['now'] = 0.0
+
+    def _add_likes() -> None:
+        # A stream of 20000 likers at 1000 like events per simulated second, expiring as the game ticks would
+        index = state['index']
+        state['index'] = index + 1
+        state['now'] = index / 1000.0
+        aggregator.add_likes(users[index * 7919 % len(users)], 'Alice Smith', 5, state['now'])
+        if index % 33 == 0:
+            aggregator.expire(state['now'])
+
+    return [Benchmark('like_aggregator.add_likes_20k_viewers', _add_likes, _reset, 20000)]
+
+
+def build_benchmarks() -> List[Benchmark]:
+    _install_fake_world()
+    return _build_message_benchmarks() + _build_action_benchmarks() + _build_like_benchmarks()
+
+
+def run_benchmarks(name_filter: Optional[str] = None, rounds: int = 7) -> Dict[str, Any]:
+    results = {}
+    for benchmark in build_benchmarks():
+        if name_filter and name_filter not in benchmark.name:
+            continue
+        results[benchmark.name] = benchmark.run(rounds)
+        print(f"{benchmark.name:<60} {results[benchmark.name]['median_us']:>10.2f} us/op")
+
+    return {
+        'version': BASELINE_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'benchmarks': results,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold_percent: float) -> List[str]:
+    """Describe every benchmark that got slower than the threshold allows or makes more S4CL calls."""
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if base is None:
+            continue
+
+        change = (result['median_us'] - base['median_us']) / base['median_us'] * 100.0 if base['median_us'] else 0.0
+        if change > threshold_percent:
+            regressions.append(f"{name}: {base['median_us']:.2f} -> {result['median_us']:.2f} us/op (+{change:.1f}%)")
+
+        for call, count in result['s4cl_calls'].items():
+            base_count = base.get('s4cl_calls', {}).get(call, 0)
+            if count > base_count:
+                regressions.append(f"{name}: {call} called {count}x per run, was {base_count}x")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the mod hot paths against stubbed game modules')
+    parser.add_argument('--save', help='Write the results to this baseline file')
+    parser.add_argument('--compare', help='Compare against this baseline file and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Allowed slowdown in percent before a benchmark is flagged')
+    parser.add_argument('--filter', help='Only run benchmarks whose name contains this text')
+    parser.add_argument('--rounds', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter, args.rounds)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        if baseline.get('version') != BASELINE_VERSION:
+            print(f"Baseline {args.compare} has version {baseline.get('version')}, expected {BASELINE_VERSION}")
+            return 2
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.compare}:")
+            for regression in regressions:
+                print(f"  REGRESSION {regression}")
+            return 1
+        print(f"No regressions against {args.compare} (threshold {args.threshold:g}%)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
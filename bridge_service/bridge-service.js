@@ -1,7 +1,10 @@
+import { randomUUID } from 'crypto';
 import { WebSocket, WebSocketServer } from 'ws';
 import { TikTokLiveConnection } from 'tiktok-live-connector';
 import config from './config.json' assert { type: 'json' };
 import GiftMappingsService from './gift-mappings-service.js';
+import { TIKTOK_GIFTS } from './gift-mappings.js';
+import { CompactEncoder, COMPACT_PROTOCOL } from './compact-protocol.js';
 
 class TikTokBridgeService {
     constructor(tiktokUsername, websocketPort = 8765, manualMode = false, logCallback = null) {
@@ -22,10 +25,29 @@ class TikTokBridgeService {
         this.giftMappingsManager = new GiftMappingsService();
         this.giftMappings = {};
 
-        // Like tracking configuration
+        // Actions registered in the mod, fetched over the socket when the mod connects
+        this.modActions = new Map();
+        
+        // Actions are batched per client for a few milliseconds, as binary frames on the
+        // compact protocol or as a sims_action_batch envelope on JSON
+        this.batchDelayMs = 5;
+        this.batchFlushTimer = null;
+        
+        // Sequence number of the last action sent, acknowledged by the mod in cumulative acks.
+        // Sequences restart with every bridge session, so the mod can tell a restart from a reconnect
+        this.sessionId = randomUUID();
+        this.lastSequence = 0;
+        
+        // Ring of the most recent actions, replayed to a mod that reconnects and resumes
+        this.replayBufferSize = 1000;
+        this.replayBuffer = new Array(this.replayBufferSize);
+        
+        // Mods that have not said hello by then are older builds without resume support
+        this.helloTimeoutMs = 2000;
+
+        // Like reward settings, sent to the mod which counts the raw likes forwarded to it
         this.likesThreshold = config.likeTracking?.threshold || 100; // Number of likes needed to trigger simoleon reward
-        this.likesTimeout = config.likeTracking?.timeout || 60; // Time in seconds before accumulated likes expire
-        this.likeTrackers = new Map(); // Track like accumulation per user
+        this.likesTimeout = config.likeTracking?.timeout || 60; // Time in seconds before accumulated likes are rewarded anyway
         
         if (!manualMode) {
             // Initialize TikTok connection only in normal mode
@@ -45,8 +67,6 @@ class TikTokBridgeService {
             
             this.setupTikTokEvents();
         }
-        
-        this.startLikeTrackerCleanup();
     }
     
     log(message, type = 'info') {
@@ -153,6 +173,20 @@ class TikTokBridgeService {
             const clientInfo = `${request.socket.remoteAddress}:${request.socket.remotePort}`;
             this.log(`🎮 Sims 4 mod connected: ${clientInfo}`, 'connection');
             
+            // Every client starts on JSON until it offers the compact protocol
+            ws.compactEncoder = null;
+            ws.pendingActions = [];
+            // Actions are held back until the mod says hello and resumes from its last sequence
+            ws.resumed = false;
+            ws.saidHello = false;
+            ws.connectSequence = this.lastSequence;
+            ws.helloTimer = setTimeout(() => {
+                ws.helloTimer = null;
+                if (!ws.resumed && ws.readyState === WebSocket.OPEN) {
+                    this.log(`📭 Sims 4 mod did not say hello, sending actions without resume`, 'websocket');
+                    this.resumeClient(ws, null);
+                }
+            }, this.helloTimeoutMs);
             this.connectedClients.add(ws);
             
             // Send welcome message
@@ -162,13 +196,17 @@ class TikTokBridgeService {
                 timestamp: new Date().toISOString()
             }));
             
+            // Ask the mod which actions it supports so gift mappings can be validated
+            ws.send(JSON.stringify({ type: 'get_action_registry' }));
+            
             ws.on('message', (message) => {
                 this.log(`📨 Received from ${clientInfo}: ${message}`, 'websocket');
-                // Handle any messages from Sims 4 mod if needed
+                this.handleClientMessage(ws, message);
             });
             
             ws.on('close', () => {
                 this.log(`👋 Sims 4 mod disconnected: ${clientInfo}`, 'connection');
+                clearTimeout(ws.helloTimer);
                 this.connectedClients.delete(ws);
             });
             
@@ -183,6 +221,166 @@ class TikTokBridgeService {
         });
     }
     
+    handleClientMessage(ws, message) {
+        let data;
+        try {
+            data = JSON.parse(message);
+        } catch (error) {
+            this.log(`❌ Failed to parse message from Sims 4 mod: ${this.formatError(error)}`, 'error');
+            return;
+        }
+        
+        if (data.type === 'ack') {
+            this.handleAck(data);
+        } else if (data.type === 'hello') {
+            clearTimeout(ws.helloTimer);
+            ws.saidHello = true;
+            this.negotiateProtocol(ws, data.protocols || []);
+            // A hello after the timeout finds the client already receiving actions
+            if (!ws.resumed) {
+                this.resumeClient(ws, data.resume || null);
+            }
+        } else if (data.type === 'action_registry') {
+            this.modActions = new Map((data.actions || []).map(action => [action.name, action]));
+            this.log(`📋 Sims 4 mod supports ${this.modActions.size} actions`, 'info');
+            this.validateGiftMappings();
+        }
+    }
+    
+    handleAck(data) {
+        const actions = data.actions || [];
+        const seqs = actions.flatMap(action => action.seqs || []);
+        const seqRange = seqs.length > 0 ? ` (seq ${Math.min(...seqs)}-${Math.max(...seqs)})` : '';
+        const total = data.latency?.total;
+        const latency = total && total.count > 0 ? `, gift to effect p50 ${total.p50.toFixed(0)}ms p99 ${total.p99.toFixed(0)}ms` : '';
+        this.log(`✅ Sims 4 mod applied ${actions.length} action(s)${seqRange}${latency}`, 'websocket');
+    }
+    
+    negotiateProtocol(ws, protocols) {
+        if (!protocols.includes(COMPACT_PROTOCOL)) {
+            ws.send(JSON.stringify({ type: 'protocol', protocol: 'json', sessionId: this.sessionId, likeTracking: this.getLikeTracking() }));
+            return;
+        }
+        
+        ws.compactEncoder = new CompactEncoder();
+        ws.send(JSON.stringify({ type: 'protocol', protocol: COMPACT_PROTOCOL, sessionId: this.sessionId, likeTracking: this.getLikeTracking() }));
+        
+        // Send the known action and gift names up front so events only carry their ids
+        ws.compactEncoder.internAll(Object.values(this.giftMappings));
+        ws.compactEncoder.internAll(TIKTOK_GIFTS.map(gift => gift.name));
+        this.flushClientBatch(ws);
+        
+        this.log(`📦 Sims 4 mod switched to ${COMPACT_PROTOCOL} protocol`, 'websocket');
+    }
+    
+    getLikeTracking() {
+        return { threshold: this.likesThreshold, timeout: this.likesTimeout };
+    }
+    
+    resumeClient(ws, resume) {
+        // A new mod only gets what happened since it connected, a mod coming back to the same
+        // session gets everything after its last sequence, and a mod from an earlier session
+        // gets everything this session still has
+        let fromSequence = ws.connectSequence;
+        if (resume && resume.sessionId === this.sessionId) {
+            fromSequence = Math.min(Number(resume.lastSeq) || 0, this.lastSequence);
+        } else if (resume) {
+            fromSequence = 0;
+        }
+        
+        const oldestSequence = Math.max(1, this.lastSequence - this.replayBufferSize + 1);
+        if (resume && resume.sessionId === this.sessionId && fromSequence + 1 < oldestSequence) {
+            this.log(`⚠️  ${oldestSequence - fromSequence - 1} action(s) are too old to replay to the Sims 4 mod`, 'warning');
+        }
+        
+        let replayedCount = 0;
+        for (let seq = Math.max(fromSequence + 1, oldestSequence); seq <= this.lastSequence; seq++) {
+            const payload = this.replayBuffer[seq % this.replayBufferSize];
+            if (payload && payload.seq === seq) {
+                this.queueClientAction(ws, payload);
+                replayedCount++;
+            }
+        }
+        
+        ws.resumed = true;
+        this.flushClientBatch(ws);
+        
+        if (replayedCount > 0) {
+            this.log(`🔁 Replayed ${replayedCount} missed action(s) to the Sims 4 mod`, 'websocket');
+        }
+    }
+    
+    queueClientAction(ws, payload) {
+        if (!ws.compactEncoder || !ws.compactEncoder.addAction(payload)) {
+            ws.pendingActions.push(payload);
+        }
+    }
+    
+    flushClientBatch(ws) {
+        const sentAt = Date.now();
+        if (ws.compactEncoder && ws.compactEncoder.hasPending()) {
+            for (const frame of ws.compactEncoder.flush(sentAt)) {
+                ws.send(frame, { binary: true });
+            }
+        }
+        
+        for (const payload of ws.pendingActions) {
+            payload.trace = { ...payload.trace, bridgeSentAt: sentAt };
+        }
+        
+        if (ws.pendingActions.length === 1 || !ws.saidHello) {
+            // Mods without a hello predate sims_action_batch
+            for (const payload of ws.pendingActions) {
+                ws.send(JSON.stringify(payload));
+            }
+        } else if (ws.pendingActions.length > 1) {
+            ws.send(JSON.stringify({ type: 'sims_action_batch', actions: ws.pendingActions }));
+        }
+        ws.pendingActions = [];
+    }
+    
+    scheduleBatchFlush() {
+        if (this.batchFlushTimer) {
+            return;
+        }
+        
+        this.batchFlushTimer = setTimeout(() => {
+            this.batchFlushTimer = null;
+            this.connectedClients.forEach(client => {
+                if (client.readyState !== WebSocket.OPEN) {
+                    return;
+                }
+                try {
+                    this.flushClientBatch(client);
+                } catch (error) {
+                    this.log(`❌ Error sending batch to client: ${this.formatError(error)}`, 'error');
+                }
+            });
+        }, this.batchDelayMs);
+    }
+    
+    validateGiftMappings() {
+        if (this.modActions.size === 0) {
+            return [];
+        }
+        
+        const unknownMappings = Object.entries(this.giftMappings)
+            .filter(([, action]) => action !== 'none' && !this.modActions.has(action));
+        
+        if (unknownMappings.length > 0) {
+            const unknownActions = [...new Set(unknownMappings.map(([, action]) => action))];
+            this.log(`⚠️  ${unknownMappings.length} gift(s) are mapped to actions the Sims 4 mod does not support: ${unknownActions.join(', ')}`, 'warning');
+        } else {
+            this.log('✅ All gift mappings are supported by the Sims 4 mod', 'success');
+        }
+        
+        return unknownMappings;
+    }
+    
+    getModActions() {
+        return [...this.modActions.values()];
+    }
+    
     processGiftEvent(data) {
         const currentTime = Date.now();
         
@@ -243,6 +441,8 @@ class TikTokBridgeService {
                 diamondCount: diamondCount,
                 profilePictureUrl: profilePictureUrl
             },
+            // Stage timestamps in epoch milliseconds, completed by the bridge and the mod
+            trace: { bridgeReceivedAt: currentTime },
             timestamp: new Date().toISOString()
         };
         
@@ -251,115 +451,72 @@ class TikTokBridgeService {
     
     processLikeEvent(data) {
         try {
-            const currentTime = Date.now();
-            
-            // Reset minute counter if needed
-            if (currentTime - this.minuteStartTime >= 60000) {
-                this.eventsThisMinute = 0;
-                this.minuteStartTime = currentTime;
-            }
-            
-            // Extract username from data
-            const username = data.user?.uniqueId || data.uniqueId || 'unknown';
+            // Sanitize usernames to remove non-ASCII characters, as for gifts
+            const username = (data.user?.uniqueId || data.uniqueId || 'unknown').replace(/[^\x00-\x7F]/g, "");
+            const userNickname = (data.user?.nickname || data.nickname || username).replace(/[^\x00-\x7F]/g, "");
             const likeCount = data.likeCount || data.count || 1;
-
-            // Clean up expired likes first
-            this.cleanupExpiredLikeTrackers();
-            
-            // Accumulate likes for this user
-            this.accumulateLikes(username, likeCount);
-            
-        } catch (error) {
-            this.log(`❌ Error processing like event: ${this.formatError(error)}`, 'error');
-        }
-    }
-    
-    accumulateLikes(username, likeCount) {
-        try {
-            const currentTime = Date.now() / 1000; // Convert to seconds
-            
-            // Initialize or update tracker for this user
-            if (!this.likeTrackers.has(username)) {
-                this.likeTrackers.set(username, {
-                    totalLikes: 0,
-                    firstLikeTime: currentTime,
-                    lastLikeTime: currentTime
-                });
-            }
-            
-            const tracker = this.likeTrackers.get(username);
-            tracker.totalLikes += likeCount;
-            tracker.lastLikeTime = currentTime;
-
-            // Check if we should trigger a reward
-            this.checkAndTriggerLikeReward(username, tracker);
-            
-        } catch (error) {
-            this.log(`❌ Error accumulating likes for ${username}: ${this.formatError(error)}`, 'error');
-        }
-    }
-    
-    checkAndTriggerLikeReward(username, tracker) {
-        try {
-            const currentTime = Date.now() / 1000;
-            const timeSinceFirst = currentTime - tracker.firstLikeTime;
-            
-            // Check if threshold reached or timeout elapsed
-            const shouldTrigger = (tracker.totalLikes >= this.likesThreshold || 
-                                 timeSinceFirst >= this.likesTimeout);
-            
-            if (shouldTrigger) {
-                // Trigger reward
-                this.triggerLikeReward(username, tracker.totalLikes);
-                
-                // Remove tracker since reward was triggered
-                this.likeTrackers.delete(username);
-            }
-            
-        } catch (error) {
-            this.log(`❌ Error checking like reward trigger for ${username}: ${this.formatError(error)}`, 'error');
-        }
-    }
-    
-    triggerLikeReward(username, totalLikes) {
-        try {
-            this.log(`🎉 Like threshold reached for ${username}! Triggering simoleon reward for ${totalLikes} likes...`, 'success');
             
-            // Create a simoleon reward action for the Sims 4 mod
-            const rewardPayload = {
+            // Forwarded as is, the mod counts likes per viewer and decides when a like reward is earned
+            this.broadcastToClients({
                 type: 'sims_action',
                 user: username,
-                action: 'like_reward',
-                count: totalLikes, // Amount of simoleons to add
+                userNickname: userNickname,
+                action: 'like',
+                count: likeCount,
                 context: {
-                    totalLikes: totalLikes,
-                    rewardType: 'like_milestone',
-                    description: `${username} reached ${totalLikes} likes!`
+                    giftName: 'Like',
+                    giftId: 0,
+                    diamondCount: 0
                 },
+                trace: { bridgeReceivedAt: Date.now() },
                 timestamp: new Date().toISOString()
-            };
-            
-            // Send the reward action to connected clients
-            this.broadcastToClients(rewardPayload);
-            this.log(`📤 Like reward sent: ${username} -> ${totalLikes} simoleons for ${totalLikes} likes`, 'like');
+            });
             
         } catch (error) {
-            this.log(`❌ Error triggering like reward for ${username}: ${this.formatError(error)}`, 'error');
+            this.log(`❌ Error processing like event: ${this.formatError(error)}`, 'error');
         }
     }
     
     broadcastToClients(payload) {
+        // Actions are kept for replay even when no mod is connected. Likes only feed the mod's like
+        // counters and arrive far too often, so they are sent best effort without a sequence and
+        // never push gifts out of the replay buffer
+        if (payload.type === 'sims_action' && payload.action !== 'like') {
+            payload.seq = ++this.lastSequence;
+            this.replayBuffer[payload.seq % this.replayBufferSize] = payload;
+        }
+        
         if (this.connectedClients.size === 0) {
             this.log('⚠️  No Sims 4 mod clients connected', 'warning');
             return;
         }
         
-        const message = JSON.stringify(payload);
+        // Only serialised to JSON if a client still uses the JSON protocol
+        let message = null;
         const disconnectedClients = new Set();
         
         this.connectedClients.forEach(client => {
             if (client.readyState === WebSocket.OPEN) {
                 try {
+                    if (payload.type === 'sims_action') {
+                        // Replayed once the client resumes
+                        if (!client.resumed) {
+                            return;
+                        }
+                        
+                        // Sent with the next batch
+                        this.queueClientAction(client, payload);
+                        this.scheduleBatchFlush();
+                        // Likes arrive far too often to log each one
+                        if (payload.action !== 'like') {
+                            this.log(`📦 Queued for client: ${payload.type} event for ${payload.user}`, 'websocket');
+                        }
+                        return;
+                    }
+                    
+                    if (message === null) {
+                        message = JSON.stringify(payload);
+                    }
                     client.send(message);
                     this.log(`📤 Sent to client: ${payload.type} event for ${payload.user}`, 'websocket');
                 } catch (error) {
@@ -408,7 +565,7 @@ class TikTokBridgeService {
             this.log(`   AI Model: ${this.aiModel}`, 'info');
         }
         this.log(`   Diamond Tracking: ✅ Enabled (threshold: ${this.diamondThreshold}, timeout: ${this.diamondTimeout}s)`, 'info');
-        this.log(`   Like Tracking: ✅ Enabled (threshold: ${this.likesThreshold}, timeout: ${this.likesTimeout}s)`, 'info');
+        this.log(`   Like Tracking: ✅ Counted by the Sims 4 mod (threshold: ${this.likesThreshold}, timeout: ${this.likesTimeout}s)`, 'info');
         
         try {
             this.log('🔗 Attempting to connect to TikTok Live...', 'info');
@@ -481,6 +638,7 @@ class TikTokBridgeService {
                 icon: icon,
                 isManual: true
             },
+            trace: { bridgeReceivedAt: Date.now() },
             timestamp: new Date().toISOString()
         };
         
@@ -495,6 +653,7 @@ class TikTokBridgeService {
         this.giftMappings = { ...mappings };
         await this.giftMappingsManager.updateMappings(mappings);
         this.log(`🔧 Gift mappings updated: ${Object.keys(mappings).length} gifts configured`, 'info');
+        this.validateGiftMappings();
     }
 
     getGiftMappings() {
@@ -514,52 +673,20 @@ class TikTokBridgeService {
         }
     }
 
-    startLikeTrackerCleanup() {
-        // Clean up expired like trackers every minute
-        setInterval(() => {
-            this.cleanupExpiredLikeTrackers();
-        }, 60 * 1000); // 1 minute
-    }
-    
-    cleanupExpiredLikeTrackers() {
-        try {
-            const currentTime = Date.now() / 1000;
-            const expiredUsers = [];
-            
-            for (const [username, tracker] of this.likeTrackers.entries()) {
-                const timeSinceFirst = currentTime - tracker.firstLikeTime;
-                if (timeSinceFirst >= this.likesTimeout) {
-                    expiredUsers.push(username);
-                }
-            }
-            
-            // Trigger rewards for expired users and remove trackers
-            for (const username of expiredUsers) {
-                const tracker = this.likeTrackers.get(username);
-                if (tracker && tracker.totalLikes > 0) {
-                    this.triggerLikeReward(username, tracker.totalLikes);
-                }
-                this.likeTrackers.delete(username);
-            }
-            
-            if (expiredUsers.length > 0) {
-                this.log(`🧹 Cleaned up ${expiredUsers.length} expired like trackers`, 'info');
-            }
-            
-        } catch (error) {
-            this.log(`❌ Error cleaning up expired like trackers: ${this.formatError(error)}`, 'error');
-        }
-    }
-    
-    stop() {
+    stop({ restarting = false } = {}) {
         this.log('🛑 Stopping TikTok Bridge Service...', 'info');
         
         try {
-            // Close all WebSocket connections
+            // Close all WebSocket connections. 1012 (service restart) tells the mod that a new
+            // bridge is coming up and it should retry immediately instead of backing off
             if (this.connectedClients.size > 0) {
                 this.connectedClients.forEach(client => {
                     if (client.readyState === WebSocket.OPEN) {
-                        client.close(1000, 'Bridge service shutting down');
+                        if (restarting) {
+                            client.close(1012, 'Bridge service restarting');
+                        } else {
+                            client.close(1000, 'Bridge service shutting down');
+                        }
                     }
                 });
                 this.connectedClients.clear();
@@ -581,6 +708,11 @@ class TikTokBridgeService {
                 this.log('🔌 Disconnected from TikTok Live and cleaned up event listeners', 'info');
             }
             
+            if (this.batchFlushTimer) {
+                clearTimeout(this.batchFlushTimer);
+                this.batchFlushTimer = null;
+            }
+            
             // Close WebSocket server
             if (this.wss) {
                 this.wss.close(() => {
@@ -0,0 +1,140 @@
+// Compact binary protocol between the bridge and the Sims 4 mod.
+//
+// Frames are big-endian: magic (u8), version (u8), record count (u16), bridge send time (f64, epoch ms),
+// then records.
+// Every record starts with a type byte:
+//   STRING      id (u16), byte length (u16), utf-8 bytes - adds an entry to the connection's string table
+//   SIMS_ACTION sequence (u32), bridge receive time (f64, epoch ms), user, nickname, action, gift name, gift id (u16 string ids),
+//               diamond count (u32), count (u32), flags (u8)
+// Strings are interned once per connection and referenced by id afterwards, so repeated
+// action names, gift names and usernames cost two bytes each.
+
+export const COMPACT_PROTOCOL = 'compact-v1';
+
+const FRAME_MAGIC = 0xc5;
+const FRAME_VERSION = 1;
+const FRAME_HEADER_SIZE = 12;
+
+const RECORD_STRING = 1;
+const RECORD_SIMS_ACTION = 2;
+
+const SIMS_ACTION_SIZE = 1 + 4 + 8 + 5 * 2 + 4 + 4 + 1;
+const FLAG_IS_MANUAL = 0x01;
+// Set for a gift sent without a diamond count, so the mod applies its default like it does for JSON
+const FLAG_NO_DIAMOND_COUNT = 0x02;
+
+// Reserved id meaning "no string"
+const NO_STRING = 0xffff;
+const MAX_STRING_BYTES = 0xffff;
+
+export class CompactEncoder {
+    constructor() {
+        this.strings = new Map();
+        // Complete encoded records waiting for the next flush
+        this.records = [];
+    }
+
+    get recordCount() {
+        return this.records.length;
+    }
+
+    intern(value) {
+        if (value === undefined || value === null) {
+            return NO_STRING;
+        }
+
+        const text = String(value);
+        const existingId = this.strings.get(text);
+        if (existingId !== undefined) {
+            return existingId;
+        }
+
+        // Table is full, the caller has to fall back to JSON
+        if (this.strings.size >= NO_STRING) {
+            return null;
+        }
+
+        const id = this.strings.size;
+        this.strings.set(text, id);
+
+        let bytes = Buffer.from(text, 'utf8');
+        if (bytes.length > MAX_STRING_BYTES) {
+            bytes = bytes.subarray(0, MAX_STRING_BYTES);
+        }
+
+        const record = Buffer.allocUnsafe(5 + bytes.length);
+        record.writeUInt8(RECORD_STRING, 0);
+        record.writeUInt16BE(id, 1);
+        record.writeUInt16BE(bytes.length, 3);
+        bytes.copy(record, 5);
+        this.records.push(record);
+
+        return id;
+    }
+
+    internAll(values) {
+        for (const value of values) {
+            if (this.intern(value) === null) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    addAction(payload) {
+        const context = payload.context || {};
+        const stringIds = [
+            this.intern(payload.user),
+            this.intern(payload.userNickname),
+            this.intern(payload.action),
+            this.intern(context.giftName),
+            this.intern(context.giftId)
+        ];
+
+        if (stringIds.includes(null)) {
+            return false;
+        }
+
+        const record = Buffer.allocUnsafe(SIMS_ACTION_SIZE);
+        let offset = record.writeUInt8(RECORD_SIMS_ACTION, 0);
+        // 0 for actions sent without a sequence, which start at 1
+        offset = record.writeUInt32BE((payload.seq || 0) >>> 0, offset);
+        offset = record.writeDoubleBE(payload.trace?.bridgeReceivedAt || 0, offset);
+        for (const stringId of stringIds) {
+            offset = record.writeUInt16BE(stringId, offset);
+        }
+        const hasDiamondCount = context.diamondCount !== undefined && context.diamondCount !== null;
+        offset = record.writeUInt32BE(Math.max(0, hasDiamondCount ? context.diamondCount : 0) >>> 0, offset);
+        offset = record.writeUInt32BE(Math.max(0, payload.count || 1) >>> 0, offset);
+        record.writeUInt8((context.isManual ? FLAG_IS_MANUAL : 0) | (hasDiamondCount ? 0 : FLAG_NO_DIAMOND_COUNT), offset);
+
+        this.records.push(record);
+        return true;
+    }
+
+    hasPending() {
+        return this.recordCount > 0;
+    }
+
+    flush(sentAt = Date.now()) {
+        if (this.recordCount === 0) {
+            return [];
+        }
+
+        const frames = [];
+        // Record count is a u16, so very large batches are split across frames
+        while (this.recordCount > 0) {
+            const frameRecordCount = Math.min(this.recordCount, 0xffff);
+            const header = Buffer.allocUnsafe(FRAME_HEADER_SIZE);
+            header.writeUInt8(FRAME_MAGIC, 0);
+            header.writeUInt8(FRAME_VERSION, 1);
+            header.writeUInt16BE(frameRecordCount, 2);
+            header.writeDoubleBE(sentAt, 4);
+
+            const frameRecords = this.records.splice(0, frameRecordCount);
+            frames.push(Buffer.concat([header, ...frameRecords]));
+        }
+
+        return frames;
+    }
+}
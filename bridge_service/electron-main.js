@@ -142,7 +142,8 @@ process.on('SIGTERM', () => {
 ipcMain.handle('start-bridge', async (event, config) => {
     try {
         if (bridgeService) {
-            bridgeService.stop();
+            // Tells the mod to reconnect right away instead of backing off
+            bridgeService.stop({ restarting: true });
         }
 
         bridgeService = new TikTokBridgeService(
@@ -1,9 +1,13 @@
 import os
+from Utilities.build_asset_catalog import build_catalog_module
 from Utilities.unpyc3_compiler import Unpyc3PythonCompiler
 
 
 release_dir = os.path.join('Release', 'SimsTikTokMod')
 
+# The animation and VFX name catalog is generated from animations_list.txt and vfx_list.txt and packed with the scripts.
+build_catalog_module()
+
 # This function invocation will compile the files found within Scripts/s4cl_sample_mod_scripts, put them inside of a file named s4cl_sample_mod.ts4script, and it will finally place that ts4script file within <Project>/Release/S4CLSampleMod.
 Unpyc3PythonCompiler.compile_mod(
     folder_path_to_output_ts4script_to=release_dir,